@@ -22,17 +22,18 @@ from recipes_routes import router as recipes_router
 from profile_routes import router as profile_router
 
 from nodes.cs_orders import get_order_details as get_order_details_fn
-from nodes.cs_refund import handle_partial_refund_with_image as handle_partial_refund
+from nodes.cs_evidence_jobs import evidence_jobs, EvidenceQueueFull
 
 import asyncio
 from utils import db_audit
 from utils.chat_history import add_to_history, manage_history_length
+from utils.context_builder import reset_turn_usage, get_turn_usage, schedule_summary_update
+from utils.image_preprocess import preprocess_image, preprocess_stats
+from utils.vision_cache import vision_result_cache
+from utils.upload_store import save_upload, temporary_upload, UploadError
+from utils.user_profile_cache import get_user_profile, user_profile_cache
 from utils.session_manager import get_or_create_session_state, update_session_access, schedule_session_cleanup, get_session_statistics, cleanup_inactive_sessions
 import os
-try:
-    import mysql.connector
-except Exception:
-    mysql = None
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -63,11 +64,43 @@ async def startup_event():
     except Exception as e:
         logger.error(f"❌ 세션 정리 스케줄러 시작 실패: {e}")
 
+    # 재시작 전에 남은 증빙 분석 작업 정리 (DB 작업이므로 이벤트 루프 밖에서)
+    asyncio.get_running_loop().run_in_executor(None, evidence_jobs.fail_stale_jobs)
+
+    from utils.transcription import transcription_service, WHISPER_WARMUP
+    if WHISPER_WARMUP:
+        asyncio.get_running_loop().run_in_executor(None, transcription_service.warmup)
+        logger.info("🎙️ Whisper 워밍업 시작 (백그라운드)")
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """서버 종료 시 세션 통계 로깅"""
     logger.info("🛑 FastAPI 서버 종료 중")
 
+    try:
+        from auth_system.kakao_address import kakao_address_service
+        await kakao_address_service.close()
+    except Exception as e:
+        logger.error(f"❌ 주소 검색 HTTP 세션 종료 실패: {e}")
+
+    try:
+        from utils.url_health import url_health_cache
+        url_health_cache.flush()
+    except Exception as e:
+        logger.error(f"❌ URL 상태 캐시 저장 실패: {e}")
+
+    try:
+        from utils.recipe_store import recipe_store
+        recipe_store.flush()
+    except Exception as e:
+        logger.error(f"❌ 레시피 문서 저장소 저장 실패: {e}")
+
+    try:
+        from utils.vision_cache import vision_result_cache
+        vision_result_cache.flush()
+    except Exception as e:
+        logger.error(f"❌ Vision 결과 캐시 저장 실패: {e}")
+
     try:
         stats = get_session_statistics()
         logger.info(f"📊 최종 세션 통계: {stats}")
@@ -133,6 +166,83 @@ async def manual_session_cleanup():
         logger.error(f"수동 세션 정리 실패: {e}")
         return {"error": str(e)}
 
+@app.get("/api/admin/transcription")
+async def get_transcription_metrics():
+    """음성 전사 대기열/RTF 지표 조회 (개발/디버깅용)"""
+    from utils.transcription import transcription_service
+    return transcription_service.get_metrics()
+
+@app.get("/api/admin/faq-cache")
+async def get_faq_cache_metrics():
+    """FAQ 시맨틱 캐시 적중률/stale 지표 조회 (개발/디버깅용)"""
+    try:
+        from nodes.cs_answer_cache import faq_answer_cache
+        return faq_answer_cache.get_metrics()
+    except Exception as e:
+        logger.error(f"FAQ 캐시 지표 조회 실패: {e}")
+        return {"error": str(e)}
+
+@app.get("/api/admin/user-profile-cache")
+async def get_user_profile_cache_metrics():
+    """사용자 프로필 캐시 적중률 조회 (개발/디버깅용)"""
+    return user_profile_cache.get_metrics()
+
+@app.get("/api/admin/kakao-address")
+async def get_kakao_address_metrics():
+    """주소 검색 캐시/중복 요청 합류 지표 조회 (개발/디버깅용)"""
+    from auth_system.kakao_address import kakao_address_service
+    return kakao_address_service.get_metrics()
+
+@app.get("/api/admin/speculation")
+async def get_speculation_metrics():
+    """라우터 ∥ enhance_query 추측 실행 적중률/절감 시간 조회 (개발/디버깅용)"""
+    from workflow import enhance_speculator
+    return enhance_speculator.get_metrics()
+
+@app.get("/api/admin/url-health")
+async def get_url_health_metrics():
+    """레시피 URL 접근성 캐시 + 도메인 건강도(연속 실패/응답 시간 EWMA) 조회 (개발/디버깅용)"""
+    from utils.url_health import url_health_cache
+    return url_health_cache.get_metrics()
+
+@app.get("/api/admin/tavily-cache")
+async def get_tavily_cache_metrics():
+    """Tavily 레시피 검색 결과 캐시 적중률 조회 (개발/디버깅용)"""
+    from utils.tavily_cache import tavily_result_cache
+    return tavily_result_cache.get_metrics()
+
+@app.get("/api/admin/recipe-store")
+async def get_recipe_store_metrics():
+    """크롤링 레시피 저장소 적중/조건부 재검증/재추출 횟수 + 구조화 데이터 처리 비율 조회 (개발/디버깅용)"""
+    from utils.recipe_store import recipe_store
+    from utils.recipe_schema import schema_stats
+    from nodes.recipe_search import item_vocabulary
+    from utils.recipe_crawler import recipe_crawler
+    return {**recipe_store.get_metrics(), "extraction": schema_stats.snapshot(),
+            "item_vocabulary": item_vocabulary.get_metrics(), "crawler": recipe_crawler.get_metrics()}
+
+@app.get("/api/admin/recipe-local-index")
+async def get_recipe_local_index_metrics():
+    """로컬 레시피 색인(즐겨찾기 + 크롤링 저장소) 문서 수/적중 수 조회 (개발/디버깅용)"""
+    from nodes.recipe_search import recipe_local_index
+    return recipe_local_index.get_metrics()
+
+@app.get("/api/admin/recipe-prefetch")
+async def get_recipe_prefetch_metrics():
+    """검색 직후 레시피 사전 준비(크롤링/구조화/상품 매칭) 적중률 조회 (개발/디버깅용)"""
+    from nodes.recipe_search import recipe_prefetcher
+    return recipe_prefetcher.get_metrics()
+
+@app.get("/api/admin/cs-evidence")
+async def get_cs_evidence_metrics():
+    """증빙 분석 작업 큐 상태 조회 (개발/디버깅용)"""
+    return evidence_jobs.get_metrics()
+
+@app.get("/api/admin/vision-images")
+async def get_vision_image_metrics():
+    """비전 이미지 전처리 절감 바이트 + 결과 캐시 적중률 지표 조회 (개발/디버깅용)"""
+    return {**preprocess_stats.snapshot(), "result_cache": vision_result_cache.get_metrics()}
+
 def _josa_eul_reul(word: str) -> str:
     if not word:
         return "을"
@@ -204,27 +314,10 @@ async def get_chat_page(request: Request):
     })
 
 def _get_user_display_name(user_id: str) -> str | None:
-    """userinfo_tbl에서 사용자 이름을 조회합니다. 실패 시 None.
-    환경변수(DB_HOST, DB_USER, DB_PASSWORD/DB_PASS, DB_NAME)로 접속합니다.
-    """
-    try:
-        host = os.getenv("DB_HOST", "127.0.0.1")
-        user = os.getenv("DB_USER", "qook_user")
-        password = os.getenv("DB_PASSWORD", os.getenv("DB_PASS", "qook_pass"))
-        database = os.getenv("DB_NAME", "qook_chatbot")
-        port = int(os.getenv("DB_PORT", "3306"))
-        conn = mysql.connector.connect(host=host, user=user, password=password, database=database, port=port)
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT name FROM userinfo_tbl WHERE user_id=%s LIMIT 1", (user_id,))
-                row = cur.fetchone()
-                if row and row[0]:
-                    return str(row[0])
-        finally:
-            if conn and conn.is_connected():
-                conn.close()
-    except Exception:
-        return None
+    """userinfo_tbl 사용자 이름 (프로필 캐시 경유). 실패 시 None."""
+    profile = get_user_profile(user_id)
+    if profile and profile.get("name"):
+        return str(profile["name"])
     return None
 
 from time import time
@@ -235,6 +328,10 @@ LAST_USER_CS    = {}
 
 REFUND_KEYWORDS = ("환불", "교환", "반품")
 
+UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+VISION_UPLOAD_DIR = os.path.join("uploads", "vision")
+EVIDENCE_UPLOAD_DIR = os.path.join("uploads", "evidence")
+
 
 @app.post("/api/chat/vision")
 async def chat_vision_api(
@@ -245,10 +342,16 @@ async def chat_vision_api(
 ):
     """비전 AI 기반 레시피 검색 API"""
     try:
-        image_content = await image.read()
-        import base64
-        image_base64 = base64.b64encode(image_content).decode('utf-8')
-        image_data = f"data:{image.content_type};base64,{image_base64}"
+        # 원본은 전처리에만 쓰고 보관하지 않음 (블록을 벗어나면 삭제)
+        try:
+            async with temporary_upload(image, VISION_UPLOAD_DIR, UPLOAD_MAX_BYTES,
+                                        suffix=os.path.splitext(image.filename or "")[1]) as stored:
+                prepared = await asyncio.get_running_loop().run_in_executor(
+                    None, preprocess_image, stored.path, image.content_type or "image/jpeg")
+        except UploadError as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.message})
+        logger.info(f"비전 이미지 전처리: {prepared.original_bytes}B → {prepared.output_bytes}B, {prepared.elapsed_ms}ms")
+        image_data = prepared.data_url
 
         state = ChatState(
             user_id=user_id,
@@ -381,6 +484,8 @@ async def chat_api(request: Request):
                         'metadata': {'session_id': state.session_id}
                     })
 
+        reset_turn_usage(state.conversation_history)
+
         add_to_history(state, 'user', state.query,
                         message_type='text',
                         intent=state.route.get("target", "unknown"),
@@ -483,9 +588,13 @@ async def chat_api(request: Request):
                         search=final_state.search,
                         cart=final_state.cart,
                         meta=final_state.meta)
-        
+
+        schedule_summary_update(final_state.conversation_history)
         manage_history_length(final_state, max_messages=15)
 
+        turn_usage = get_turn_usage(final_state.conversation_history)
+        logger.info(f"Turn context tokens: total={turn_usage['total']}, by_node={turn_usage['by_node']}")
+
         if final_state.session_id:
             update_session_access(final_state.user_id, final_state.session_id)
 
@@ -498,7 +607,10 @@ async def chat_api(request: Request):
             'recipe': final_state.recipe,
             'order': final_state.order,
             'cs': cs_payload_out,
-            'metadata': {'session_id': final_state.session_id or state.session_id}
+            'metadata': {
+                'session_id': final_state.session_id or state.session_id,
+                'context_tokens': turn_usage
+            }
         }
 
         LAST_USER_MSG[state.user_id]  = (msg_norm, now)
@@ -631,31 +743,33 @@ async def cs_evidence_api(
     quantity: int = Form(1)
 ):
     """
-    주문 상세의 특정 상품 행에서 '사진 업로드' → Vision 분석 → 부분 환불 자동 접수
+    주문 상세의 특정 상품 행에서 '사진 업로드' → 분석 작업 등록 후 job_id 즉시 반환
+    (Vision 분석 → 부분 환불 자동 접수는 워커에서 처리, 결과는 /api/cs/evidence/{job_id}로 조회)
     """
     try:
-        save_dir = os.path.join("uploads", "evidence")
-        os.makedirs(save_dir, exist_ok=True)
-        filename = f"{order_code}_{uuid.uuid4().hex[:8]}_{image.filename}"
-        save_path = os.path.join(save_dir, filename)
-
+        stored = await save_upload(image, EVIDENCE_UPLOAD_DIR, UPLOAD_MAX_BYTES,
+                                   suffix=os.path.splitext(image.filename or "")[1])
 
-        with open(save_path, "wb") as f:
-            f.write(await image.read())
-
-        state = ChatState(user_id=user_id, query=f"Evidence for {product}", attachments=[save_path])
-        result = handle_partial_refund(
-            state,
-            order_code=order_code,
-            product=product,
-            request_qty=int(quantity or 1),
-        )
-        return JSONResponse(content=result)
+        job_id = await asyncio.get_running_loop().run_in_executor(
+            None, evidence_jobs.submit, user_id, order_code, product, int(quantity or 1), str(stored.path))
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued"})
 
+    except UploadError as e:
+        return JSONResponse(status_code=e.status_code, content={"detail": e.message})
+    except EvidenceQueueFull:
+        return JSONResponse(status_code=503, content={"detail": "증빙 분석 요청이 많아요. 잠시 후 다시 시도해주세요."})
     except Exception as e:
         logger.error(f"CS evidence API error: {e}", exc_info=True)
         return JSONResponse(status_code=500, content={"detail": "증빙 이미지 처리 중 오류"})
 
+@app.get("/api/cs/evidence/{job_id}")
+async def cs_evidence_status_api(job_id: str, user_id: str):
+    """증빙 분석 작업 상태 조회 (queued/running/done/failed, done이면 result 포함)"""
+    job = await asyncio.get_running_loop().run_in_executor(None, evidence_jobs.get, job_id, user_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"detail": "작업을 찾을 수 없습니다."})
+    return JSONResponse(content=jsonable_encoder(job))
+
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=5001)
@@ -11,7 +11,8 @@ import os
 import mysql.connector
 from mysql.connector import Error
 
-from auth_system.django_auth import auth_manager
+from auth_system.django_auth import auth_manager, auth_pool, AuthQueueFull
+from utils.user_profile_cache import invalidate_user_profile
 from utils import db_audit
 
 logger = logging.getLogger(__name__)
@@ -200,6 +201,7 @@ async def select_membership(payload: MembershipSelect, user_id: str = Depends(ve
                     (user_id, payload.membership)
                 )
             conn.commit()
+            invalidate_user_profile(user_id)
         return {"success": True, "membership": payload.membership}
     except HTTPException:
         raise
@@ -243,7 +245,9 @@ async def register(user_data: UserRegistration, response: Response):
             raise HTTPException(status_code=400, detail="비밀번호는 8자 이상이어야 합니다.")
 
         try:
-            result = auth_manager.create_user(payload)
+            result = await auth_pool.submit(auth_manager.create_user, payload)
+        except AuthQueueFull:
+            raise HTTPException(status_code=503, detail="요청이 많아 잠시 후 다시 시도해주세요.")
         except Exception as e:
             logger.error(f"회원가입 내부 오류(데이터 검증/DB): {e}")
             raise HTTPException(status_code=400, detail="요청 데이터가 올바르지 않거나 처리 중 오류가 발생했습니다.")
@@ -281,7 +285,10 @@ async def register(user_data: UserRegistration, response: Response):
 async def login(user_login: UserLogin, response: Response, request: Request):
     """로그인"""
     try:
-        result = auth_manager.authenticate_user(user_login.email, user_login.password)
+        try:
+            result = await auth_pool.submit(auth_manager.authenticate_user, user_login.email, user_login.password)
+        except AuthQueueFull:
+            raise HTTPException(status_code=503, detail="로그인 요청이 많아 잠시 후 다시 시도해주세요.")
 
         if result["success"]:
             user = result["user"]
@@ -388,6 +395,7 @@ async def get_profile(user_id: str = Depends(verify_token)):
 async def update_profile(profile_data: ProfileUpdate, user_id: str = Depends(verify_token)):
     """사용자 프로필 업데이트"""
     try:
+        invalidate_user_profile(user_id)
         return {
             "success": True,
             "message": "프로필이 업데이트되었습니다"
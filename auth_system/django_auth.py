@@ -1,29 +1,109 @@
 import hashlib
+import hmac
+import base64
+import secrets
 import uuid
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 from mysql.connector import Error
 from utils.db import get_db_connection as _get_db_connection
 import logging
 
 logger = logging.getLogger(__name__)
 
+PASSWORD_HASH_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "100000"))
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "4"))
+AUTH_HASH_MAX_QUEUE = int(os.getenv("AUTH_HASH_MAX_QUEUE", "64"))
+
+
+class AuthQueueFull(Exception):
+    """인증(비밀번호 해싱) 대기열이 가득 참"""
+
+
+class AuthWorkerPool:
+    """
+    비밀번호 해싱이 포함된 인증 작업 전용 스레드 풀
+    - PBKDF2는 수십 ms CPU 작업이라 이벤트 루프에서 직접 돌리면 다른 요청(채팅 등)이 함께 멈춤
+    - hashlib.pbkdf2_hmac은 GIL을 풀고 계산하므로 스레드 풀로 충분
+    - 대기 + 실행 중 작업이 max_queue를 넘으면 AuthQueueFull (로그인 폭주 시 빠르게 503)
+    """
+
+    def __init__(self, workers: int = AUTH_HASH_WORKERS, max_queue: int = AUTH_HASH_MAX_QUEUE):
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+
+    async def submit(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                raise AuthQueueFull(f"인증 대기열 초과 ({self.max_queue})")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"pending": self._pending, "max_queue": self.max_queue, "rejected": self._rejected}
+
+
 class DjangoAuthManager:
     """Django 스타일 인증 관리자"""
     
-    def __init__(self):
+    def __init__(self, iterations: int = PASSWORD_HASH_ITERATIONS):
         self.salt = "qook_chatbot_salt"
+        self.iterations = iterations
     
-    def hash_password(self, password: str) -> str:
-        """Django 스타일 비밀번호 해싱"""
+    def _legacy_hash(self, password: str) -> str:
+        """고정 솔트 + 100,000회 hex 해시 (기존 가입자 호환용)"""
         return hashlib.pbkdf2_hmac('sha256', 
                                  password.encode('utf-8'), 
                                  self.salt.encode('utf-8'), 
                                  100000).hex()
     
+    def hash_password(self, password: str, salt: str = None, iterations: int = None) -> str:
+        """
+        Django 스타일 비밀번호 해싱
+        - 형식: pbkdf2_sha256$<iterations>$<salt>$<base64 hash>
+        - 사용자별 솔트/반복 횟수가 해시 문자열에 함께 저장되어, 반복 횟수를 바꿔도 기존 해시는 그대로 검증됨
+        """
+        salt = salt or secrets.token_urlsafe(16)
+        iterations = iterations or self.iterations
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations)
+        return f"{PASSWORD_HASH_ALGORITHM}${iterations}${salt}${base64.b64encode(digest).decode('ascii')}"
+    
     def verify_password(self, password: str, hashed: str) -> bool:
-        """비밀번호 검증"""
-        return self.hash_password(password) == hashed
+        """비밀번호 검증 (저장된 해시의 파라미터 사용, 기존 hex 해시도 지원)"""
+        if not hashed:
+            return False
+        if hashed.startswith(f"{PASSWORD_HASH_ALGORITHM}$"):
+            try:
+                _, iterations, salt, _digest = hashed.split("$", 3)
+                candidate = self.hash_password(password, salt=salt, iterations=int(iterations))
+            except ValueError:
+                return False
+            return hmac.compare_digest(candidate, hashed)
+        return hmac.compare_digest(self._legacy_hash(password), hashed)
+    
+    def needs_rehash(self, hashed: str) -> bool:
+        """기존 hex 해시이거나 반복 횟수가 현재 설정과 다르면 로그인 시 재해싱"""
+        if not hashed or not hashed.startswith(f"{PASSWORD_HASH_ALGORITHM}$"):
+            return True
+        try:
+            return int(hashed.split("$", 2)[1]) != self.iterations
+        except ValueError:
+            return True
     
     def check_email_exists(self, email: str) -> bool:
         """이메일 중복 확인"""
@@ -145,6 +225,9 @@ class DjangoAuthManager:
 
                 cursor.execute("UPDATE auth_user SET last_login = %s WHERE id = %s", 
                              (datetime.now(), user['user_id']))
+                if self.needs_rehash(user['password']):
+                    cursor.execute("UPDATE auth_user SET password = %s WHERE id = %s",
+                                   (self.hash_password(password), user['user_id']))
                 conn.commit()
                 
                 return {
@@ -202,3 +285,50 @@ class DjangoAuthManager:
         return conn
 
 auth_manager = DjangoAuthManager()
+auth_pool = AuthWorkerPool()
+
+
+if __name__ == "__main__":
+    # 로그인 폭주 중 이벤트 루프 지연 측정: python -m auth_system.django_auth [logins]
+    import sys
+    import time
+    import statistics
+
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    async def chat_probe(stop: asyncio.Event, lags: list):
+        """채팅 요청 대용 - 5ms마다 깨어나 예정보다 늦어진 시간을 기록"""
+        while not stop.is_set():
+            expected = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            lags.append((time.perf_counter() - expected) * 1000)
+
+    async def login_storm(offload: bool):
+        lags, stop = [], asyncio.Event()
+        probe = asyncio.create_task(chat_probe(stop, lags))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+
+        async def one_login():
+            if offload:
+                await auth_pool.submit(auth_manager.hash_password, "password1234")
+            else:
+                auth_manager.hash_password("password1234")
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+        lags.sort()
+        return {
+            "mode": "pool" if offload else "inline",
+            "logins": logins,
+            "storm_s": round(elapsed, 2),
+            "probe_p50_ms": round(statistics.median(lags), 2),
+            "probe_p99_ms": round(lags[int(len(lags) * 0.99) - 1], 2),
+            "probe_max_ms": round(lags[-1], 2),
+        }
+
+    for offload in (False, True):
+        print(asyncio.run(login_storm(offload)))
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
 import aiohttp
+import asyncio
 import logging
+import time
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +23,96 @@ class AddressSearchResponse(BaseModel):
     total_count: int
     message: Optional[str] = None
 
-KAKAO_REST_API_KEY = "YOUR_KAKAO_REST_API_KEY"
+KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY", "YOUR_KAKAO_REST_API_KEY")
+KAKAO_HTTP_LIMIT = int(os.getenv("KAKAO_HTTP_LIMIT", "20"))
+KAKAO_HTTP_TIMEOUT = float(os.getenv("KAKAO_HTTP_TIMEOUT", "5"))
+KAKAO_ADDRESS_CACHE_TTL = int(os.getenv("KAKAO_ADDRESS_CACHE_TTL", "600"))
+KAKAO_ADDRESS_CACHE_MAX_ENTRIES = int(os.getenv("KAKAO_ADDRESS_CACHE_MAX_ENTRIES", "2000"))
+# 모의 응답에 인위적 지연을 넣어 로컬 벤치마크용 대역으로 사용
+KAKAO_MOCK_LATENCY_MS = int(os.getenv("KAKAO_MOCK_LATENCY_MS", "0"))
 
 class KakaoAddressService:
-    """Kakao 주소 검색 서비스"""
+    """
+    Kakao 주소 검색 서비스
+
+    - 앱 수명 동안 ClientSession 하나를 재사용 (연결 수 제한, DNS 캐시, keep-alive)
+    - (query, page, size) 결과를 LRU + TTL 캐시 (성공 응답만)
+    - 같은 키로 진행 중인 요청이 있으면 새로 호출하지 않고 그 결과를 함께 기다림
+    """
     
     def __init__(self):
         self.api_key = KAKAO_REST_API_KEY
         self.base_url = "https://dapi.kakao.com/v2/local/search/address"
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._cache: "OrderedDict[Tuple[str, int, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int, int], asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "deduped": 0, "upstream_calls": 0}
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=KAKAO_HTTP_LIMIT, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=KAKAO_HTTP_TIMEOUT),
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _cache_get(self, key: Tuple[str, int, int]) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if not entry:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > KAKAO_ADDRESS_CACHE_TTL:
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return result
+    
+    def _cache_put(self, key: Tuple[str, int, int], result: Dict[str, Any]) -> None:
+        self._cache[key] = (time.time(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > KAKAO_ADDRESS_CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
     
     async def search_address(self, query: str, page: int = 1, size: int = 10) -> Dict[str, Any]:
+        """주소 검색 (캐시 → 진행 중 요청 합류 → API 호출)"""
+        key = (" ".join((query or "").split()).lower(), int(page or 1), int(size or 10))
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached
+        
+        self._stats["misses"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_cache(key, query, page, size))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            self._stats["deduped"] += 1
+        return await asyncio.shield(task)
+    
+    async def _fetch_and_cache(self, key: Tuple[str, int, int], query: str, page: int, size: int) -> Dict[str, Any]:
+        self._stats["upstream_calls"] += 1
+        result = await self._fetch_address(query, page, size)
+        if result.get("success"):
+            self._cache_put(key, result)
+        return result
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "cache_size": len(self._cache),
+            "inflight": len(self._inflight),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+        }
+    
+    async def _fetch_address(self, query: str, page: int = 1, size: int = 10) -> Dict[str, Any]:
         """주소 검색 API 호출"""
         
         if not self.api_key or self.api_key == "YOUR_KAKAO_REST_API_KEY":
@@ -47,21 +131,23 @@ class KakaoAddressService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._format_address_response(data)
-                    else:
-                        logger.error(f"Kakao API 오류: {response.status}")
-                        return {"success": False, "error": "주소 검색 API 호출 실패"}
-                        
+            session = self._get_session()
+            async with session.get(self.base_url, headers=headers, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return self._format_address_response(data)
+                else:
+                    logger.error(f"Kakao API 오류: {response.status}")
+                    return {"success": False, "error": "주소 검색 API 호출 실패"}
+                    
         except Exception as e:
             logger.error(f"주소 검색 중 오류 발생: {e}")
             return {"success": False, "error": "주소 검색 중 오류가 발생했습니다"}
     
     async def _mock_address_search(self, query: str) -> Dict[str, Any]:
-        """모의 주소 검색 결과 (API 키 없을 때)"""
+        """모의 주소 검색 결과 (API 키 없을 때, KAKAO_MOCK_LATENCY_MS로 네트워크 지연 흉내)"""
+        if KAKAO_MOCK_LATENCY_MS:
+            await asyncio.sleep(KAKAO_MOCK_LATENCY_MS / 1000)
         
         mock_addresses = [
             {
@@ -210,4 +296,34 @@ async def validate_postal_code(zone_no: str):
         
     except Exception as e:
         logger.error(f"우편번호 검증 중 오류: {e}")
-        raise HTTPException(status_code=500, detail="우편번호 검증 중 오류가 발생했습니다")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="우편번호 검증 중 오류가 발생했습니다")
+
+if __name__ == "__main__":
+    # 입력 중 자동완성 트래픽 흉내: KAKAO_MOCK_LATENCY_MS=80 python -m auth_system.kakao_address
+    import statistics
+
+    async def _bench(users: int = 20, word: str = "서울 강남구 테헤란로"):
+        service = KakaoAddressService()
+        latencies = []
+
+        async def typing_user():
+            for i in range(1, len(word) + 1):
+                started = time.perf_counter()
+                await service.search_address(word[:i])
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(typing_user() for _ in range(users)))
+        elapsed = time.perf_counter() - started
+        await service.close()
+        latencies.sort()
+        print({
+            "requests": len(latencies),
+            "mock_latency_ms": KAKAO_MOCK_LATENCY_MS,
+            "elapsed_s": round(elapsed, 2),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+            **service.get_metrics(),
+        })
+
+    asyncio.run(_bench())
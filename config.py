@@ -14,6 +14,9 @@ class Config:
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", 'gpt-4o-mini')
+
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 600))
+    SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", 6))
     
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT = os.getenv("LOG_FORMAT", '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
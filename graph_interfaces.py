@@ -1,5 +1,6 @@
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
+from utils.conversation_buffer import ConversationHistory
 
 @dataclass
 class ChatState:
@@ -9,7 +10,7 @@ class ChatState:
     response: Optional[str] = None
     turn_id: int = 0
     attachments: List[str] = field(default_factory=list)
-    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+    conversation_history: List[Dict[str, Any]] = field(default_factory=ConversationHistory)
     user_context: Dict[str, Any] = field(default_factory=dict)
     image: Optional[str] = None
     vision_mode: bool = False
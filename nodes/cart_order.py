@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from graph_interfaces import ChatState
 from utils.chat_history import summarize_cart_actions_with_history, summarize_product_search_with_history 
 from utils.db import get_db_connection
+from utils.user_profile_cache import get_user_profile
 
 logger = logging.getLogger("D_CART_ORDER_DB")
 
@@ -358,41 +359,21 @@ def _calculate_totals(cart: Dict[str, Any], benefits: Optional[Dict[str, Any]] =
     cart["total"] = max(0, subtotal + shipping_fee - total_discount)
 
 def _get_membership_benefits(user_id: str) -> Dict[str, Any]:
-    conn = get_db_connection()
-
-    try:
-        with conn.cursor(dictionary=True) as cursor:
-            cursor.execute(
-                """
-                SELECT ud.membership AS membership_name,
-                       COALESCE(m.discount_rate, 0) AS discount_rate,
-                       COALESCE(m.free_shipping_threshold, 30000) AS free_shipping_threshold
-                FROM user_detail_tbl ud
-                LEFT JOIN membership_tbl m ON ud.membership = m.membership_name
-                WHERE ud.user_id = %s
-                """,
-                (user_id,),
-            )
-            row = cursor.fetchone() or {}
-            name = str(row.get("membership_name") or "basic").lower()
-           
-            rate = float(row.get("discount_rate") or 0.0)
-            thr = float(row.get("free_shipping_threshold"))
-            
-            return {
-                "discount_rate": rate,
-                "free_shipping_threshold": thr,
-                "meta": {
-                    "membership_name": name,
-                    "discount_rate": rate,
-                    "free_shipping_threshold": thr,
-                },
-            }
-    except Error:
-        pass
-    finally:
-        if conn and conn.is_connected():
-            conn.close()
+    """멤버십 혜택 (사용자 프로필 캐시 경유, 프로필이 없으면 basic 기본값)"""
+    profile = get_user_profile(user_id) or {}
+    name = str(profile.get("membership") or "basic").lower()
+    rate = float(profile.get("discount_rate") or 0.0)
+    thr = profile.get("free_shipping_threshold")
+    thr = float(30000 if thr is None else thr)
+    return {
+        "discount_rate": rate,
+        "free_shipping_threshold": thr,
+        "meta": {
+            "membership_name": name,
+            "discount_rate": rate,
+            "free_shipping_threshold": thr,
+        },
+    }
 
 def checkout(state: ChatState) -> Dict[str, Any]:
     """체크아웃 및 주문 처리 (개선된 버전 - 특정 상품 선택 지원)"""
@@ -536,23 +517,10 @@ def _process_selective_order(state: ChatState, selected_items: List[Dict[str, An
 
         subtotal = sum(float(item['unit_price']) * int(item['qty']) for item in selected_items)
 
-        cursor.execute("""
-            SELECT 
-                COALESCE(m.membership_name, 'basic')                AS tier_name,
-                COALESCE(m.discount_rate, 0)                        AS discount_rate,
-                COALESCE(m.free_shipping_threshold, 30000)          AS free_ship_threshold
-            FROM user_detail_tbl ud
-            LEFT JOIN membership_tbl m
-                ON m.membership_name = ud.membership
-            WHERE ud.user_id = %s
-            LIMIT 1
-        """, (user_id,))
-        row = cursor.fetchone()
-
-        if row:
-            membership_tier, discount_rate, free_ship_threshold = row
-        else:
-            membership_tier, discount_rate, free_ship_threshold = ('basic', 0.0, 30000)
+        benefits = _get_membership_benefits(user_id)
+        membership_tier = benefits["meta"]["membership_name"]
+        discount_rate = benefits["discount_rate"]
+        free_ship_threshold = benefits["free_shipping_threshold"]
 
         discount_amount = int(subtotal * float(discount_rate))           
         BASE_SHIPPING_FEE = 3000
@@ -659,23 +627,10 @@ def order_process(state: ChatState) -> Dict[str, Any]:
         if subtotal is None:
             subtotal = sum(float(i["unit_price"]) * int(i["qty"]) for i in state.cart.get("items", []))
 
-        cursor.execute("""
-            SELECT 
-                COALESCE(m.membership_name, 'basic')                AS tier_name,
-                COALESCE(m.discount_rate, 0)                        AS discount_rate,
-                COALESCE(m.free_shipping_threshold, 30000)          AS free_ship_threshold
-            FROM user_detail_tbl ud
-            LEFT JOIN membership_tbl m
-                ON m.membership_name = ud.membership
-            WHERE ud.user_id = %s
-            LIMIT 1
-        """, (user_id,))
-        row = cursor.fetchone()
-
-        if row:
-            membership_tier, discount_rate, free_ship_threshold = row
-        else:
-            membership_tier, discount_rate, free_ship_threshold = ('basic', 0.0, 30000)
+        benefits = _get_membership_benefits(user_id)
+        membership_tier = benefits["meta"]["membership_name"]
+        discount_rate = benefits["discount_rate"]
+        free_ship_threshold = benefits["free_shipping_threshold"]
 
         discount_amount = int(subtotal * float(discount_rate))          
         BASE_SHIPPING_FEE = 3000
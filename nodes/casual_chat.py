@@ -15,6 +15,7 @@ from utils.chat_history import (
     get_recent_context,
     get_contextual_analysis
 )
+from utils.context_builder import record_context_tokens, estimate_tokens
 
 logger = logging.getLogger("CASUAL_CHAT")
 
@@ -96,6 +97,7 @@ def generate_contextual_response_llm(query: str, history: List[Dict], emotion_an
 
         contextual_analysis = get_contextual_analysis(history, query)
         recent_context = get_recent_context(history, turns=3) if history else "새로운 대화"
+        record_context_tokens(history, "casual_chat", estimate_tokens(recent_context))
 
         is_empty_history = recent_context == "새로운 대화"
 
@@ -0,0 +1,149 @@
+import os
+import time
+import math
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger("E_CS_ANSWER_CACHE")
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FAQ_CACHE_THRESHOLD = float(os.getenv("FAQ_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+FAQ_CACHE_MAX_ENTRIES = int(os.getenv("FAQ_SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+FAQ_CACHE_TTL_SEC = int(os.getenv("FAQ_SEMANTIC_CACHE_TTL", "86400"))
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join((text or "").lower().split()).rstrip("?!. ")
+
+
+def _unit(vector: List[float]):
+    if np is not None:
+        v = np.asarray(vector, dtype=np.float32)
+        n = float(np.linalg.norm(v))
+        return v / n if n else v
+    n = math.sqrt(sum(x * x for x in vector))
+    return [x / n for x in vector] if n else list(vector)
+
+
+def _dot(a, b) -> float:
+    if np is not None:
+        return float(np.dot(a, b))
+    return sum(x * y for x, y in zip(a, b))
+
+
+class SemanticAnswerCache:
+    """
+    FAQ 답변 시맨틱 캐시
+
+    - (질문 임베딩, 답변, 인용, 문서 버전)을 저장하고 코사인 유사도가 threshold 이상이면 재사용
+    - 저장 당시 문서 버전과 현재 버전이 다르면 stale로 보고 폐기
+    - 정규화된 질문 문자열이 완전히 같으면 임베딩 호출 없이 바로 조회
+    """
+
+    def __init__(self, threshold: float = FAQ_CACHE_THRESHOLD, max_entries: int = FAQ_CACHE_MAX_ENTRIES,
+                 ttl_sec: int = FAQ_CACHE_TTL_SEC):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._by_text: Dict[str, int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "text_hits": 0, "misses": 0, "stale": 0, "expired": 0, "stores": 0}
+
+    def _drop(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry and self._by_text.get(entry["text_key"]) == entry_id:
+            self._by_text.pop(entry["text_key"], None)
+
+    def _is_valid(self, entry_id: int, entry: Dict[str, Any], version: str, now: float) -> bool:
+        if entry["version"] != version:
+            self._stats["stale"] += 1
+            self._drop(entry_id)
+            return False
+        if self.ttl_sec and now - entry["created_at"] > self.ttl_sec:
+            self._stats["expired"] += 1
+            self._drop(entry_id)
+            return False
+        return True
+
+    def lookup_text(self, query: str, version: str) -> Optional[Dict[str, Any]]:
+        """정규화 문자열 완전 일치 조회 (임베딩 전 단계)"""
+        key = _normalize_text(query)
+        with self._lock:
+            entry_id = self._by_text.get(key)
+            if entry_id is None:
+                return None
+            entry = self._entries.get(entry_id)
+            if not entry or not self._is_valid(entry_id, entry, version, time.time()):
+                return None
+            self._entries.move_to_end(entry_id)
+            self._stats["hits"] += 1
+            self._stats["text_hits"] += 1
+            return {"answer": entry["answer"], "citations": entry["citations"], "similarity": 1.0}
+
+    def lookup(self, query: str, embedding: List[float], version: str) -> Optional[Dict[str, Any]]:
+        """임베딩 유사도 조회 - threshold 이상 중 최고 유사도 항목 반환"""
+        vector = _unit(embedding)
+        now = time.time()
+        with self._lock:
+            best_id, best_score = None, -1.0
+            for entry_id, entry in list(self._entries.items()):
+                if not self._is_valid(entry_id, entry, version, now):
+                    continue
+                score = _dot(vector, entry["vector"])
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None or best_score < self.threshold:
+                self._stats["misses"] += 1
+                return None
+
+            entry = self._entries[best_id]
+            self._entries.move_to_end(best_id)
+            self._by_text.setdefault(_normalize_text(query), best_id)
+            self._stats["hits"] += 1
+            return {"answer": entry["answer"], "citations": entry["citations"], "similarity": best_score}
+
+    def store(self, query: str, embedding: List[float], answer: str, citations: List[str], version: str) -> None:
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            text_key = _normalize_text(query)
+            self._entries[entry_id] = {
+                "text_key": text_key,
+                "vector": _unit(embedding),
+                "answer": answer,
+                "citations": list(citations or []),
+                "version": version,
+                "created_at": time.time()
+            }
+            self._by_text[text_key] = entry_id
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._drop(oldest_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_text.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "threshold": self.threshold,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+faq_answer_cache = SemanticAnswerCache()
@@ -52,6 +52,23 @@ except Exception:
     pinecone_index = None
     logger.warning("Pinecone package not available.")
 
+FAQ_VECTOR_BACKEND = os.getenv("FAQ_VECTOR_BACKEND", "auto").lower()
+
+try:
+    from nodes.cs_vector_index import LocalVectorIndex
+
+    local_vector_index = LocalVectorIndex()
+    if not local_vector_index.load():
+        local_vector_index = None
+except Exception as e:
+    local_vector_index = None
+    logger.warning(f"Local vector index not available: {e}")
+
+if FAQ_VECTOR_BACKEND == "local" or (FAQ_VECTOR_BACKEND == "auto" and local_vector_index is not None):
+    vector_index = local_vector_index or pinecone_index
+else:
+    vector_index = pinecone_index or local_vector_index
+
 
 def _to_float(val: Any) -> float:
     if val is None:
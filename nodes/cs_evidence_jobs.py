@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from mysql.connector import Error
+
+from graph_interfaces import ChatState
+from .cs_common import get_db_connection
+from .cs_refund import handle_partial_refund_with_image
+
+logger = logging.getLogger("E_CS_EVIDENCE_JOBS")
+
+CS_EVIDENCE_WORKERS = int(os.getenv("CS_EVIDENCE_WORKERS", "2"))
+CS_EVIDENCE_MAX_PENDING = int(os.getenv("CS_EVIDENCE_MAX_PENDING", "50"))
+CS_EVIDENCE_JOB_TTL = int(os.getenv("CS_EVIDENCE_JOB_TTL", "3600"))
+# 이 시간이 지나도 queued/running인 작업은 프로세스 재시작 등으로 유실된 것으로 보고 failed 처리
+CS_EVIDENCE_STALE_SEC = int(os.getenv("CS_EVIDENCE_STALE_SEC", "600"))
+STALE_ERROR = "증빙 분석이 중단되었습니다. 다시 업로드해주세요."
+
+
+class EvidenceQueueFull(Exception):
+    """대기 중인 증빙 분석 작업이 한도를 넘음"""
+
+
+class EvidenceJobQueue:
+    """
+    환불 증빙 이미지 분석 작업 큐
+
+    - submit()은 작업을 등록하고 job_id만 즉시 반환 (업로드 응답 시간이 Vision 모델 속도와 무관)
+    - 작업은 CS_EVIDENCE_WORKERS 크기 스레드 풀에서 handle_partial_refund_with_image 실행
+    - 상태: queued → running → done | failed, 완료 후 CS_EVIDENCE_JOB_TTL 동안 결과 조회 가능
+    - 상태는 cs_evidence_job_tbl에도 기록 (uvicorn 워커가 여러 개여도 어느 워커에서든 조회 가능)
+      · 작업을 받은 워커는 메모리 사본으로 바로 응답, 다른 워커는 테이블에서 조회
+      · submit()/get()은 DB를 쓰므로 async 핸들러에서는 run_in_executor로 호출
+      · 시작 시 fail_stale_jobs()로 재시작 전에 남은 queued/running 작업을 failed로 정리
+    """
+
+    def __init__(self, workers: int = CS_EVIDENCE_WORKERS, max_pending: int = CS_EVIDENCE_MAX_PENDING,
+                 ttl_sec: int = CS_EVIDENCE_JOB_TTL, connection_factory=get_db_connection,
+                 stale_sec: int = CS_EVIDENCE_STALE_SEC):
+        self.max_pending = max_pending
+        self.ttl_sec = ttl_sec
+        self.stale_sec = stale_sec
+        self._connection_factory = connection_factory
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cs-evidence")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["finished_at"] and now - job["finished_at"] > self.ttl_sec]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+
+    def _db_execute(self, sql: str, params: tuple) -> bool:
+        conn = self._connection_factory()
+        if not conn:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+            conn.commit()
+            return True
+        except Error as e:
+            logger.error(f"증빙 분석 작업 상태 기록 실패: {e}")
+            return False
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+    def _db_get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connection_factory()
+        if not conn:
+            return None
+        try:
+            with conn.cursor(dictionary=True) as cursor:
+                cursor.execute(
+                    "SELECT job_id, user_id, status, result, error, created_at "
+                    "FROM cs_evidence_job_tbl WHERE job_id=%s",
+                    (job_id,)
+                )
+                row = cursor.fetchone()
+        except Error as e:
+            logger.error(f"증빙 분석 작업 상태 조회 실패: {e}")
+            return None
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+        if not row:
+            return None
+        result = row.get("result")
+        if isinstance(result, (bytes, bytearray)):
+            result = result.decode("utf-8")
+        row["result"] = json.loads(result) if isinstance(result, str) else result
+        created_at = row.get("created_at")
+        if (row["status"] in ("queued", "running") and isinstance(created_at, datetime)
+                and time.time() - created_at.timestamp() > self.stale_sec):
+            row.update(status="failed", error=STALE_ERROR)
+        return row
+
+    def fail_stale_jobs(self) -> bool:
+        """오래된 queued/running 행을 failed로 (재시작으로 실행 스레드를 잃은 작업을 클라이언트가 계속 조회하지 않도록)"""
+        now = datetime.now()
+        cutoff = datetime.fromtimestamp(time.time() - self.stale_sec)
+        return self._db_execute(
+            "UPDATE cs_evidence_job_tbl SET status='failed', error=%s, finished_at=%s "
+            "WHERE status IN ('queued', 'running') AND created_at < %s",
+            (STALE_ERROR, now, cutoff)
+        )
+
+    def submit(self, user_id: str, order_code: str, product: str, quantity: int, image_path: str) -> str:
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            pending = sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise EvidenceQueueFull(f"증빙 분석 대기열 초과 ({self.max_pending})")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "user_id": user_id,
+                "order_code": order_code,
+                "product": product,
+                "status": "queued",
+                "created_at": now,
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+        self._db_execute("DELETE FROM cs_evidence_job_tbl WHERE finished_at < %s",
+                         (datetime.fromtimestamp(now - self.ttl_sec),))
+        self.fail_stale_jobs()
+        if not self._db_execute(
+            "INSERT INTO cs_evidence_job_tbl (job_id, user_id, order_code, product, status, created_at) "
+            "VALUES (%s, %s, %s, %s, 'queued', %s)",
+            (job_id, user_id, order_code, product, datetime.fromtimestamp(now))
+        ):
+            logger.warning(f"증빙 분석 작업 {job_id}: 상태 테이블 기록 실패, 이 워커에서만 조회 가능")
+        self._executor.submit(self._run, job_id, user_id, order_code, product, quantity, image_path)
+        return job_id
+
+    def _run(self, job_id: str, user_id: str, order_code: str, product: str, quantity: int, image_path: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            job["status"] = "running"
+            job["started_at"] = time.time()
+        self._db_execute("UPDATE cs_evidence_job_tbl SET status='running', started_at=%s WHERE job_id=%s",
+                         (datetime.fromtimestamp(job["started_at"]), job_id))
+        try:
+            state = ChatState(user_id=user_id, query=f"Evidence for {product}", attachments=[image_path])
+            result = handle_partial_refund_with_image(
+                state,
+                order_code=order_code,
+                product=product,
+                request_qty=int(quantity or 1),
+            )
+            status, error = "done", None
+        except Exception as e:
+            logger.error(f"증빙 분석 작업 실패 {job_id}: {e}", exc_info=True)
+            result, status, error = None, "failed", "증빙 이미지 처리 중 오류"
+
+        finished_at = time.time()
+        self._db_execute(
+            "UPDATE cs_evidence_job_tbl SET status=%s, result=%s, error=%s, finished_at=%s WHERE job_id=%s",
+            (status, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+             error, datetime.fromtimestamp(finished_at), job_id)
+        )
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(status=status, result=result, error=error, finished_at=finished_at)
+                logger.info(f"증빙 분석 작업 {status}: {job_id}, "
+                            f"대기 {job['started_at'] - job['created_at']:.2f}s, "
+                            f"처리 {job['finished_at'] - job['started_at']:.2f}s")
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            job = dict(job) if job else None
+        if job is None:
+            job = self._db_get(job_id)
+        if not job or (user_id is not None and job["user_id"] != user_id):
+            return None
+        payload = {"job_id": job_id, "status": job["status"]}
+        if job["status"] == "done":
+            payload["result"] = job["result"]
+        elif job["status"] == "failed":
+            payload["error"] = job["error"]
+        return payload
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            # 요청을 처리한 워커 프로세스 기준 집계
+            return {"jobs": counts, "max_pending": self.max_pending, "pid": os.getpid()}
+
+
+evidence_jobs = EvidenceJobQueue()
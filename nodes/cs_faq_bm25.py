@@ -0,0 +1,176 @@
+import os
+import re
+import math
+import time
+import heapq
+import logging
+import threading
+from dataclasses import dataclass, field
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from mysql.connector import Error
+
+logger = logging.getLogger("E_CS_FAQ_BM25")
+
+FAQ_BM25_REFRESH_SEC = int(os.getenv("FAQ_BM25_REFRESH_SEC", "60"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+QUESTION_WEIGHT = 2
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """공백 단어 + 한글 음절 bigram (조사가 붙은 어절도 부분 일치되도록)"""
+    tokens: List[str] = []
+    for word in _TOKEN_SPLIT.split((text or "").lower()):
+        if not word:
+            continue
+        tokens.append(word)
+        if len(word) >= 3:
+            tokens.extend(f"#{word[i:i + 2]}" for i in range(len(word) - 1))
+        elif len(word) == 2:
+            tokens.append(f"#{word}")
+    return tokens
+
+
+@dataclass(frozen=True)
+class _FaqIndexSnapshot:
+    """한 번에 교체되는 색인 상태 (검색 중 재구축돼도 같은 버전의 문서/역색인만 읽도록)"""
+    docs: List[Dict[str, Any]] = field(default_factory=list)
+    postings: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    question_terms: List[set] = field(default_factory=list)
+    doc_len: List[int] = field(default_factory=list)
+    avg_len: float = 0.0
+    idf: Dict[str, float] = field(default_factory=dict)
+    max_idf: float = 0.0
+
+
+class FaqBM25Index:
+    """
+    faq_tbl 질문/답변 BM25 역색인
+
+    - 최초 검색 시 한 번 로드하고, FAQ_BM25_REFRESH_SEC마다 테이블 시그니처를 확인해 바뀐 경우에만 재구축
+    - search()는 BM25 점수와 함께 질문 기준 IDF 가중 질의어 커버리지 confidence(0~1)를 반환
+    """
+
+    def __init__(self, connection_factory, refresh_sec: int = FAQ_BM25_REFRESH_SEC):
+        self._connection_factory = connection_factory
+        self.refresh_sec = refresh_sec
+        self._snapshot = _FaqIndexSnapshot()
+        self._signature: Optional[tuple] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch_signature(self, cursor) -> tuple:
+        cursor.execute(
+            """
+            SELECT COUNT(*), COALESCE(MAX(faq_id), 0),
+                   COALESCE(SUM(CRC32(CONCAT_WS('|', question, answer, faq_category))), 0)
+            FROM faq_tbl
+            """
+        )
+        return tuple(cursor.fetchone() or ())
+
+    def ensure_fresh(self) -> None:
+        now = time.time()
+        if self._signature is not None and now - self._last_check < self.refresh_sec:
+            return
+        with self._lock:
+            if self._signature is not None and now - self._last_check < self.refresh_sec:
+                return
+            self._last_check = now
+            conn = self._connection_factory()
+            if not conn:
+                return
+            try:
+                with conn.cursor() as cursor:
+                    signature = self._fetch_signature(cursor)
+                if signature == self._signature:
+                    return
+                with conn.cursor(dictionary=True) as cursor:
+                    cursor.execute("SELECT faq_id as id, question, answer, faq_category as category FROM faq_tbl")
+                    rows = cursor.fetchall()
+                self._build(rows)
+                self._signature = signature
+                logger.info(f"FAQ BM25 인덱스 재구축: {len(rows)}개 문서")
+            except Error as e:
+                logger.error(f"FAQ BM25 인덱스 갱신 실패: {e}")
+            finally:
+                if conn and conn.is_connected():
+                    conn.close()
+
+    def version(self) -> Optional[str]:
+        """faq_tbl 시그니처(행 수/최대 ID/CRC32 합) 문자열, 아직 한 번도 조회하지 못했으면 None"""
+        self.ensure_fresh()
+        signature = self._signature
+        return "faq:" + "-".join(str(v) for v in signature) if signature else None
+
+    @property
+    def docs(self) -> List[Dict[str, Any]]:
+        return self._snapshot.docs
+
+    def _build(self, rows: List[Dict[str, Any]]) -> None:
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        question_terms_list, doc_len = [], []
+        for idx, row in enumerate(rows):
+            question_terms = tokenize(row.get("question") or "")
+            terms = question_terms * QUESTION_WEIGHT + tokenize(row.get("answer") or "")
+            counts = Counter(terms)
+            for term, tf in counts.items():
+                postings[term].append((idx, tf))
+            question_terms_list.append({t for t in question_terms if t.startswith("#")} or set(question_terms))
+            doc_len.append(len(terms))
+
+        n_docs = len(rows)
+        idf = {term: math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+               for term, plist in postings.items()}
+
+        self._snapshot = _FaqIndexSnapshot(
+            docs=rows,
+            postings=dict(postings),
+            question_terms=question_terms_list,
+            doc_len=doc_len,
+            avg_len=(sum(doc_len) / n_docs) if n_docs else 0.0,
+            idf=idf,
+            max_idf=max(idf.values()) if idf else 0.0,
+        )
+
+    @staticmethod
+    def _confidence(snapshot: _FaqIndexSnapshot, query_terms: List[str], doc_idx: int) -> float:
+        """
+        질문 bigram 기준 질의어 IDF 가중 커버리지 → 0.1~0.95
+        (답변 본문은 순위에만 반영, 색인에 없는 질의어는 최대 IDF로 간주)
+        """
+        unique_terms = {t for t in query_terms if t.startswith("#")} or set(query_terms)
+        total = sum(snapshot.idf.get(t, snapshot.max_idf) for t in unique_terms)
+        if total <= 0:
+            return 0.1
+        matched = sum(snapshot.idf[t] for t in unique_terms if t in snapshot.question_terms[doc_idx])
+        return round(0.1 + 0.85 * (matched / total), 3)
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        self.ensure_fresh()
+        snapshot = self._snapshot
+        query_terms = tokenize(query)
+        if not query_terms or not snapshot.docs:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(query_terms):
+            plist = snapshot.postings.get(term)
+            if not plist:
+                continue
+            idf = snapshot.idf[term]
+            for doc_idx, tf in plist:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * snapshot.doc_len[doc_idx] / (snapshot.avg_len or 1.0))
+                scores[doc_idx] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        results = []
+        for doc_idx, score in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1]):
+            row = dict(snapshot.docs[doc_idx])
+            row["score"] = round(score, 4)
+            row["confidence"] = self._confidence(snapshot, query_terms, doc_idx)
+            results.append(row)
+        return results
@@ -1,21 +1,57 @@
 from typing import Dict, Any, List
-from .cs_common import openai_client, pinecone_index, get_db_connection, logger
-from mysql.connector import Error
+import os
+from .cs_common import openai_client, vector_index, get_db_connection, logger
+from .cs_answer_cache import faq_answer_cache
+from .cs_vector_index import LocalVectorIndex
+from .cs_faq_bm25 import FaqBM25Index
 from config import Config
 
+faq_bm25_index = FaqBM25Index(get_db_connection)
+
+
+def _faq_docs_version() -> str:
+    """시맨틱 캐시 무효화 기준이 되는 FAQ/약관 문서 버전"""
+    override = os.getenv("FAQ_DOCS_VERSION")
+    if override:
+        return override
+    if isinstance(vector_index, LocalVectorIndex):
+        vector_index.load()
+        return vector_index.version
+    # Pinecone: 업서트 원본인 faq_tbl 시그니처로 판단 (FAQ 수정 시 캐시된 답변 무효화)
+    return faq_bm25_index.version() or "pinecone"
+
+
+def _cached_answer_result(cached: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "cs": {"answer": {"text": cached["answer"], "citations": cached["citations"][:3], "confidence": 0.8}},
+        "meta": {"rag_method": "semantic_cache", "cache_similarity": round(cached["similarity"], 4)},
+    }
+
 
 def faq_policy_rag(state) -> Dict[str, Any]:
     logger.info("FAQ RAG 검색 시작", extra={"user_id": getattr(state, 'user_id', None), "query": getattr(state, 'query', '')})
-    logger.info(f"OpenAI 클라이언트: {openai_client is not None}, Pinecone 인덱스: {pinecone_index is not None}")
-    if not (openai_client and pinecone_index):
+    logger.info(f"OpenAI 클라이언트: {openai_client is not None}, 벡터 인덱스: {type(vector_index).__name__ if vector_index else None}")
+    if not (openai_client and vector_index):
         logger.info("RAG 조건 실패 - DB 폴백으로 이동")
         return _faq_db_fallback(state)
     try:
+        docs_version = _faq_docs_version()
+        cached = faq_answer_cache.lookup_text(state.query, docs_version)
+        if cached:
+            logger.info("FAQ 시맨틱 캐시 적중 (동일 질문)")
+            return _cached_answer_result(cached)
+
         embedding_response = openai_client.embeddings.create(model="text-embedding-3-small", input=state.query)
         query_embedding = embedding_response.data[0].embedding
-        results = pinecone_index.query(vector=query_embedding, top_k=5, include_metadata=True,
-                                       filter={"type": {"$in": ["faq", "terms"]}})
-        logger.info(f"Pinecone 검색 결과: {len(results.matches)}개 매치")
+
+        cached = faq_answer_cache.lookup(state.query, query_embedding, docs_version)
+        if cached:
+            logger.info(f"FAQ 시맨틱 캐시 적중: 유사도={cached['similarity']:.3f}")
+            return _cached_answer_result(cached)
+
+        results = vector_index.query(vector=query_embedding, top_k=5, include_metadata=True,
+                                     filter={"type": {"$in": ["faq", "terms"]}})
+        logger.info(f"벡터 검색 결과: {len(results.matches)}개 매치")
         if not results.matches:
             logger.info("검색 결과 없음 - DB 폴백으로 이동")
             return _faq_db_fallback(state)
@@ -59,9 +95,11 @@ def faq_policy_rag(state) -> Dict[str, Any]:
         )
         answer_text = (response.choices[0].message.content or "").strip()
         confidence = 0.8
+        if answer_text:
+            faq_answer_cache.store(state.query, query_embedding, answer_text, citations[:3], docs_version)
         return {"cs": {"answer": {"text": answer_text, "citations": citations[:3], "confidence": confidence}}}
     except Exception as e:
-        logger.error(f"Pinecone RAG 실패: {e} → DB 폴백 실행")
+        logger.error(f"벡터 RAG 실패: {e} → DB 폴백 실행")
         return _faq_db_fallback(state)
 
 
@@ -87,32 +125,13 @@ def _faq_db_fallback(state) -> Dict[str, Any]:
                                    "citations": [], "confidence": 0.0, "error": str(e)}}}
 
 
-def _search_faq(query: str) -> List[Dict[str, Any]]:
-    query_lower = (query or "").lower()
-    keywords = query_lower.split()
-    conn = get_db_connection()
-    if not conn:
-        return []
+def _search_faq(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    """BM25 역색인으로 FAQ 검색 (점수 내림차순, 항목별 confidence 포함)"""
     try:
-        with conn.cursor(dictionary=True) as cursor:
-            if not keywords:
-                return []
-            where_clauses = " OR ".join(["question LIKE %s" for _ in keywords])
-            params = [f"%{keyword}%" for keyword in keywords]
-            sql = f"SELECT faq_id as id, question, answer, faq_category as category FROM faq_tbl WHERE {where_clauses}"
-            cursor.execute(sql, params)
-            results = cursor.fetchall()
-            for row in results:
-                score = sum(1 for keyword in keywords if keyword in (row.get("question") or "").lower())
-                row["score"] = score
-            results.sort(key=lambda x: x["score"], reverse=True)
-            return results
-    except Error as e:
+        return faq_bm25_index.search(query, top_k=top_k)
+    except Exception as e:
         logger.error(f"FAQ 검색 실패: {e}")
         return []
-    finally:
-        if conn and conn.is_connected():
-            conn.close()
 
 
 def _select_best_answer(faq_results: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
@@ -122,12 +141,5 @@ def _select_best_answer(faq_results: List[Dict[str, Any]], query: str) -> Dict[s
 
 
 def _calculate_confidence(answer: Dict[str, Any], query: str) -> float:
-    base_score = answer.get("score", 0.0)
-    if base_score >= 2.0:
-        return 0.9
-    elif base_score >= 1.0:
-        return 0.7
-    elif base_score > 0.0:
-        return 0.4
-    else:
-        return 0.1
\ No newline at end of file
+    """BM25 검색 시 계산된 질의어 커버리지 기반 confidence 사용 (결과 없으면 0.1)"""
+    return float(answer.get("confidence", 0.1))
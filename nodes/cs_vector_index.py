@@ -0,0 +1,265 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger("E_CS_VECTOR_INDEX")
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    logger.warning("numpy not available. Local vector index disabled.")
+
+FAQ_INDEX_DIR = os.getenv("FAQ_INDEX_DIR", os.path.join("data", "faq_index"))
+TERMS_DOCS_DIR = os.getenv("TERMS_DOCS_DIR", os.path.join("data", "terms"))
+EMBEDDING_MODEL = "text-embedding-3-small"
+MMAP_THRESHOLD_BYTES = int(os.getenv("FAQ_INDEX_MMAP_BYTES", str(64 * 1024 * 1024)))
+TERMS_CHUNK_CHARS = 500
+EMBED_BATCH_SIZE = 100
+
+_VECTORS_FILE = "vectors.npy"
+_META_FILE = "meta.json"
+
+
+@dataclass
+class VectorMatch:
+    id: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class VectorQueryResult:
+    matches: List[VectorMatch] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class _VectorIndexSnapshot:
+    """한 번에 교체되는 인덱스 상태 (재로드 중 검색해도 같은 버전의 행렬/ID/메타데이터만 읽도록)"""
+    matrix: Any = None
+    ids: List[str] = field(default_factory=list)
+    metadata: List[Dict[str, Any]] = field(default_factory=list)
+    version: str = ""
+    mtime: float = 0.0
+    # 필터 마스크 캐시 (스냅샷마다 새로 시작, 갱신은 _mask_lock 안에서)
+    mask_cache: Dict[Tuple[str, Any], Any] = field(default_factory=dict)
+
+
+class LocalVectorIndex:
+    """
+    Pinecone Index.query()와 같은 형태로 쓰는 인프로세스 벡터 인덱스
+
+    - 정규화된 float32 행렬과 메타데이터 목록을 디스크에서 로드 (큰 코퍼스는 mmap)
+    - query(): 내적(=코사인) 후 argpartition으로 top_k 추출
+    - filter: {"field": {"$in": [...]}} / {"field": {"$eq": v}} / {"field": v}
+    """
+
+    def __init__(self, index_dir: str = FAQ_INDEX_DIR):
+        self.index_dir = index_dir
+        self._snapshot = _VectorIndexSnapshot()
+        self._lock = threading.Lock()
+        self._mask_lock = threading.Lock()
+
+    @property
+    def matrix(self):
+        return self._snapshot.matrix
+
+    @property
+    def ids(self) -> List[str]:
+        return self._snapshot.ids
+
+    @property
+    def metadata(self) -> List[Dict[str, Any]]:
+        return self._snapshot.metadata
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.version
+
+    @property
+    def size(self) -> int:
+        return len(self._snapshot.ids)
+
+    def is_available(self) -> bool:
+        return np is not None and os.path.exists(os.path.join(self.index_dir, _VECTORS_FILE))
+
+    def load(self) -> bool:
+        """디스크 인덱스 로드 - 파일이 바뀐 경우에만 다시 읽음"""
+        if not self.is_available():
+            return False
+        vectors_path = os.path.join(self.index_dir, _VECTORS_FILE)
+        meta_path = os.path.join(self.index_dir, _META_FILE)
+        mtime = max(os.path.getmtime(vectors_path), os.path.getmtime(meta_path))
+        if self._snapshot.matrix is not None and mtime <= self._snapshot.mtime:
+            return True
+
+        with self._lock:
+            if self._snapshot.matrix is not None and mtime <= self._snapshot.mtime:
+                return True
+            try:
+                use_mmap = os.path.getsize(vectors_path) >= MMAP_THRESHOLD_BYTES
+                matrix = np.load(vectors_path, mmap_mode="r" if use_mmap else None)
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                entries = meta.get("entries", [])
+                if len(entries) != matrix.shape[0]:
+                    logger.error(f"로컬 인덱스 크기 불일치: vectors={matrix.shape[0]}, meta={len(entries)}")
+                    return False
+
+                snapshot = _VectorIndexSnapshot(
+                    matrix=matrix,
+                    ids=[e["id"] for e in entries],
+                    metadata=[e.get("metadata", {}) for e in entries],
+                    version=meta.get("version", ""),
+                    mtime=mtime,
+                )
+                self._snapshot = snapshot
+                logger.info(f"로컬 FAQ 벡터 인덱스 로드: {len(snapshot.ids)}개, mmap={use_mmap}, "
+                            f"version={snapshot.version}")
+                return True
+            except Exception as e:
+                logger.error(f"로컬 FAQ 벡터 인덱스 로드 실패: {e}")
+                return False
+
+    def _filter_mask(self, snapshot: _VectorIndexSnapshot, flt: Optional[Dict[str, Any]]):
+        if not flt:
+            return None
+        size = len(snapshot.ids)
+        mask = np.ones(size, dtype=bool)
+        for key, cond in flt.items():
+            if isinstance(cond, dict) and "$in" in cond:
+                values = tuple(sorted(str(v) for v in cond["$in"]))
+            elif isinstance(cond, dict) and "$eq" in cond:
+                values = (str(cond["$eq"]),)
+            else:
+                values = (str(cond),)
+            cache_key = (key, values)
+            with self._mask_lock:
+                field_mask = snapshot.mask_cache.get(cache_key)
+            if field_mask is None:
+                allowed = set(values)
+                field_mask = np.fromiter((str(md.get(key)) in allowed for md in snapshot.metadata),
+                                         dtype=bool, count=size)
+                with self._mask_lock:
+                    field_mask = snapshot.mask_cache.setdefault(cache_key, field_mask)
+            mask &= field_mask
+        return mask
+
+    def query(self, vector: List[float], top_k: int = 5, include_metadata: bool = True,
+              filter: Optional[Dict[str, Any]] = None, **_) -> VectorQueryResult:
+        if self._snapshot.matrix is None and not self.load():
+            return VectorQueryResult()
+        snapshot = self._snapshot
+
+        q = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0.0:
+            return VectorQueryResult()
+        q /= norm
+
+        scores = snapshot.matrix @ q
+        mask = self._filter_mask(snapshot, filter)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(top_k, len(snapshot.ids))
+        if k <= 0:
+            return VectorQueryResult()
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        matches = [
+            VectorMatch(id=snapshot.ids[i], score=float(scores[i]),
+                        metadata=snapshot.metadata[i] if include_metadata else {})
+            for i in top if np.isfinite(scores[i])
+        ]
+        return VectorQueryResult(matches=matches)
+
+
+def _load_faq_documents(conn) -> List[Dict[str, Any]]:
+    with conn.cursor(dictionary=True) as cursor:
+        cursor.execute("SELECT faq_id, question, answer, faq_category FROM faq_tbl")
+        rows = cursor.fetchall()
+    return [
+        {
+            "id": f"faq-{row['faq_id']}",
+            "text": f"Q: {row['question']}\nA: {row['answer']}",
+            "metadata": {"type": "faq", "category": row.get("faq_category") or "",
+                         "text": f"Q: {row['question']}\nA: {row['answer']}"}
+        }
+        for row in rows
+    ]
+
+
+def _load_terms_documents(terms_dir: str = TERMS_DOCS_DIR) -> List[Dict[str, Any]]:
+    docs = []
+    for path in sorted(glob.glob(os.path.join(terms_dir, "*.txt")) + glob.glob(os.path.join(terms_dir, "*.md"))):
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        category = os.path.splitext(os.path.basename(path))[0]
+        paragraphs = [p.strip() for p in content.split("\n\n") if p.strip()]
+        chunk, chunk_no = "", 0
+        for paragraph in paragraphs + [""]:
+            if paragraph and len(chunk) + len(paragraph) < TERMS_CHUNK_CHARS:
+                chunk = f"{chunk}\n\n{paragraph}".strip()
+                continue
+            if chunk:
+                docs.append({"id": f"terms-{category}-{chunk_no}", "text": chunk,
+                             "metadata": {"type": "terms", "category": category, "text": chunk}})
+                chunk_no += 1
+            chunk = paragraph
+    return docs
+
+
+def build_local_index(openai_client, conn, index_dir: str = FAQ_INDEX_DIR,
+                      terms_dir: str = TERMS_DOCS_DIR) -> int:
+    """faq_tbl + 약관 문서를 임베딩해서 로컬 인덱스 파일(vectors.npy, meta.json)로 저장"""
+    if np is None:
+        raise RuntimeError("numpy is required to build the local vector index")
+
+    docs = _load_faq_documents(conn) + _load_terms_documents(terms_dir)
+    if not docs:
+        logger.warning("인덱싱할 FAQ/약관 문서가 없습니다.")
+        return 0
+
+    vectors = []
+    for start in range(0, len(docs), EMBED_BATCH_SIZE):
+        batch = docs[start:start + EMBED_BATCH_SIZE]
+        response = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=[d["text"] for d in batch])
+        vectors.extend(item.embedding for item in response.data)
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1.0, norms)
+
+    version = hashlib.sha1("".join(d["id"] + d["text"] for d in docs).encode("utf-8")).hexdigest()[:16]
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, _VECTORS_FILE), matrix)
+    with open(os.path.join(index_dir, _META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": version, "model": EMBEDDING_MODEL,
+                   "entries": [{"id": d["id"], "metadata": d["metadata"]} for d in docs]},
+                  f, ensure_ascii=False)
+
+    logger.info(f"로컬 FAQ 벡터 인덱스 생성 완료: {len(docs)}개 문서, version={version}")
+    return len(docs)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from nodes.cs_common import openai_client as _client, get_db_connection as _get_conn
+
+    logging.basicConfig(level=logging.INFO)
+    _conn = _get_conn()
+    if not (_client and _conn):
+        raise SystemExit("OPENAI_API_KEY와 DB 연결이 필요합니다.")
+    try:
+        count = build_local_index(_client, _conn)
+        print(f"indexed {count} documents into {FAQ_INDEX_DIR}")
+    finally:
+        _conn.close()
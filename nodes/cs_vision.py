@@ -1,8 +1,9 @@
-import base64
 import json
 from typing import Dict, Any, List, Tuple, Optional
 from .cs_common import openai_client, logger
 from config import Config
+from utils.image_preprocess import preprocess_file
+from utils.vision_cache import vision_result_cache, content_hash, prompt_version
 
 
 def _normalize_name(s: str) -> str:
@@ -114,8 +115,7 @@ def analyze_attachments(attachments: List[str]) -> Optional[Dict[str, Any]]:
                 "message": "해당 파일은 지원되지 않는 파일입니다. 지원되는 파일로 업로드를 진행해주세요.",
                 "supported_types": ["png", "jpg", "jpeg", "gif", "webp"],
             }
-        with open(image_path, "rb") as f:
-            encoded_image = base64.b64encode(f.read()).decode("utf-8")
+        prepared = preprocess_file(image_path, fallback_mime=mime_map[ext])
         system_prompt = (
             "당신은 식재료 환불/교환 심사용 이미지 분석 보조원입니다.\n"
             "아래의 '반드시 지킬 것'을 따라 **오직 하나의 JSON 객체**만 반환하세요.\n\n"
@@ -136,6 +136,14 @@ def analyze_attachments(attachments: List[str]) -> Optional[Dict[str, Any]]:
             "is_defective=true로 설정하세요. 품목명(primary_item)은 가능하면 한국어 일반명으로 적고, "
             "라벨/문구가 보이면 ocr_text에 짧게 담아주세요. 결과는 반드시 한국어 값을 갖는 단일 JSON으로만 출력하세요."
         )
+        # is_defective가 자동 환불 접수로 이어지므로 지각 해시 근사 일치는 쓰지 않고 동일 이미지만 재사용
+        version = prompt_version(Config.OPENAI_MODEL, system_prompt, user_text, "sha256")
+        image_hash = content_hash(prepared.data)
+        cached = vision_result_cache.lookup(image_hash, version, max_distance=0)
+        if cached:
+            logger.info("Vision 분석 캐시 적중 (동일 이미지)")
+            return dict(cached["result"])
+
         resp = openai_client.chat.completions.create(
             model=Config.OPENAI_MODEL,
             response_format={"type": "json_object"},
@@ -143,14 +151,16 @@ def analyze_attachments(attachments: List[str]) -> Optional[Dict[str, Any]]:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": [
                     {"type": "text", "text": user_text},
-                    {"type": "image_url", "image_url": {"url": f"data:{mime_map[ext]};base64,{encoded_image}"}},
+                    {"type": "image_url", "image_url": {"url": prepared.data_url}},
                 ]},
             ],
             temperature=0.1,
             max_tokens=500,
         )
         raw = (resp.choices[0].message.content or "").strip()
-        return json.loads(raw)
+        result = json.loads(raw)
+        vision_result_cache.store(image_hash, version, result)
+        return result
     except Exception as e:
         logger.error("Vision API 분석 실패: %s", e)
         return {
@@ -1,16 +1,21 @@
 import logging
 import os
 import json
+import threading
 from typing import Dict, Any, Optional
 import sys
 from graph_interfaces import ChatState
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.chat_history import analyze_search_intent_with_history
+from utils.context_builder import build_history_context, record_context_tokens
 from config import Config
 
 logger = logging.getLogger("B_QUERY_ENHANCEMENT")
 
+# enhance_query → _llm_enhance_all 호출 맥락 (라우터와 병렬 실행될 수 있어 스레드별로 보관)
+_enhance_ctx = threading.local()
+
 try:
     import openai
     openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -35,13 +40,9 @@ def enhance_query(state: ChatState) -> Dict[str, Any]:
 
     recent_history_text = ""
     if state.conversation_history:
-        history_slice = state.conversation_history[-6:]
-        formatted_history = []
-        for message in history_slice:
-            role_label = "사용자" if message.get("role") == "user" else "봇"
-            content = message.get("content", "")
-            formatted_history.append(f"{role_label}: {content}")
-        recent_history_text = "\n".join(formatted_history)
+        history_context = build_history_context(state.conversation_history)
+        recent_history_text = history_context["text"]
+        record_context_tokens(state.conversation_history, "enhance_query", history_context["tokens"])
 
     search_intent = None
     try:
@@ -51,9 +52,9 @@ def enhance_query(state: ChatState) -> Dict[str, Any]:
         logger.warning(f"히스토리 기반 검색 의도 분석 실패: {analyze_error}")
         search_intent = None
 
-    setattr(enhance_query, "_current_state", state)  
-    setattr(enhance_query, "_history_text", recent_history_text)  
-    setattr(enhance_query, "_search_intent", search_intent or {}) 
+    _enhance_ctx.current_state = state
+    _enhance_ctx.history_text = recent_history_text
+    _enhance_ctx.search_intent = search_intent or {}
 
     try:
         result = _llm_enhance_all(state.query)
@@ -108,9 +109,9 @@ def enhance_query(state: ChatState) -> Dict[str, Any]:
         }
     finally:
 
-        setattr(enhance_query, "_current_state", None)
-        setattr(enhance_query, "_history_text", "")
-        setattr(enhance_query, "_search_intent", {})
+        _enhance_ctx.current_state = None
+        _enhance_ctx.history_text = ""
+        _enhance_ctx.search_intent = {}
 
 def _enhance_query(state: ChatState) -> Dict[str, Any]:
     """
@@ -320,9 +321,9 @@ def _llm_enhance_with_history(query: str, search_intent: Dict[str, Any]) -> Opti
 
 def _llm_enhance_all(query: str) -> Optional[Dict[str, Any]]:
     """전체 쿼리 보강 (재작성 + 슬롯 + 키워드)"""
-    state_ctx = getattr(enhance_query, "_current_state", None) 
-    history_text = getattr(enhance_query, "_history_text", "")  
-    intent_ctx = getattr(enhance_query, "_search_intent", {}) 
+    state_ctx = getattr(_enhance_ctx, "current_state", None)
+    history_text = getattr(_enhance_ctx, "history_text", "")
+    intent_ctx = getattr(_enhance_ctx, "search_intent", {})
 
     system_prompt = """당신은 신선식품 쇼핑몰의 전문 쿼리 분석가입니다.
 사용자의 입력을 분석하여, 이어지는 다양한 작업(상품 검색, 레시피 검색, 장바구니 관리 등)에 필요한 정보를 구조화된 JSON 형식으로 추출해야 합니다.
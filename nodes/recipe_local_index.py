@@ -0,0 +1,215 @@
+import os
+import math
+import time
+import heapq
+import logging
+import threading
+from dataclasses import dataclass, field
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from mysql.connector import Error
+
+from nodes.cs_faq_bm25 import tokenize
+from policy import VEGAN_EXCLUSIONS, VEGAN_POSITIVE_KEYWORDS
+from utils.tavily_cache import normalize_dish_query
+
+logger = logging.getLogger("RECIPE_LOCAL_INDEX")
+
+RECIPE_LOCAL_REFRESH_SEC = int(os.getenv("RECIPE_LOCAL_REFRESH_SEC", "120"))
+# 질의어(음절 bigram) 중 제목에 들어 있는 IDF 가중 비율이 이 값 이상이어야 로컬 결과로 인정
+RECIPE_LOCAL_MIN_COVERAGE = float(os.getenv("RECIPE_LOCAL_MIN_COVERAGE", "0.75"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+TITLE_WEIGHT = 3
+
+
+@dataclass(frozen=True)
+class _RecipeIndexSnapshot:
+    """한 번에 교체되는 색인 상태 (검색 중 재구축돼도 같은 버전의 문서/역색인만 읽도록)"""
+    docs: List[Dict[str, Any]] = field(default_factory=list)
+    postings: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+    title_terms: List[set] = field(default_factory=list)
+    doc_len: List[int] = field(default_factory=list)
+    avg_len: float = 0.0
+    idf: Dict[str, float] = field(default_factory=dict)
+    max_idf: float = 0.0
+
+
+class RecipeBM25Index:
+    """
+    로컬 레시피 코퍼스 BM25 색인 (즐겨찾기 + 크롤링 레시피 저장소)
+
+    - 문서: URL 단위로 합침 (제목 ×TITLE_WEIGHT + 재료 + 스니펫), 즐겨찾기 수는 점수 가산
+    - 패싯: 문서마다 비건 여부와 소문자 본문을 미리 계산해 비건/알러지/비선호 필터에 사용
+    - REFRESH_SEC마다 (즐겨찾기 수, 최근 즐겨찾기 시각, 저장소 revision)을 확인해 바뀐 경우에만 재구축
+    """
+
+    def __init__(self, connection_factory, store, refresh_sec: int = RECIPE_LOCAL_REFRESH_SEC):
+        self._connection_factory = connection_factory
+        self._store = store
+        self.refresh_sec = refresh_sec
+        self._snapshot = _RecipeIndexSnapshot()
+        self._signature: Optional[tuple] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"searches": 0, "local_hits": 0, "rebuilds": 0}
+
+    def _load_favorites(self) -> Tuple[tuple, List[Dict[str, Any]]]:
+        conn = self._connection_factory()
+        if not conn:
+            return (None,), []
+        try:
+            with conn.cursor(dictionary=True) as cursor:
+                cursor.execute(
+                    """
+                    SELECT recipe_url AS url, MAX(recipe_title) AS title, MAX(snippet) AS snippet,
+                           COUNT(*) AS favorites, MAX(favorited_at) AS last_favorited
+                    FROM recipe_favorite_tbl
+                    GROUP BY url_hash, recipe_url
+                    """
+                )
+                rows = cursor.fetchall() or []
+            latest = max((str(r.get("last_favorited")) for r in rows), default="")
+            return (len(rows), sum(int(r.get("favorites") or 0) for r in rows), latest), rows
+        except Error as e:
+            logger.error(f"즐겨찾기 레시피 조회 실패: {e}")
+            return (None,), []
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+    def ensure_fresh(self) -> None:
+        now = time.time()
+        if self._signature is not None and now - self._last_check < self.refresh_sec:
+            return
+        with self._lock:
+            if self._signature is not None and now - self._last_check < self.refresh_sec:
+                return
+            self._last_check = now
+            fav_signature, favorites = self._load_favorites()
+            signature = (fav_signature, self._store.revision)
+            if signature == self._signature:
+                return
+            self._build(self._merge(favorites, self._store.documents()))
+            self._signature = signature
+            self._stats["rebuilds"] += 1
+            logger.info(f"로컬 레시피 색인 재구축: {len(self._snapshot.docs)}개 문서 (즐겨찾기 {len(favorites)}개)")
+
+    @staticmethod
+    def _merge(favorites: Iterable[Dict[str, Any]], stored: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for row in favorites:
+            url = row.get("url")
+            if not url:
+                continue
+            merged[url] = {"url": url, "title": row.get("title") or "", "snippet": row.get("snippet") or "",
+                           "ingredients": [], "favorites": int(row.get("favorites") or 0)}
+        for url, recipe in stored.items():
+            doc = merged.setdefault(url, {"url": url, "title": "", "snippet": "", "ingredients": [], "favorites": 0})
+            doc["title"] = doc["title"] or recipe.get("title") or ""
+            doc["ingredients"] = [str(i) for i in recipe.get("ingredients") or []]
+        return [doc for doc in merged.values() if doc["title"]]
+
+    def _build(self, docs: List[Dict[str, Any]]) -> None:
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        title_terms_list, doc_len = [], []
+        for idx, doc in enumerate(docs):
+            title_terms = tokenize(doc["title"])
+            terms = title_terms * TITLE_WEIGHT + tokenize(" ".join(doc["ingredients"])) + tokenize(doc["snippet"])
+            for term, tf in Counter(terms).items():
+                postings[term].append((idx, tf))
+            title_terms_list.append({t for t in title_terms if t.startswith("#")} or set(title_terms))
+            doc_len.append(len(terms))
+
+            text = f"{doc['title']} {' '.join(doc['ingredients'])} {doc['snippet']}".lower()
+            doc["_text"] = text
+            doc["_non_vegan"] = any(ex in text for ex in VEGAN_EXCLUSIONS)
+
+        n_docs = len(docs)
+        idf = {term: math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+               for term, plist in postings.items()}
+        self._snapshot = _RecipeIndexSnapshot(
+            docs=docs,
+            postings=dict(postings),
+            title_terms=title_terms_list,
+            doc_len=doc_len,
+            avg_len=(sum(doc_len) / n_docs) if n_docs else 0.0,
+            idf=idf,
+            max_idf=max(idf.values()) if idf else 0.0,
+        )
+
+    @property
+    def docs(self) -> List[Dict[str, Any]]:
+        return self._snapshot.docs
+
+    @staticmethod
+    def _coverage(snapshot: _RecipeIndexSnapshot, query_terms: List[str], doc_idx: int) -> float:
+        unique_terms = {t for t in query_terms if t.startswith("#")} or set(query_terms)
+        total = sum(snapshot.idf.get(t, snapshot.max_idf) for t in unique_terms)
+        if total <= 0:
+            return 0.0
+        matched = sum(snapshot.idf[t] for t in unique_terms if t in snapshot.title_terms[doc_idx])
+        return matched / total
+
+    @staticmethod
+    def _passes_facets(doc: Dict[str, Any], user_preferences: Optional[Dict[str, Any]]) -> bool:
+        if not user_preferences:
+            return True
+        if user_preferences.get("vegan") and doc["_non_vegan"]:
+            return False
+        for key in ("allergy", "unfavorite"):
+            terms = [t.strip().lower() for t in (user_preferences.get(key) or "").split(",") if t.strip()]
+            if any(t in doc["_text"] for t in terms):
+                return False
+        return True
+
+    def search(self, query: str, user_preferences: Optional[Dict[str, Any]] = None,
+               exclude_urls: Optional[Iterable[str]] = None, top_k: int = 3,
+               min_coverage: float = RECIPE_LOCAL_MIN_COVERAGE) -> List[Dict[str, Any]]:
+        """
+        조건(패싯/제외 URL/제목 커버리지)을 만족하는 상위 top_k 문서를 Tavily 결과 형식
+        {"url", "title", "content", "score", "coverage", "source": "local"}으로 반환
+        """
+        self.ensure_fresh()
+        snapshot = self._snapshot
+        dish = normalize_dish_query(query)
+        for keyword in VEGAN_POSITIVE_KEYWORDS:
+            dish = dish.replace(keyword, " ")
+        query_terms = tokenize(dish)
+        self._stats["searches"] += 1
+        if not query_terms or not snapshot.docs:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(query_terms):
+            idf = snapshot.idf.get(term)
+            if idf is None:
+                continue
+            for doc_idx, tf in snapshot.postings[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * snapshot.doc_len[doc_idx] / (snapshot.avg_len or 1.0))
+                scores[doc_idx] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        excluded = set(exclude_urls or ())
+        docs = snapshot.docs
+        ranked = heapq.nlargest(len(scores), scores.items(),
+                                key=lambda item: item[1] * (1 + 0.1 * math.log1p(docs[item[0]]["favorites"])))
+        results = []
+        for doc_idx, score in ranked:
+            doc = docs[doc_idx]
+            if doc["url"] in excluded or not self._passes_facets(doc, user_preferences):
+                continue
+            coverage = self._coverage(snapshot, query_terms, doc_idx)
+            if coverage < min_coverage:
+                continue
+            content = doc["snippet"] or (f"재료: {', '.join(doc['ingredients'][:12])}" if doc["ingredients"] else "")
+            results.append({"url": doc["url"], "title": doc["title"], "content": content,
+                            "score": round(score, 4), "coverage": round(coverage, 3), "source": "local"})
+            if len(results) >= top_k:
+                break
+        self._stats["local_hits"] += len(results)
+        return results
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "documents": len(self._snapshot.docs),
+                "age_sec": round(time.time() - self._last_check, 1) if self._last_check else None}
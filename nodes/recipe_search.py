@@ -1,11 +1,15 @@
 import random
 import logging
 import os
+import time
+import threading
 import requests
 import re
 import json
-from typing import Dict, Any, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from mysql.connector import Error
 from bs4 import BeautifulSoup
 
@@ -26,10 +30,55 @@ from policy import (
 from utils.chat_history import save_recipe_search_result, generate_alternative_search_strategy
 from nodes.product_search import get_search_engine 
 from utils.db import get_db_connection  
+from utils.conversation_buffer import ConversationHistory
+from utils.url_health import url_health_cache
+from utils.tavily_cache import tavily_result_cache, search_cache_key
+from utils.recipe_store import recipe_store, text_hash
+from utils.recipe_schema import extract_schema_recipe, extract_schema_recipe_from_json_ld, strip_quantity, schema_stats
+from utils.recipe_crawler import recipe_crawler, extract_page_text
+from utils.item_vocabulary import ItemVocabulary
+from nodes.recipe_local_index import RecipeBM25Index
 
 logger = logging.getLogger("RECIPE_SEARCH")
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+RECIPE_RESULT_COUNT = 3
+URL_VALIDATE_DEADLINE_SEC = float(os.getenv("RECIPE_URL_VALIDATE_DEADLINE", "4"))
+URL_VALIDATE_WORKERS = int(os.getenv("RECIPE_URL_VALIDATE_WORKERS", "12"))
+
+TAVILY_INCLUDE_DOMAINS = [
+    "10000recipe.com", "minimalistbaker.com", "www.bbcgoodfood.com",
+    "www.seriouseats.com", "www.allrecipes.com", "www.loveandlemons.com",
+    "minimalistbaker.com", "ohsheglows.com", "noracooks.com",
+    "lovingitvegan.com", "rainbowplantlife.com", "www.loveandlemons.com",
+    "itdoesnttastelikechicken.com", "sweetpotatosoul.com", "thevegan8.com"
+]
+TAVILY_EXCLUDE_DOMAINS = ["youtube.com","instagram.com","facebook.com","tiktok.com", "blog.naver.com"]
+
+RECIPE_SUMMARY_PREFETCH = int(os.getenv("RECIPE_SUMMARY_PREFETCH", "5"))
+RECIPE_SUMMARY_CACHE_TTL = int(os.getenv("RECIPE_SUMMARY_CACHE_TTL", str(7 * 86400)))
+RECIPE_SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("RECIPE_SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+# 항목당 출력 토큰 예산 (한글 제목 30자+설명 30자+JSON 구조 ≈ 100~130 토큰)
+RECIPE_SUMMARY_TOKENS_PER_ITEM = int(os.getenv("RECIPE_SUMMARY_TOKENS_PER_ITEM", "160"))
+
+_url_probe_executor = ThreadPoolExecutor(max_workers=URL_VALIDATE_WORKERS, thread_name_prefix="recipe-url-probe")
+_summary_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="recipe-summary")
+_summary_cache: "OrderedDict[str, Tuple[float, Dict[str, str]]]" = OrderedDict()
+_summary_cache_lock = threading.Lock()
+
+# 모델이 바뀌면 저장된 구조화 결과를 다시 추출
+RECIPE_EXTRACT_VERSION = f"{Config.OPENAI_MODEL}:2"
+_revalidate_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="recipe-revalidate")
+_revalidating = set()
+_revalidate_lock = threading.Lock()
+
+recipe_local_index = RecipeBM25Index(get_db_connection, recipe_store)
+item_vocabulary = ItemVocabulary(get_db_connection)
+
+RECIPE_PREFETCH_ENABLED = os.getenv("RECIPE_PREFETCH", "1") != "0"
+RECIPE_PREFETCH_WORKERS = int(os.getenv("RECIPE_PREFETCH_WORKERS", "3"))
+RECIPE_PREFETCH_TTL = int(os.getenv("RECIPE_PREFETCH_TTL", "900"))
+RECIPE_PREFETCH_WAIT_SEC = float(os.getenv("RECIPE_PREFETCH_WAIT", "30"))
 
 try:
     import openai
@@ -93,6 +142,7 @@ def recipe_search(state: ChatState) -> Dict[str, Any]:
             result = _handle_selected_recipe(query, state)
         else:
             logger.info("시나리오 1: 일반 레시피 검색 시작")
+            recipe_prefetcher.cancel_session(state)
             rewrite_query = state.rewrite.get("text", "")
 
             if is_alternative_search and search_strategy:
@@ -125,6 +175,13 @@ def recipe_search(state: ChatState) -> Dict[str, Any]:
                 logger.info(f"저장할 히스토리 결과: {len(search_context_to_save['results'])}개")
                 save_recipe_search_result(state, search_context_to_save)
                 logger.info("검색 히스토리 저장 완료")
+
+                # 사용자가 하나를 고르기 전에 재료/상품 매칭을 미리 준비
+                recipe_prefetcher.schedule(
+                    state,
+                    [r.get("url") for r in recipe_results[:3] if r.get("url")],
+                    get_user_preferences(state.user_id) if state.user_id else {}
+                )
             else:
                 logger.warning("검색 결과가 없어서 히스토리 저장하지 않음")
         except Exception as e:
@@ -267,6 +324,135 @@ def _handle_general_recipe_search(original_query: str, rewrite_query: str, state
     }
 
 
+class RecipePrefetcher:
+    """
+    레시피 검색 직후 결과 URL의 크롤링/구조화/상품 매칭을 백그라운드로 미리 수행
+
+    - 세션별 세대(generation) 번호로 관리: 같은 세션에서 새 검색이 시작되면 이전 세대는
+      대기 중인 작업은 취소하고, 실행 중인 작업은 단계 사이에서 중단
+    - 사용자가 레시피를 선택하면 take()로 결과를 가져감 (실행 중이면 기다리고, 아직 대기열에 있으면
+      취소하고 None을 반환해 호출 측이 바로 직접 처리)
+    - 동시 실행 수는 워커 수로 제한, TTL이 지난 작업/세대 기록은 schedule/take 때 정리
+    """
+
+    def __init__(self, workers: int = RECIPE_PREFETCH_WORKERS, ttl_sec: int = RECIPE_PREFETCH_TTL):
+        self.ttl_sec = ttl_sec
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recipe-prefetch")
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._generation_seq = 0  # 세션 기록이 정리된 뒤에도 세대 번호가 재사용되지 않도록 전역 증가
+        self._jobs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stats = {"scheduled": 0, "completed": 0, "cancelled": 0, "used": 0, "waited": 0, "missed": 0}
+
+    @staticmethod
+    def _session_key(state: Optional[ChatState]) -> str:
+        if not state:
+            return "anonymous"
+        return state.session_id or state.user_id or "anonymous"
+
+    def _is_current(self, key: str, generation: int) -> bool:
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def _expire_locked(self) -> None:
+        now = time.time()
+        for job_key in [k for k, job in self._jobs.items() if now - job["created_at"] > self.ttl_sec]:
+            self._jobs.pop(job_key)["future"].cancel()
+        active = {k[0] for k in self._jobs}
+        for key in [k for k in self._generations if k not in active]:
+            del self._generations[key]
+
+    def _cancel_locked(self, key: str) -> None:
+        self._generation_seq += 1
+        self._generations[key] = self._generation_seq
+        for job_key in [k for k in self._jobs if k[0] == key]:
+            job = self._jobs.pop(job_key)
+            if job["future"].cancel():
+                self._stats["cancelled"] += 1
+
+    def cancel_session(self, state: Optional[ChatState]) -> None:
+        with self._lock:
+            self._cancel_locked(self._session_key(state))
+
+    def schedule(self, state: Optional[ChatState], urls: List[str], user_preferences: Dict[str, Any] = None) -> None:
+        if not RECIPE_PREFETCH_ENABLED or not urls:
+            return
+        key = self._session_key(state)
+        snapshot = ChatState(user_id=state.user_id if state and state.user_id else "anonymous",
+                             session_id=state.session_id if state else None)
+        snapshot.conversation_history = list(state.conversation_history[-6:]) if state and state.conversation_history else []
+        with self._lock:
+            self._expire_locked()
+            self._cancel_locked(key)
+            generation = self._generations[key]
+            for url in urls:
+                future = self._executor.submit(self._run, key, generation, url, dict(user_preferences or {}), snapshot)
+                self._jobs[(key, url)] = {"future": future, "created_at": time.time()}
+                self._stats["scheduled"] += 1
+        logger.info(f"레시피 사전 준비 시작: {len(urls)}개 (session={key})")
+
+    def _run(self, key: str, generation: int, url: str, user_preferences: Dict[str, Any],
+             state: ChatState) -> Optional[Dict[str, Any]]:
+        if not self._is_current(key, generation):
+            return None
+        structured_content = _scrape_and_structure_recipe(url)
+        if not structured_content or not structured_content.get("ingredients"):
+            return None
+
+        ingredients = structured_content.get("ingredients", [])
+        if user_preferences:
+            ingredients = filter_recipe_ingredients(ingredients, user_preferences)
+            structured_content["ingredients"] = ingredients
+
+        if not self._is_current(key, generation):
+            with self._lock:
+                self._stats["cancelled"] += 1
+            return None
+        products = _get_product_details_from_db(ingredients, user_preferences, state)
+        with self._lock:
+            self._stats["completed"] += 1
+        return {"structured": structured_content, "ingredients": ingredients, "products": products}
+
+    def take(self, state: Optional[ChatState], url: str, timeout: float = RECIPE_PREFETCH_WAIT_SEC) -> Optional[Dict[str, Any]]:
+        """선택된 URL의 사전 준비 결과 (없거나 만료/실패면 None)"""
+        job_key = (self._session_key(state), url)
+        with self._lock:
+            self._expire_locked()
+            job = self._jobs.get(job_key)
+            if not job:
+                self._stats["missed"] += 1
+                return None
+            if job["future"].cancel():
+                # 아직 시작 전이면 대기열을 기다리지 않고 호출 측에서 바로 처리
+                self._jobs.pop(job_key, None)
+                self._stats["cancelled"] += 1
+                self._stats["missed"] += 1
+                return None
+            if not job["future"].done():
+                self._stats["waited"] += 1
+        try:
+            result = job["future"].result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"레시피 사전 준비 결과 사용 실패: {e}")
+            result = None
+        with self._lock:
+            self._stats["used" if result else "missed"] += 1
+        return copy.deepcopy(result) if result else None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["used"] + self._stats["missed"]
+            return {
+                **self._stats,
+                "pending_jobs": sum(1 for job in self._jobs.values() if not job["future"].done()),
+                "sessions": len(self._generations),
+                "hit_rate": round(self._stats["used"] / lookups, 4) if lookups else 0.0
+            }
+
+
+recipe_prefetcher = RecipePrefetcher()
+
+
 def _handle_selected_recipe(query: str, state: ChatState = None) -> Dict[str, Any]:
     """선택된 레시피 URL을 크롤링하고, 재료를 추출하여 DB 상품과 매핑합니다."""
     
@@ -283,7 +469,12 @@ def _handle_selected_recipe(query: str, state: ChatState = None) -> Dict[str, An
             "response": "레시피 URL을 찾을 수 없어 재료를 추천할 수 없습니다."
         }
     
-    structured_content = _scrape_and_structure_recipe(recipe_url)
+    prefetched = recipe_prefetcher.take(state, recipe_url)
+    if prefetched:
+        logger.info(f"사전 준비된 레시피 결과 사용: {recipe_url}")
+        structured_content = prefetched["structured"]
+    else:
+        structured_content = _scrape_and_structure_recipe(recipe_url)
     if not structured_content or not structured_content.get("ingredients"):
         logger.info("레시피 내용을 분석할 수 없음")
         return {
@@ -295,7 +486,7 @@ def _handle_selected_recipe(query: str, state: ChatState = None) -> Dict[str, An
     
     extracted_ingredients = structured_content.get("ingredients", [])
     
-    if user_preferences:
+    if user_preferences and not prefetched:
         filtered_ingredients = filter_recipe_ingredients(extracted_ingredients, user_preferences)
         logger.info(f"개인맞춤화 필터링: {len(extracted_ingredients)} -> {len(filtered_ingredients)}")
         extracted_ingredients = filtered_ingredients
@@ -313,7 +504,20 @@ def _handle_selected_recipe(query: str, state: ChatState = None) -> Dict[str, An
     all_search_terms = list(set(extracted_ingredients + additional_keywords))
     logger.info(f"DB 검색 키워드: {all_search_terms}")
     
-    matched_products = _get_product_details_from_db(all_search_terms, user_preferences, state) 
+    if prefetched:
+        # 재료 상품은 미리 매칭됨, 추가 키워드만 새로 검색해 합침
+        matched_products = prefetched["products"]
+        extra_terms = [term for term in all_search_terms if term not in set(prefetched["ingredients"])]
+        if extra_terms:
+            seen_names = {p["name"] for p in matched_products}
+            for product in _get_product_details_from_db(extra_terms, user_preferences, state):
+                if len(matched_products) >= 30:
+                    break
+                if product["name"] not in seen_names:
+                    seen_names.add(product["name"])
+                    matched_products.append(product)
+    else:
+        matched_products = _get_product_details_from_db(all_search_terms, user_preferences, state) 
     
     formatted_recipe_message = _format_recipe_content(structured_content, user_preferences)
     
@@ -357,7 +561,7 @@ def _get_product_details_from_db(
 
     base_user_id = state.user_id if state and state.user_id else 'anonymous'
     base_session_id = state.session_id if state else None
-    history_tail = state.conversation_history[-6:] if state and state.conversation_history else []
+    history_tail = ConversationHistory(state.conversation_history[-6:] if state and state.conversation_history else [])
 
     CHUNK_SIZE = 3 
     MAX_WORKERS = min(4, max(1, len(normalized_terms)))
@@ -540,126 +744,318 @@ def _is_crawlable_url(url: str) -> bool:
 
 def _quick_validate_url(url: str) -> bool:
     """URL이 실제로 접근 가능한지 빠르게 확인합니다."""
+    started = time.perf_counter()
     try:
         import requests
         headers = {'User-Agent': 'Mozilla/5.0'}
         response = requests.head(url, headers=headers, timeout=3)
+        latency_ms = (time.perf_counter() - started) * 1000
         
+        ok = False
         if 200 <= response.status_code < 300:
             content_type = response.headers.get('content-type', '').lower()
-            return 'text/html' in content_type
+            ok = 'text/html' in content_type
             
-        return False
+        url_health_cache.record(url, ok, latency_ms, domain_ok=response.status_code < 500)
+        return ok
     except Exception:
+        url_health_cache.record(url, False)
         return False
 
-def _search_with_tavily_filtered(query: str, user_preferences: Dict[str, Any] = None, exclude_urls: List[str] = None) -> List[Dict[str, Any]]:
-    """히스토리 기반 Tavily 검색 (이전 결과 제외)"""
-    exclude_urls = exclude_urls or []
+def _validate_urls_in_order(urls: List[str], needed: int = RECIPE_RESULT_COUNT,
+                            deadline: float = URL_VALIDATE_DEADLINE_SEC) -> List[str]:
+    """
+    후보 URL을 동시에 검증하고, 원래 순위 기준 앞에서부터 유효한 URL을 최대 needed개 반환합니다.
+    - 순위상 앞선 후보가 모두 판정되고 유효 URL이 needed개 모이면 즉시 종료, 대기 중인 검증은 취소
+    - deadline을 넘기면 그때까지 유효로 판정된 URL만 순위대로 반환
+    """
+    if not urls:
+        return []
+
+    started = time.monotonic()
+    # 캐시에 판정이 있는 URL(또는 차단 중인 도메인)은 HEAD 요청 생략
+    verdicts: List[Optional[bool]] = [url_health_cache.lookup(url) for url in urls]
+    index_of = {
+        _url_probe_executor.submit(_quick_validate_url, url): idx
+        for idx, url in enumerate(urls) if verdicts[idx] is None
+    }
+    pending = set(index_of)
+
+    def _settled_prefix() -> Optional[List[str]]:
+        valid = []
+        for idx, verdict in enumerate(verdicts):
+            if verdict is None:
+                return None
+            if verdict:
+                valid.append(urls[idx])
+                if len(valid) >= needed:
+                    return valid
+        return valid
 
     try:
-        from tavily import TavilyClient
-        client = TavilyClient(api_key=TAVILY_API_KEY)
-        
-        logger.info(f"Tavily 검색 실행: '{query}'")
-        
-        vegan_mode = bool(user_preferences and user_preferences.get("vegan"))
-        vegan_terms = ["비건","vegan","plant-based","dairy-free","egg-free"] if vegan_mode else []
-
-        include_domains = [
-           "10000recipe.com", "minimalistbaker.com", "www.bbcgoodfood.com",
-            "www.seriouseats.com", "www.allrecipes.com", "www.loveandlemons.com",
-            "minimalistbaker.com", "ohsheglows.com", "noracooks.com",
-            "lovingitvegan.com", "rainbowplantlife.com", "www.loveandlemons.com",
-            "itdoesnttastelikechicken.com", "sweetpotatosoul.com", "thevegan8.com"
-        ]
-        exclude_domains = ["youtube.com","instagram.com","facebook.com","tiktok.com", "blog.naver.com"]
+        settled = _settled_prefix()
+        if settled is not None:
+            return settled
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                logger.info(f"URL 검증 마감 시간 초과: {len(pending)}개 미판정")
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                verdicts[index_of[future]] = bool(future.result())
+            settled = _settled_prefix()
+            if settled is not None:
+                return settled
+    finally:
+        for future in pending:
+            future.cancel()
 
-        exclusion_terms = []
-        if user_preferences and user_preferences.get("allergy"):
-            allergy_items = user_preferences["allergy"].split(",")
-            for item in allergy_items:
-                exclusion_terms.append(f"-{item.strip()}")
-            logger.info(f"알러지 기반 제외 키워드 추가: {allergy_items}")
+    valid = [url for url, verdict in zip(urls, verdicts) if verdict]
+    return valid[:needed]
 
-        enhanced_query = (f"{query} 레시피 {' '.join(vegan_terms)} {' '.join(exclusion_terms)}").strip()
-        
-        res = client.search(
-            query=enhanced_query,
-            search_depth="basic",
-            max_results=30,
-            include_domains=include_domains,
-            exclude_domains=exclude_domains,
-            include_raw_content=True,
+def _clip(text: str, limit: int) -> str:
+    text = (text or "").strip().strip('"').strip("'")
+    return text[:limit] + ("..." if len(text) > limit else "")
+
+def _get_cached_summary(url: str) -> Optional[Dict[str, str]]:
+    with _summary_cache_lock:
+        entry = _summary_cache.get(url)
+        if not entry:
+            return None
+        if time.time() - entry[0] > RECIPE_SUMMARY_CACHE_TTL:
+            _summary_cache.pop(url, None)
+            return None
+        _summary_cache.move_to_end(url)
+        return entry[1]
+
+def _put_cached_summary(url: str, summary: Dict[str, str]) -> None:
+    with _summary_cache_lock:
+        _summary_cache[url] = (time.time(), summary)
+        _summary_cache.move_to_end(url)
+        while len(_summary_cache) > RECIPE_SUMMARY_CACHE_MAX_ENTRIES:
+            _summary_cache.popitem(last=False)
+
+def _summarize_recipes_batch(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    검색 결과들의 제목(30자)/설명(20~30자) 요약을 한 번의 LLM 호출로 생성 (URL별 캐시, 잘리면 항목별 재요청)
+    반환: {url: {"title", "description"}} - LLM 미사용/실패한 URL은 포함되지 않음
+    """
+    summaries: Dict[str, Dict[str, str]] = {}
+    missing = []
+    for res in results:
+        url = res.get("url", "")
+        cached = _get_cached_summary(url)
+        if cached:
+            summaries[url] = cached
+        elif url and (res.get("title") or res.get("content")):
+            missing.append(res)
+
+    if not openai_client or not missing:
+        return summaries
+
+    parsed = _request_summaries(missing)
+    if parsed is None and len(missing) > 1:
+        # 출력이 잘렸거나 JSON이 깨지면 전체를 버리지 않고 항목별로 다시 요청
+        logger.warning(f"레시피 요약 일괄 응답이 불완전해 항목별로 재요청합니다 ({len(missing)}개)")
+        parsed = {}
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            for idx, single in enumerate(executor.map(lambda res: _request_summaries([res]), missing)):
+                if single and isinstance(single.get("0"), dict):
+                    parsed[str(idx)] = single["0"]
+    parsed = parsed or {}
+
+    for idx, res in enumerate(missing):
+        item = parsed.get(str(idx))
+        if not isinstance(item, dict):
+            continue
+        summary = {
+            "title": _clip(item.get("title") or res.get("title", ""), 30),
+            "description": _clip(item.get("description") or "", 30) or (res.get("content") or "")[:150],
+        }
+        _put_cached_summary(res["url"], summary)
+        summaries[res["url"]] = summary
+    return summaries
+
+def _request_summaries(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    요약 LLM 호출 한 번 (입력 순번 "0", "1", ...을 키로 사용 - URL을 되받아 적는 토큰 절약)
+    반환: {순번: {"title", "description"}}, 출력이 잘렸거나(finish_reason=length) 파싱 실패면 None
+    """
+    items = [
+        {"id": str(idx), "title": res.get("title", ""), "content": (res.get("content") or "")[:300]}
+        for idx, res in enumerate(results)
+    ]
+    try:
+        response = openai_client.chat.completions.create(
+            model=Config.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": (
+                    "여러 레시피 검색 결과의 제목과 내용을 각각 요약해줘.\n"
+                    "- title: 30글자 내로 간단명료하게. 예시: '자취생도 쉽게 만드는 초간단 김치찌개 레시피' / '자꾸 땡기는 마약양념의 매콤한 닭볶음탕 조리법'\n"
+                    "- description: 20~30글자로 간단명료하게. 예시 1: 김치·참치 볶아 두부 올린 매콤찌개 완성. 예시 2: 닭고기 데쳐 채소 넣고 매콤하게 끓인 닭볶음탕\n"
+                    "반드시 입력의 id를 키로 하는 JSON으로만 답해: {\"<id>\": {\"title\": \"...\", \"description\": \"...\"}}"
+                )},
+                {"role": "user", "content": json.dumps(items, ensure_ascii=False)}
+            ],
+            temperature=0.1,
+            max_tokens=RECIPE_SUMMARY_TOKENS_PER_ITEM * len(items) + 50,
+            response_format={"type": "json_object"},
         )
-        results = res.get("results", [])
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            logger.warning(f"레시피 요약 응답이 토큰 한도에서 잘림 ({len(items)}개)")
+            return None
+        parsed = json.loads(choice.message.content or "{}")
+        return parsed if isinstance(parsed, dict) else None
+    except json.JSONDecodeError as e:
+        logger.warning(f"레시피 요약 응답 파싱 실패: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"레시피 요약 생성 실패: {e}")
+        return {}
 
-        validated_results = []
+def _build_recipe_card(res: Dict[str, Any], summaries: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """검색 결과 하나를 카드(제목/URL/요약)로 변환합니다. 요약이 없으면 원문을 잘라 사용"""
+    url = res.get("url", "")
+    summary = summaries.get(url) or {}
+    original_title = res.get("title", "제목 없음")
+    return {
+        "title": summary.get("title") or _clip(original_title, 30),
+        "url": url,
+        "description": summary.get("description") or (res.get("content") or "")[:150]
+    }
 
-        for res in results:
-            url = res.get("url", "")
+def _tavily_search_results(query: str, user_preferences: Dict[str, Any] = None,
+                           exclude_urls: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    개인 선호도를 반영한 Tavily 검색 결과 (요리명/선호도 단위 캐시, exclude_urls는 조회 시 제외)
+    선호도 필터는 캐시 저장 전에 전체 본문으로 적용해 캐시 적중/미스의 결과가 같도록 함
+    """
+    vegan_mode = bool(user_preferences and user_preferences.get("vegan"))
+    allergy_items = user_preferences["allergy"].split(",") if user_preferences and user_preferences.get("allergy") else []
+    unfavorite_items = (user_preferences["unfavorite"].split(",")
+                        if user_preferences and user_preferences.get("unfavorite") else [])
+
+    cache_key = search_cache_key(query, vegan_mode, allergy_items, TAVILY_INCLUDE_DOMAINS, TAVILY_EXCLUDE_DOMAINS,
+                                 unfavorites=unfavorite_items)
+    cached = tavily_result_cache.get(cache_key, exclude_urls)
+    if cached is not None:
+        logger.info(f"Tavily 검색 캐시 적중: '{query}' ({len(cached)}개)")
+        return cached
+
+    from tavily import TavilyClient
+    client = TavilyClient(api_key=TAVILY_API_KEY)
+    
+    logger.info(f"Tavily 검색 실행: '{query}'")
+    
+    vegan_terms = ["비건","vegan","plant-based","dairy-free","egg-free"] if vegan_mode else []
 
-            if url in exclude_urls:
-                logger.info(f"히스토리 기반 URL 제외: {url[:50]}...")
-                continue
+    exclusion_terms = []
+    if allergy_items:
+        for item in allergy_items:
+            exclusion_terms.append(f"-{item.strip()}")
+        logger.info(f"알러지 기반 제외 키워드 추가: {allergy_items}")
 
-            if not url or not _is_crawlable_url(url):
-                continue
+    enhanced_query = (f"{query} 레시피 {' '.join(vegan_terms)} {' '.join(exclusion_terms)}").strip()
+    
+    res = client.search(
+        query=enhanced_query,
+        search_depth="basic",
+        max_results=30,
+        include_domains=TAVILY_INCLUDE_DOMAINS,
+        exclude_domains=TAVILY_EXCLUDE_DOMAINS,
+        include_raw_content=True,
+    )
+    results = res.get("results", [])
+    if user_preferences:
+        results = [r for r in results
+                   if not should_exclude_recipe_content(r.get("title", ""), r.get("content", ""), user_preferences)]
+    tavily_result_cache.put(cache_key, results)
+    excluded = set(exclude_urls or ())
+    return [r for r in results if r.get("url") not in excluded]
+
+def _select_validated_recipes(results: List[Dict[str, Any]], user_preferences: Dict[str, Any] = None,
+                              exclude_urls: List[str] = None, needed: int = RECIPE_RESULT_COUNT) -> List[Dict[str, Any]]:
+    """
+    정적 필터(히스토리 제외/크롤링 가능/개인 선호도)를 먼저 적용한 뒤,
+    남은 후보의 접근 가능 여부를 동시에 검증해 순위대로 상위 needed개를 카드로 만듭니다.
+    """
+    exclude_urls = exclude_urls or []
+    candidates = []
+    seen = set()
 
-            if not _quick_validate_url(url):
-                logger.info(f"접근 불가능한 URL 제외: {url}")
-                continue
+    for res in results:
+        url = res.get("url", "")
 
-            if user_preferences and should_exclude_recipe_content(
-                res.get("title", ""), res.get("content", ""), user_preferences
-            ):
-                logger.info(f"개인 선호도에 의해 제외된 레시피: {res.get('title', 'Unknown')}")
-                continue
+        if url in exclude_urls:
+            logger.info(f"히스토리 기반 URL 제외: {url[:50]}...")
+            continue
 
-            original_title = res.get("title", "제목 없음")
-            content = res.get("content", "")
-
-            title = original_title[:30] + ("..." if len(original_title) > 30 else "")
-            description = content[:150]
-
-            if openai_client and (original_title or content):
-                try:
-                    if original_title:
-                        title_response = openai_client.chat.completions.create(
-                            model=Config.OPENAI_MODEL,
-                            messages=[
-                                {"role": "system", "content": "다음 레시피 제목을 30글자 내로 간단명료하게 요약해줘. 예시: '자취생도 쉽게 만드는 초간단 김치찌개 레시피' / '자꾸 땡기는 마약양념의 매콤한 닭볶음탕 조리법"},
-                                {"role": "user", "content": f"제목 요약: {original_title}"}
-                            ],
-                            temperature=0.1, max_tokens=20
-                        )
-                        title_summary = title_response.choices[0].message.content.strip()
-                        
-                        title_summary = title_summary.strip('"').strip("'")
-                        title = title_summary[:30] + ("..." if len(title_summary) > 30 else "")
-
-                    if content:
-                        desc_response = openai_client.chat.completions.create(
-                            model=Config.OPENAI_MODEL,
-                            messages=[
-                                {"role": "system", "content": "다음 레시피 내용을 20~30글자로 간단명료하게 요약해줘. 답변 예시 1: 김치·참치 볶아 두부 올린 매콤찌개 완성. 답변 예시 2: 닭고기 데쳐 채소 넣고 매콤하게 끓인 닭볶음탕"},
-                                {"role": "user", "content": f"요약: {content[:300]}"}
-                            ],
-                            temperature=0.1, max_tokens=30
-                        )
-                        desc_summary = desc_response.choices[0].message.content.strip()
-                        description = desc_summary[:30] + ("..." if len(desc_summary) > 30 else "")
-                except Exception:
-                    pass
-
-            validated_results.append({
-                "title": title,
-                "url": url,
-                "description": description
-            })
-
-            if len(validated_results) >= 3:
-                break
+        if not url or url in seen or not _is_crawlable_url(url):
+            continue
+
+        if user_preferences and should_exclude_recipe_content(
+            res.get("title", ""), res.get("content", ""), user_preferences
+        ):
+            logger.info(f"개인 선호도에 의해 제외된 레시피: {res.get('title', 'Unknown')}")
+            continue
+
+        seen.add(url)
+        candidates.append(res)
+
+    by_url = {res["url"]: res for res in candidates}
+    # 차단 도메인은 빼고, 불안정/느린 도메인은 뒤로 미룬 순서로 검증
+    ordered_urls = url_health_cache.prioritize(list(by_url))
+
+    # 검증 결과를 기다리는 동안 상위 후보 요약을 미리 생성
+    prefetch = _summary_executor.submit(
+        _summarize_recipes_batch, [by_url[url] for url in ordered_urls[:RECIPE_SUMMARY_PREFETCH]])
+    valid_urls = _validate_urls_in_order(ordered_urls, needed=needed)
+    logger.info(f"URL 동시 검증: 후보 {len(candidates)}개 중 {len(valid_urls)}개 선택")
+
+    selected = [by_url[url] for url in valid_urls]
+    try:
+        summaries = prefetch.result()
+    except Exception:
+        summaries = {}
+    if any(res["url"] not in summaries for res in selected):
+        summaries.update(_summarize_recipes_batch([res for res in selected if res["url"] not in summaries]))
+
+    return [_build_recipe_card(res, summaries) for res in selected]
+
+def _search_recipes_local_first(query: str, user_preferences: Dict[str, Any] = None,
+                                exclude_urls: List[str] = None) -> List[Dict[str, Any]]:
+    """
+    로컬 레시피 색인(즐겨찾기 + 크롤링 저장소)을 먼저 검색하고,
+    조건을 만족하는 결과가 RECIPE_RESULT_COUNT개 미만일 때만 Tavily로 나머지를 채웁니다.
+    """
+    exclude_urls = exclude_urls or []
+    local_results = []
+    try:
+        local_results = recipe_local_index.search(query, user_preferences, exclude_urls, top_k=RECIPE_RESULT_COUNT)
+    except Exception as e:
+        logger.warning(f"로컬 레시피 색인 검색 실패, Tavily만 사용: {e}")
+
+    selected = _select_validated_recipes(local_results, user_preferences, exclude_urls) if local_results else []
+    if len(selected) >= RECIPE_RESULT_COUNT:
+        logger.info(f"로컬 레시피 색인으로 응답: {len(selected)}개 (Tavily 호출 생략)")
+        return selected
+
+    remote_results = _tavily_search_results(query, user_preferences, exclude_urls)
+    taken = exclude_urls + [res["url"] for res in local_results]
+    selected += _select_validated_recipes(remote_results, user_preferences, taken,
+                                          needed=RECIPE_RESULT_COUNT - len(selected))
+    if local_results:
+        logger.info(f"로컬 {len(local_results)}개 후보 + Tavily 보충 → {len(selected)}개")
+    return selected
+
+def _search_with_tavily_filtered(query: str, user_preferences: Dict[str, Any] = None, exclude_urls: List[str] = None) -> List[Dict[str, Any]]:
+    """히스토리 기반 Tavily 검색 (이전 결과 제외)"""
+    exclude_urls = exclude_urls or []
+
+    try:
+        validated_results = _search_recipes_local_first(query, user_preferences, exclude_urls)
 
         logger.info(f"히스토리 필터링된 레시피 URL: {len(validated_results)}개 (제외된 URL: {len(exclude_urls)}개)")
         return validated_results
@@ -671,103 +1067,7 @@ def _search_with_tavily_filtered(query: str, user_preferences: Dict[str, Any] =
 def _search_with_tavily(query: str, user_preferences: Dict[str, Any] = None) -> List[Dict[str, Any]]:
     """Tavily API로 레시피를 검색하고, 결과를 섞은 후 검증합니다."""
     try:
-        from tavily import TavilyClient
-        client = TavilyClient(api_key=TAVILY_API_KEY)
-        
-        logger.info(f"Tavily 검색 실행: '{query}'")
-        
-        vegan_mode = bool(user_preferences and user_preferences.get("vegan"))
-        vegan_terms = ["비건","vegan","plant-based","dairy-free","egg-free"] if vegan_mode else []
-
-        include_domains = [
-            "10000recipe.com", "minimalistbaker.com", "www.bbcgoodfood.com",
-            "www.seriouseats.com", "www.allrecipes.com", "www.loveandlemons.com",
-            "minimalistbaker.com", "ohsheglows.com", "noracooks.com",
-            "lovingitvegan.com", "rainbowplantlife.com", "www.loveandlemons.com",
-            "itdoesnttastelikechicken.com", "sweetpotatosoul.com", "thevegan8.com"
-        ]
-        exclude_domains = ["youtube.com","instagram.com","facebook.com","tiktok.com", "blog.naver.com"]
-
-        exclusion_terms = []
-        if user_preferences and user_preferences.get("allergy"):
-            allergy_items = user_preferences["allergy"].split(",")
-            for item in allergy_items:
-                exclusion_terms.append(f"-{item.strip()}")
-            logger.info(f"알러지 기반 제외 키워드 추가: {allergy_items}")
-
-        enhanced_query = (f"{query} 레시피 {' '.join(vegan_terms)} {' '.join(exclusion_terms)}").strip()
-        
-        res = client.search(
-            query=enhanced_query,
-            search_depth="basic",
-            max_results=30,
-            include_domains=include_domains,
-            exclude_domains=exclude_domains,
-            include_raw_content=True,
-        )
-        results = res.get("results", [])
-
-        validated_results = []
-        
-        for res in results:
-            url = res.get("url", "")
-            
-            if not url or not _is_crawlable_url(url):
-                continue
-            
-            if not _quick_validate_url(url):
-                logger.info(f"접근 불가능한 URL 제외: {url}")
-                continue
-            
-            if user_preferences and should_exclude_recipe_content(
-                res.get("title", ""), res.get("content", ""), user_preferences
-            ):
-                logger.info(f"개인 선호도에 의해 제외된 레시피: {res.get('title', 'Unknown')}")
-                continue
-            
-            original_title = res.get("title", "제목 없음")
-            content = res.get("content", "")
-            
-            title = original_title[:30] + ("..." if len(original_title) > 30 else "")
-            description = content[:150]
-            
-            if openai_client and (original_title or content):
-                try:
-                    if original_title:
-                        title_response = openai_client.chat.completions.create(
-                            model=Config.OPENAI_MODEL,
-                            messages=[
-                                {"role": "system", "content": "다음 레시피 제목을 30글자 내로 간단명료하게 요약해줘. 예시: '자취생도 쉽게 만드는 초간단 김치찌개 레시피' / '자꾸 땡기는 마약양념의 매콤한 닭볶음탕 조리법"},
-                                {"role": "user", "content": f"제목 요약: {original_title}"}
-                            ],
-                            temperature=0.1, max_tokens=20
-                        )
-                        title_summary = title_response.choices[0].message.content.strip()
-                        title_summary = title_summary.strip('"').strip("'")
-                        title = title_summary[:30] + ("..." if len(title_summary) > 30 else "")
-                    
-                    if content:
-                        desc_response = openai_client.chat.completions.create(
-                            model=Config.OPENAI_MODEL,
-                            messages=[
-                                {"role": "system", "content": "다음 레시피 내용을 20~30글자로 간단명료하게 요약해줘. 답변 예시 1: 김치·참치 볶아 두부 올린 매콤찌개 완성. 답변 예시 2: 닭고기 데쳐 채소 넣고 매콤하게 끓인 닭볶음탕"},
-                                {"role": "user", "content": f"요약: {content[:300]}"}
-                            ],
-                            temperature=0.1, max_tokens=30
-                        )
-                        desc_summary = desc_response.choices[0].message.content.strip()
-                        description = desc_summary[:30] + ("..." if len(desc_summary) > 30 else "")
-                except Exception:
-                    pass
-
-            validated_results.append({
-                "title": title,
-                "url": url,
-                "description": description            
-            })
-            
-            if len(validated_results) >= 3:
-                break
+        validated_results = _search_recipes_local_first(query, user_preferences)
         
         logger.info(f"검증된 레시피 URL: {len(validated_results)}개")
         return validated_results
@@ -777,27 +1077,123 @@ def _search_with_tavily(query: str, user_preferences: Dict[str, Any] = None) ->
         return []
 
 def _scrape_and_structure_recipe(url: str) -> Optional[Dict[str, Any]]:
-    """URL을 크롤링하고 LLM을 사용해 내용을 구조화합니다."""
+    """
+    URL의 구조화된 레시피를 반환합니다.
+    - 저장소에 있으면 바로 반환 (검증 시각이 오래됐으면 백그라운드에서 조건부 재검증)
+    - 없으면 크롤링 + LLM 구조화 후 저장
+    """
+    doc = recipe_store.get(url)
+    if doc and doc.get("version") == RECIPE_EXTRACT_VERSION:
+        if not doc["fresh"]:
+            _schedule_recipe_revalidation(url, doc)
+        logger.info(f"레시피 저장소 사용: {url} (fresh={doc['fresh']})")
+        return copy.deepcopy(doc["recipe"])
+    return _fetch_and_structure_recipe(url)
+
+def _schedule_recipe_revalidation(url: str, doc: Dict[str, Any]) -> None:
+    with _revalidate_lock:
+        if url in _revalidating:
+            return
+        _revalidating.add(url)
+
+    def _run():
+        try:
+            _fetch_and_structure_recipe(url, doc)
+        finally:
+            with _revalidate_lock:
+                _revalidating.discard(url)
+
+    _revalidate_executor.submit(_run)
+
+def _fetch_and_structure_recipe(url: str, doc: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """URL을 크롤링하고 LLM을 사용해 내용을 구조화합니다. doc이 있으면 조건부 GET으로 변경 여부부터 확인"""
     logger.info(f"URL 크롤링 및 분석 시작: {url}")
     try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'lxml') 
-        for t in soup(["script", "style", "noscript"]): 
-            t.decompose()
-        page_text = soup.get_text(separator='\n', strip=True)
+        response = recipe_crawler.fetch(url, recipe_store.conditional_headers(doc))
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if doc and response.not_modified:
+            recipe_store.touch(url, etag, last_modified)
+            return copy.deepcopy(doc["recipe"])
         
-        if not openai_client:
-            logger.warning("OpenAI 클라이언트가 없어 레시피 구조화 불가.")
-            return None
-            
-        return _llm_extract_recipe_content(page_text[:4000])
+        page = extract_page_text(response.html, limit=4000)
+        page_title = page.title
+        page_text = page.text
+        schema_recipe = extract_schema_recipe_from_json_ld(page.json_ld)
+        if not schema_recipe:
+            # 마이크로데이터이거나 본문 뒤쪽 JSON-LD(텍스트 한도로 파싱을 멈춘 경우)만 전체 트리로 확인
+            lowered = response.html.lower()
+            if "schema.org/recipe" in lowered or (not page.complete and "ld+json" in lowered):
+                schema_recipe = extract_schema_recipe(BeautifulSoup(response.html, 'lxml'))
+
+        content_hash = text_hash(page_text)
+        if doc and doc.get("text_hash") == content_hash:
+            recipe_store.touch(url, etag, last_modified, not_modified=False)
+            return copy.deepcopy(doc["recipe"])
+
+        if schema_recipe:
+            # schema.org 구조화 데이터가 있으면 본문 LLM 추출 생략, 재료명 표준화만 수행
+            ingredients, used_llm = _normalize_schema_ingredients(schema_recipe["ingredient_lines"])
+            structured_content = {
+                "title": schema_recipe["title"] or page_title or "레시피 정보",
+                "ingredients": ingredients,
+                "instructions": schema_recipe["instructions"] or "조리법 정보가 없습니다."
+            }
+            schema_stats.record(schema_recipe["source"], used_llm)
+            logger.info(f"구조화 데이터({schema_recipe['source']})로 레시피 추출: 재료 {len(ingredients)}개")
+        else:
+            if not openai_client:
+                logger.warning("OpenAI 클라이언트가 없어 레시피 구조화 불가.")
+                return None
+            structured_content = _llm_extract_recipe_content(page_text)
+            schema_stats.record(None)
+
+        if structured_content and structured_content.get("ingredients"):
+            recipe_store.put(url, copy.deepcopy(structured_content), content_hash,
+                             RECIPE_EXTRACT_VERSION, etag, last_modified)
+        return structured_content
 
     except Exception as e:
         logger.error(f"URL 크롤링 및 구조화 실패 {url}: {e}")
-        return None
+        return copy.deepcopy(doc["recipe"]) if doc else None
+
+def _normalize_schema_ingredients(lines: List[str]) -> Tuple[List[str], bool]:
+    """
+    구조화 데이터의 재료 줄('다진마늘 2쪽', '2 cups flour')을 핵심 재료명으로 표준화한 뒤 DB 품목명으로 매핑합니다.
+    반환: (재료명 목록, LLM 사용 여부). LLM이 없거나 실패하면 수량/단위만 제거
+    """
+    if openai_client and lines:
+        ingredients = _llm_normalize_ingredient_lines(lines)
+        if ingredients:
+            return ingredients, True
+    return item_vocabulary.map_ingredients([strip_quantity(line) for line in lines]), False
+
+def _llm_normalize_ingredient_lines(lines: List[str]) -> List[str]:
+    """LLM으로 재료 줄을 핵심 재료명으로 표준화한 뒤 품목명으로 매핑 (실패 시 빈 목록)"""
+    try:
+        response = openai_client.chat.completions.create(
+            model=Config.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": (
+                    "레시피 재료 줄 목록을 신선식품 쇼핑몰 품목명으로 표준화해줘.\n"
+                    "- 수량/단위/조리 상태/수식어 제거 후 핵심 명사만 ('다진마늘 2쪽' → '마늘', '신김치' → '김치')\n"
+                    "- 외국어 재료는 한국어 품목명으로 ('2 cups flour' → '밀가루')\n"
+                    "- 부위/품종 대신 대표 품목명 사용 ('삼겹살' → '돼지고기', '계란' → '달걀')\n"
+                    "- 물, 얼음처럼 구매 대상이 아닌 것은 제외\n"
+                    '반드시 JSON으로만 답해: {"ingredients": ["재료1", "재료2"]}'
+                )},
+                {"role": "user", "content": json.dumps(lines[:40], ensure_ascii=False)}
+            ],
+            temperature=0.1,
+            max_tokens=300,
+            response_format={"type": "json_object"},
+        )
+        parsed = json.loads(response.choices[0].message.content or "{}")
+        return item_vocabulary.map_ingredients([str(i) for i in parsed.get("ingredients", [])])
+    except Exception as e:
+        logger.warning(f"구조화 재료 표준화 실패: {e}")
+        return []
 
 def _extract_recipe_query(original_query: str, rewrite_query: str = "") -> str:
     """사용자 쿼리에서 검색에 사용할 핵심 레시피명을 추출합니다."""
@@ -818,39 +1214,12 @@ def _extract_recipe_query(original_query: str, rewrite_query: str = "") -> str:
         logger.error(f"LLM 쿼리 추출 실패: {e}")
         return f"{original_query} 레시피"
 
-def _get_all_items_from_db() -> List[str]:
-    """DB에서 모든 품목명(item)을 가져와서 중복 제거된 리스트로 반환합니다."""
-    conn = get_db_connection()
-    if not conn:
-        logger.warning("DB 연결 실패로 품목명을 가져올 수 없습니다.")
-        return []
-
-    try:
-        with conn.cursor() as cursor:
-            sql = "SELECT DISTINCT item FROM product_tbl WHERE item IS NOT NULL ORDER BY item"
-            cursor.execute(sql)
-            items = [row[0] for row in cursor.fetchall()]
-            logger.info(f"DB에서 {len(items)}개의 품목명을 가져왔습니다.")
-            return items
-    except Error as e:
-        logger.error(f"품목명 조회 실패: {e}")
-        return []
-    finally:
-        if conn and conn.is_connected():
-            conn.close()
-
 def _llm_extract_recipe_content(page_text: str) -> Dict[str, Any]:
     """LLM을 사용하여 웹페이지 텍스트에서 레시피 정보를 JSON 형태로 구조화합니다."""
     
-    db_items = _get_all_items_from_db()
-    db_items_str = ", ".join(db_items) if db_items else "품목 데이터를 가져올 수 없음"
-    
     system_prompt = f"""당신은 신선식품 쇼핑몰을 위한 레시피 분석 전문가입니다.
 웹페이지 텍스트에서 레시피 정보를 추출하여 고객에게 필요한 재료를 추천할 수 있도록 도와주세요.
 
-**🔍 DB 품목 참조 데이터:**
-{{{db_items_str}}}
-
 **추출 규칙:**
 1. **title**: 요리의 정확한 이름 (예: "김치찌개", "볶음밥")
 2. **ingredients**: 쇼핑몰에서 구매 가능한 신선식품 재료만 추출
@@ -883,23 +1252,20 @@ def _llm_extract_recipe_content(page_text: str) -> Dict[str, Any]:
 
 **핵심**: 하나의 단어로 보이더라도 반드시 의미 단위로 분해하세요
 ---
-## 2단계: DB 품목명 표준화
+## 2단계: 대표 품목명 표준화
 
-**분해된 재료를 DB 품목 참조 데이터와 비교하여 표준화하세요**
+**분해된 재료를 신선식품 쇼핑몰에서 쓰는 대표 품목명으로 표준화하세요**
 
-**DB 표준화 예시:**
-- '계란' → '달걀' (DB에 있는 정확한 품목명 사용)
-- '삼겹살', '목살', '갈비살' → '돼지고기' (DB에 '돼지고기'로 통합)
-- '치킨', '닭다리', '닭가슴살' → '닭고기' (DB에 '닭고기'로 통합)
-- '쪽파', '파' → '대파' (DB에 '대파'로 표준화)
-- '양배추' → '배추' (DB에 '배추'로 등록)
-- '고춧가루', '빨간 고추' → '고추' (DB에 '고추'로 표준화)
-- '청경채', '로메인' → '상추' (DB에 '상추'로 분류)
+**표준화 예시:**
+- '계란' → '달걀'
+- '삼겹살', '목살', '갈비살' → '돼지고기'
+- '치킨', '닭다리', '닭가슴살' → '닭고기'
+- '쪽파', '파' → '대파'
+- '고춧가루', '빨간 고추' → '고추'
 
 **표준화 원칙:**
-1. 먼저 DB 품목 데이터에서 정확히 일치하는 명칭이 있는지 확인
-2. 일치하는 명칭이 없으면 유사한 카테고리의 대표 품목명으로 매핑
-3. DB에 전혀 없는 재료는 일반적인 명칭 사용
+1. 부위/품종/가공 형태보다 상위의 대표 품목명 사용
+2. 대표 품목명이 애매하면 일반적인 명칭 사용
 
 ---
 
@@ -913,10 +1279,10 @@ def _llm_extract_recipe_content(page_text: str) -> Dict[str, Any]:
 "신김치" → "김치" 
 "삼겹살" → "삼겹살" (이미 기본형)
 
-**2단계 처리 (DB 표준화):**
-"마늘" → "마늘" (DB에 있음)
+**2단계 처리 (표준화):**
+"마늘" → "마늘"
 "김치" → "김치" (일반 명칭 유지)
-"삼겹살" → "돼지고기" (DB 표준명)
+"삼겹살" → "돼지고기" (대표 품목명)
 
 **최종 결과:**
 ["마늘", "김치", "돼지고기"]
@@ -926,7 +1292,7 @@ def _llm_extract_recipe_content(page_text: str) -> Dict[str, Any]:
 1. 반드시 1단계(분해) → 2단계(표준화) 순서로 처리하세요
 2. 각 단계를 건너뛰지 말고 순차적으로 적용하세요
 3. 절대로 복합어를 그대로 사용하지 마세요
-4. DB 품목 데이터에서 정확한 명칭을 찾아 사용하세요
+4. 부위/품종명 대신 대표 품목명을 사용하세요
 
 - quantity: 수량을 정확히 추출합니다. 분수('1/2')는 소수점(0.5)으로 변환하고, 수량이 명시되지 않으면 1로 간주합니다.
 - unit: 단위를 정확히 추출합니다. (예: 'g', '개', '컵', 'T', 't')
@@ -1010,6 +1376,9 @@ def _llm_extract_recipe_content(page_text: str) -> Dict[str, Any]:
         content = json.loads(response.choices[0].message.content)
         if isinstance(content.get("ingredients"), str):
             content["ingredients"] = [item.strip() for item in content["ingredients"].split(',')]
+        if isinstance(content.get("ingredients"), list):
+            # 카탈로그 품목명 매핑은 프롬프트 대신 로컬 매처로 수행
+            content["ingredients"] = item_vocabulary.map_ingredients([str(i) for i in content["ingredients"]])
         return content
     except (json.JSONDecodeError, AttributeError) as e:
         logger.error(f"LLM JSON 파싱 실패: {e}")
@@ -6,6 +6,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from graph_interfaces import ChatState
 from utils.chat_history import build_global_context_snapshot
+from utils.context_builder import build_history_context, compact_context_snapshot, record_context_tokens, estimate_tokens
 from config import Config
 
 logger = logging.getLogger("A_ROUTER_CLARIFY")
@@ -29,12 +30,17 @@ def router_route(state: ChatState) -> Dict[str, Any]:
     """
     logger.info(f"라우팅 프로세스 시작: \"{state.query}\"")
     try:
-        history_snapshot = build_global_context_snapshot(state, state.query) 
+        history_snapshot = compact_context_snapshot(build_global_context_snapshot(state, state.query))
+        history_context = build_history_context(state.conversation_history)
         enriched_request = {
             "query": state.query,
             "history": history_snapshot,
-            "recent_messages": state.conversation_history[-6:]
+            "recent_conversation": history_context["text"]
         } 
+        record_context_tokens(
+            state.conversation_history, "router",
+            estimate_tokens(json.dumps(enriched_request, ensure_ascii=False))
+        )
 
         routing_method = "llm" if openai_client else "keyword" 
 
@@ -1,12 +1,13 @@
 import logging
 import os
-import base64
 import json
 from typing import Dict, Any, Optional
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from graph_interfaces import ChatState
+from utils.image_preprocess import ensure_vision_data_url, decode_data_url
+from utils.vision_cache import vision_result_cache, dhash, prompt_version
 
 logger = logging.getLogger("VISION_RECIPE")
 
@@ -73,16 +74,17 @@ def vision_recipe(state: ChatState) -> Dict[str, Any]:
 def _extract_image_from_state(state: ChatState) -> Optional[str]:
     """
     ChatState에서 이미지 데이터를 추출합니다.
-    vision 워크플로우는 state.image에 base64 데이터가 담겨 올 것을 기대합니다.
+    vision 워크플로우는 state.image에 base64 data URL이 담겨 올 것을 기대하며,
+    전처리(축소/재압축)된 data URL을 반환합니다.
     """
     if hasattr(state, 'image') and state.image and 'base64,' in state.image:
         logger.info("state.image에서 base64 이미지 데이터 발견")
-        return state.image.split(',')[1]
+        return ensure_vision_data_url(state.image)
     
     logger.warning("state.image에서 유효한 base64 이미지 데이터를 찾을 수 없음")
     return None
 
-def _analyze_food_image(base64_image_data: str) -> Optional[Dict[str, Any]]:
+def _analyze_food_image(image_data_url: str) -> Optional[Dict[str, Any]]:
     """
     OpenAI Vision API를 사용하여 이미지에서 음식을 분석합니다.
     """
@@ -110,6 +112,13 @@ JSON 형식 예시:
   "ingredients": ["김치", "돼지고기", "두부", "대파"]
 }"""
 
+    version = prompt_version("gpt-4o", system_prompt)
+    image_hash = dhash(decode_data_url(image_data_url))
+    cached = vision_result_cache.lookup(image_hash, version)
+    if cached:
+        logger.info(f"이미지 분석 캐시 적중 (hamming={cached['distance']})")
+        return dict(cached["result"])
+
     try:
         response = openai_client.chat.completions.create(
             model="gpt-4o",
@@ -122,7 +131,7 @@ JSON 형식 예시:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image_data}"
+                                "url": image_data_url
                             }
                         }
                     ]
@@ -133,6 +142,7 @@ JSON 형식 예시:
         )
         result = json.loads(response.choices[0].message.content)
         logger.info(f"이미지 분석 결과: {result}")
+        vision_result_cache.store(image_hash, version, result)
         return result
     except Exception as e:
         logger.error(f"OpenAI 이미지 분석 API 호출 실패: {e}")
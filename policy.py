@@ -1,8 +1,7 @@
 import logging
-from mysql.connector import Error
 from typing import Dict, Any, List, Tuple
 
-from utils.db import get_db_connection
+from utils.user_profile_cache import get_user_profile
 
 logger = logging.getLogger("PERSONALIZED_POLICY")
 
@@ -22,7 +21,7 @@ EXCLUDED_DOMAINS = [
 
 def get_user_preferences(user_id: str) -> Dict[str, Any]:
     """
-    사용자의 개인 선호도 정보를 조회합니다.
+    사용자의 개인 선호도 정보를 조회합니다. (utils.user_profile_cache TTL 캐시 경유)
     
     Args:
         user_id: 사용자 ID
@@ -33,39 +32,17 @@ def get_user_preferences(user_id: str) -> Dict[str, Any]:
     if not user_id:
         logger.warning("user_id가 제공되지 않음")
         return {"allergy": None, "vegan": False, "unfavorite": None}
-    
-    conn = get_db_connection()
-    if not conn:
-        logger.error("DB 연결 실패")
-        return {"allergy": None, "vegan": False, "unfavorite": None}
-    
-    try:
-        with conn.cursor(dictionary=True) as cursor:
-            query = """
-                SELECT allergy, vegan, unfavorite 
-                FROM user_detail_tbl 
-                WHERE user_id = %s
-            """
-            cursor.execute(query, (user_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                logger.info(f"사용자 {user_id} 개인정보 조회 성공")
-                return {
-                    "allergy": result.get("allergy"),
-                    "vegan": bool(result.get("vegan", 0)),
-                    "unfavorite": result.get("unfavorite")
-                }
-            else:
-                logger.warning(f"사용자 {user_id}의 개인정보를 찾을 수 없음")
-                return {"allergy": None, "vegan": False, "unfavorite": None}
-                
-    except Error as e:
-        logger.error(f"사용자 선호도 조회 실패: {e}")
+
+    profile = get_user_profile(user_id)
+    if not profile:
+        logger.warning(f"사용자 {user_id}의 개인정보를 찾을 수 없음")
         return {"allergy": None, "vegan": False, "unfavorite": None}
-    finally:
-        if conn and conn.is_connected():
-            conn.close()
+
+    return {
+        "allergy": profile.get("allergy"),
+        "vegan": bool(profile.get("vegan")),
+        "unfavorite": profile.get("unfavorite")
+    }
 
 def create_personalized_search_keywords(base_query: str, user_preferences: Dict[str, Any]) -> Tuple[str, List[str]]:
     """
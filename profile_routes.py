@@ -5,6 +5,7 @@ from mysql.connector import Error
 from datetime import datetime
 import logging
 from utils.db import get_db_connection 
+from utils.user_profile_cache import invalidate_user_profile
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -181,6 +182,7 @@ async def update_user_profile(profile_data: UserProfileUpdate, request: Request)
             cursor.execute(detail_insert_query, detail_values)
 
         connection.commit()
+        invalidate_user_profile(user_id)
         
         return UserProfileResponse(
             success=True,
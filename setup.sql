@@ -307,6 +307,28 @@ ORDER BY TABLE_NAME, COLUMN_NAME;
 ALTER TABLE refund_tbl
   CONVERT TO CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
+-- 환불 증빙 이미지 분석 작업 상태 (uvicorn 워커 간 공유)
+CREATE TABLE IF NOT EXISTS cs_evidence_job_tbl (
+  job_id       CHAR(32)     NOT NULL PRIMARY KEY,
+  user_id      VARCHAR(64)  NOT NULL,
+  order_code   VARCHAR(64)  NOT NULL,
+  product      VARCHAR(255) NOT NULL,
+  status       VARCHAR(20)  NOT NULL DEFAULT 'queued', -- queued|running|done|failed
+  result       JSON         NULL,
+  error        VARCHAR(255) NULL,
+  created_at   DATETIME     NOT NULL,
+  started_at   DATETIME     NULL,
+  finished_at  DATETIME     NULL,
+  KEY idx_evidence_job_finished (finished_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- 프로필/멤버십 변경 시각 (워커 간 사용자 프로필 캐시 무효화용, 사용자당 1행)
+CREATE TABLE IF NOT EXISTS user_profile_change_tbl (
+  user_id      VARCHAR(45)  NOT NULL PRIMARY KEY,
+  changed_at   DATETIME(6)  NOT NULL,
+  KEY idx_profile_change_at (changed_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- =========================
 -- Tavily URL 기반 레시피 즐겨찾기
 -- =========================
@@ -88,21 +88,73 @@
         r.start();
       } catch (err) { console.error(err); bot.addMessage('브라우저 음성인식을 사용할 수 없어요.', 'bot', true); ChatVoice.stopVoiceUI(bot); }
     },
+    openAudioStream(bot){
+      return new Promise((resolve) => {
+        try {
+          const proto = location.protocol === 'https:' ? 'wss' : 'ws';
+          const ws = new WebSocket(`${proto}://${location.host}/api/upload/audio/stream`);
+          ws.binaryType = 'arraybuffer';
+          const timer = setTimeout(() => { try { ws.close(); } catch (_) {} resolve(null); }, 2000);
+          ws.onopen = () => { clearTimeout(timer); resolve(ws); };
+          ws.onerror = () => { clearTimeout(timer); resolve(null); };
+        } catch (_) { resolve(null); }
+      });
+    },
+    finishAudioStream(bot, ws){
+      const input = document.getElementById('messageInput');
+      return new Promise((resolve) => {
+        let done = false;
+        const finish = (data) => { if (done) return; done = true; resolve(data); };
+        ws.onmessage = (e) => {
+          let data = null; try { data = JSON.parse(e.data); } catch (_) { return; }
+          if (data.type === 'partial') { if (input && bot.isRecording) input.value = data.text || ''; }
+          else if (data.type === 'final' || data.type === 'error') finish(data);
+        };
+        ws.onclose = () => finish(null);
+        ws.onerror = () => finish(null);
+        bot.finishStream = () => { try { ws.send(JSON.stringify({ type: 'stop' })); } catch (_) { finish(null); } };
+      });
+    },
     async startMediaRecorder(bot){
       try {
         bot.audioChunks = [];
         bot.mediaStream = await navigator.mediaDevices.getUserMedia({ audio: true });
         const mr = new MediaRecorder(bot.mediaStream);
         bot.mediaRecorder = mr;
-        mr.ondataavailable = (e) => e.data && bot.audioChunks.push(e.data);
+        const ws = await ChatVoice.openAudioStream(bot);
+        const streamDone = ws ? ChatVoice.finishAudioStream(bot, ws) : null;
+        mr.ondataavailable = (e) => {
+          if (!e.data) return;
+          bot.audioChunks.push(e.data);
+          if (ws && ws.readyState === WebSocket.OPEN) ws.send(e.data);
+        };
         mr.onstop = async () => {
           ChatVoice.stopVoiceUI(bot);
+          const input = document.getElementById('messageInput');
           const finalize = () => {
             if (bot.mediaStream) { bot.mediaStream.getTracks().forEach(t => t.stop()); bot.mediaStream = null; }
             bot.mediaRecorder = null;
+            bot.finishStream = null;
+            if (ws && ws.readyState === WebSocket.OPEN) { try { ws.close(); } catch (_) {} }
           };
           try {
-            if (bot.canceled) { finalize(); return; }
+            if (bot.canceled) {
+              if (ws && ws.readyState === WebSocket.OPEN) { try { ws.send(JSON.stringify({ type: 'cancel' })); } catch (_) {} }
+              if (input) input.value = '';
+              finalize(); return;
+            }
+            if (ws && bot.finishStream) {
+              bot.finishStream();
+              const data = await streamDone;
+              if (input) input.value = '';
+              if (data) {
+                const text = (data.text || '').trim();
+                if (text) { bot.addMessage(text, 'user'); bot.sendMessage(text, false); }
+                else if (data.error) { bot.addMessage(data.error, 'bot', true); }
+                else { bot.addMessage('음성 전사를 받을 수 없었어요.', 'bot'); }
+                return;
+              }
+            }
             const blob = new Blob(bot.audioChunks, { type: 'audio/webm' });
             const form = new FormData();
             form.append('audio', blob, 'voice.webm');
@@ -113,11 +165,12 @@
             const data = await res.json();
             const text = (data && data.text || '').trim();
             if (text) { bot.addMessage(text, 'user'); bot.sendMessage(text, false); }
+            else if (data && data.error) { bot.addMessage(data.error, 'bot', true); }
             else if (data && data.url) { const hiddenMsg = `__AUDIO_UPLOADED__ ${data.url}`; bot.sendMessage(hiddenMsg, true); bot.addMessage('음성 전사를 받을 수 없었어요.', 'bot'); }
           } catch (e) { console.error(e); bot.addMessage('오디오 업로드 중 오류가 발생했어요.', 'bot', true); }
           finally { finalize(); }
         };
-        mr.start();
+        mr.start(ws ? 1000 : undefined);
       } catch (err) { console.error(err); bot.addMessage('마이크 접근 권한이 없거나 사용할 수 없어요.', 'bot', true); ChatVoice.stopVoiceUI(bot); }
     },
   };
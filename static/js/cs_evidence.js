@@ -57,7 +57,12 @@
         form.append('quantity', String(quantity||1));
         const headers={}; const csrf = getCSRFToken(); if (csrf) headers['X-CSRFToken']=csrf;
         const res = await fetch('/api/cs/evidence',{ method:'POST', body:form, headers, credentials:'include' });
-        const data = await res.json();
+        const queued = await res.json();
+        if (!res.ok || !queued.job_id){
+          bot.addMessage(String((queued && queued.detail) || '이미지 업로드/분석 중 오류가 발생했어요.'), 'bot', true);
+          return;
+        }
+        const data = await bot.waitEvidenceJob(queued.job_id);
 
         if (data && data.cs && data.cs.message && !data.cs.ticket){
           bot.addMessage(String(data.cs.message), 'bot', true);
@@ -68,6 +73,28 @@
       finally{ bot.hideCustomLoading(); }
     };
 
+    bot.waitEvidenceJob = async function(jobId){
+      const url = `/api/cs/evidence/${encodeURIComponent(jobId)}?user_id=${encodeURIComponent(bot.userId)}`;
+      const deadline = Date.now() + 120000;
+      let delay = 700;
+      let misses = 0;
+      while (Date.now() < deadline){
+        await new Promise(r => setTimeout(r, delay));
+        delay = Math.min(delay * 1.5, 3000);
+        const res = await fetch(url, { credentials:'include' });
+        if (res.status === 404){
+          // 상태 저장소를 일시적으로 못 읽은 경우 몇 번 더 조회
+          if (++misses >= 3) throw new Error('evidence job not found');
+          continue;
+        }
+        misses = 0;
+        const job = await res.json();
+        if (job.status === 'done') return job.result;
+        if (job.status === 'failed') throw new Error(job.error || 'evidence job failed');
+      }
+      throw new Error('evidence job timeout');
+    };
+
     bot._fileDialogClosedCheck = function(){
       try{
         const hasFile = !!(bot.evidenceInput && bot.evidenceInput.files && bot.evidenceInput.files.length>0);
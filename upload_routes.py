@@ -1,7 +1,13 @@
-from fastapi import APIRouter, UploadFile, File, Form
+from fastapi import APIRouter, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 from pathlib import Path
-import uuid, imghdr, os
+import uuid, imghdr, os, json, logging
+
+from utils.transcription import transcription_service, TranscriptionQueueFull
+from utils.stream_transcription import StreamingTranscriber
+from utils.upload_store import save_upload, UploadError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
@@ -16,7 +22,14 @@ AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
 ALLOWED_TYPES = {"jpeg", "png", "gif", "bmp", "webp", "jpg"}
 MAX_MB = 20
-CHUNK_SIZE = 1024 * 1024
+
+
+def _detect_image_kind(path: Path) -> str | None:
+    kind = imghdr.what(path)
+    if kind not in ALLOWED_TYPES:
+        return None
+    return "jpg" if kind == "jpeg" else kind
+
 
 @router.post("/image")
 async def upload_image(
@@ -28,43 +41,14 @@ async def upload_image(
     if not image:
         return JSONResponse({"error": "파일이 비었습니다."}, status_code=400)
 
-    suffix = Path(image.filename).suffix.lower()
-
-    tmp_name = f"tmp_{uuid.uuid4().hex}{suffix or ''}"
-    tmp_path = UPLOAD_DIR / tmp_name
-    written = 0
-
     try:
-      with tmp_path.open("wb") as f:
-          while True:
-              chunk = await image.read(CHUNK_SIZE)
-              if not chunk:
-                  break
-              f.write(chunk)
-              written += len(chunk)
-              if written > MAX_MB * 1024 * 1024:
-                  try: tmp_path.unlink()
-                  except: pass
-                  return JSONResponse({"error": f"최대 {MAX_MB}MB까지만 업로드 가능합니다."}, status_code=413)
-
-      kind = imghdr.what(tmp_path)
-      if kind not in ALLOWED_TYPES:
-          try: tmp_path.unlink()
-          except: pass
-          return JSONResponse({"error": "이미지 파일만 업로드할 수 있습니다."}, status_code=400)
-
-      final_name = f"{uuid.uuid4().hex}.{kind if kind != 'jpeg' else 'jpg'}"
-      final_path = UPLOAD_DIR / final_name
-      tmp_path.rename(final_path)
-
-      return {"url": f"/static/uploads/{final_name}"}
-
+        stored = await save_upload(image, UPLOAD_DIR, MAX_MB * 1024 * 1024, detect_kind=_detect_image_kind,
+                                   unsupported_message="이미지 파일만 업로드할 수 있습니다.")
+        return {"url": f"/static/uploads/{stored.name}"}
+    except UploadError as e:
+        return JSONResponse({"error": e.message}, status_code=e.status_code)
     except Exception as e:
-      try:
-          if tmp_path.exists(): tmp_path.unlink()
-      except:
-          pass
-      return JSONResponse({"error": f"업로드 실패: {e}"}, status_code=500)
+        return JSONResponse({"error": f"업로드 실패: {e}"}, status_code=500)
 
 
 
@@ -78,27 +62,97 @@ async def upload_audio(
         return JSONResponse({"error": "오디오가 비었습니다."}, status_code=400)
 
     ext = Path(audio.filename).suffix.lower() or ".webm"
-    fname = f"{uuid.uuid4().hex}{ext}"
-    fpath = AUDIO_DIR / fname
 
     try:
-        with fpath.open("wb") as f:
-            f.write(await audio.read())
+        stored = await save_upload(audio, AUDIO_DIR, MAX_MB * 1024 * 1024, suffix=ext)
+    except UploadError as e:
+        return JSONResponse({"error": e.message}, status_code=e.status_code)
+    fpath, fname = stored.path, stored.name
 
+    try:
         text = ""
 
         try:
-            from faster_whisper import WhisperModel
-            model = WhisperModel("base", device="cpu")
-            segments, info = model.transcribe(str(fpath), language="ko")
-            text = "".join(seg.text for seg in segments).strip()
-        except Exception:
-
-            pass
+            result = await transcription_service.transcribe(str(fpath), language="ko")
+            text = result["text"]
+            logger.info(f"음성 전사 완료: {result['duration']}s 오디오, {result['elapsed']}s 소요, RTF={result['rtf']}")
+        except TranscriptionQueueFull:
+            return JSONResponse({"url": f"/static/uploads/audio/{fname}", "text": "",
+                                 "error": "음성 인식 요청이 많아요. 잠시 후 다시 시도해주세요."}, status_code=503)
+        except Exception as e:
+            logger.warning(f"음성 전사 실패: {e}")
 
         return {"url": f"/static/uploads/audio/{fname}", "text": text}
     except Exception as e:
-        if fpath.exists():
+        if fpath.exists() and not stored.deduplicated:
             try: os.remove(fpath)
             except: pass
         return JSONResponse({"error": f"오디오 업로드 실패: {e}"}, status_code=500)
+
+
+@router.websocket("/audio/stream")
+async def stream_audio(websocket: WebSocket):
+    """
+    녹음 중 오디오 청크를 받아 부분 전사를 흘려보내는 WebSocket
+    - binary 프레임: MediaRecorder 청크
+    - text 프레임: {"type": "stop"} 종료 후 최종 전사, {"type": "cancel"} 폐기
+    - 응답: {"type": "partial", "text"} ... {"type": "final", "text", "url"}
+    """
+    await websocket.accept()
+    fname = f"{uuid.uuid4().hex}.webm"
+    fpath = AUDIO_DIR / fname
+    session = StreamingTranscriber(fpath, transcription_service, language="ko")
+    last_sent = ""
+    # final 메시지로 URL을 넘긴 경우에만 파일 유지 (취소/끊김/용량 초과 시 부분 파일 삭제)
+    delivered = False
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect()
+
+            chunk = message.get("bytes")
+            if chunk:
+                session.write(chunk)
+                if session.bytes_received > MAX_MB * 1024 * 1024:
+                    await websocket.send_json({"type": "error", "error": f"최대 {MAX_MB}MB까지만 녹음할 수 있습니다."})
+                    break
+                partial = await session.partial()
+                if partial and partial["text"] != last_sent:
+                    last_sent = partial["text"]
+                    await websocket.send_json({"type": "partial", "text": last_sent})
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "{}")
+            except ValueError:
+                continue
+            if control.get("type") == "cancel":
+                await websocket.close()
+                return
+            if control.get("type") == "stop":
+                try:
+                    result = await session.finish()
+                    await websocket.send_json({"type": "final", "text": result["text"],
+                                               "url": f"/static/uploads/audio/{fname}"})
+                    delivered = True
+                except TranscriptionQueueFull:
+                    await websocket.send_json({"type": "error", "text": session.text,
+                                               "error": "음성 인식 요청이 많아요. 잠시 후 다시 시도해주세요."})
+                except Exception as e:
+                    logger.warning(f"스트리밍 음성 전사 실패: {e}")
+                    await websocket.send_json({"type": "final", "text": session.text,
+                                               "url": f"/static/uploads/audio/{fname}"})
+                    delivered = True
+                break
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("음성 스트림 연결 종료")
+    finally:
+        session.close()
+        if not delivered and fpath.exists():
+            try:
+                os.remove(fpath)
+            except OSError as e:
+                logger.warning(f"부분 녹음 파일 삭제 실패: {e}")
@@ -9,6 +9,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from graph_interfaces import ChatState
 from config import Config
+from utils.conversation_buffer import ConversationHistory
+from utils.context_builder import build_history_context, record_context_tokens, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,9 @@ def add_to_history(state: ChatState, role: str, content: str, **metadata) -> Non
         **metadata
     }
 
+    if not isinstance(state.conversation_history, ConversationHistory):
+        state.conversation_history = ConversationHistory(state.conversation_history or [])
+
     state.conversation_history.append(message)
 
     logger.info(f"Added to memory history [{len(state.conversation_history)} total]: {role} - {content[:50]}...")
@@ -64,25 +69,20 @@ def manage_history_length(state: ChatState, max_messages: int = 15) -> None:
     if len(state.conversation_history) > max_messages:
 
         trimmed_count = len(state.conversation_history) - max_messages
-        state.conversation_history = state.conversation_history[-max_messages:]
+        if isinstance(state.conversation_history, ConversationHistory):
+            state.conversation_history.trim_front(trimmed_count)
+        else:
+            state.conversation_history = state.conversation_history[-max_messages:]
 
         logger.info(f"Memory history trimmed: removed {trimmed_count} old messages, kept {max_messages} recent messages")
 
 
 def get_recent_context(history: List[Dict], turns: int = 3) -> str:
-    """최근 대화 맥락 요약 (기존 호환성 유지)"""
+    """최근 대화 맥락 요약 (롤링 요약 + 토큰 예산 내 최근 메시지, 기존 호환성 유지)"""
     if not history:
         return "새로운 대화"
 
-    recent_messages = history[-turns*2:] if len(history) >= turns*2 else history
-    context_parts = []
-
-    for msg in recent_messages:
-        role = "사용자" if msg["role"] == "user" else "봇"
-        content = msg["content"][:100] + "..." if len(msg["content"]) > 100 else msg["content"]
-        context_parts.append(f"{role}: {content}")
-
-    return "\n".join(context_parts)
+    return build_history_context(history, max_messages=turns * 2)["text"]
 
 
 def get_contextual_analysis(history: List[Dict], current_query: str) -> Dict[str, Any]:
@@ -106,6 +106,7 @@ def get_contextual_analysis_llm(history: List[Dict], current_query: str) -> Dict
     try:
         recent_context = get_recent_context(history, turns=5)
         is_empty_history = recent_context == "새로운 대화"
+        record_context_tokens(history, "contextual_analysis", estimate_tokens(recent_context))
 
         system_prompt = """
 🚨 **절대 규칙 - 반드시 준수하세요**:
@@ -1040,11 +1041,14 @@ def _generate_context_summary(most_recent: Dict, related_searches: List, current
 
 
 def get_recent_messages_by_intents(state: ChatState, intents: List[str], limit: int = 5) -> List[Dict[str, Any]]:
-    """지정된 intent 목록에 해당하는 최근 메시지 추출"""
+    """지정된 intent 목록에 해당하는 최근 메시지 추출 (ConversationHistory면 링버퍼 조회)"""
     history = getattr(state, "conversation_history", [])
     if not history:
         return []
 
+    if isinstance(history, ConversationHistory):
+        return history.recent_by_intents(intents, limit)
+
     collected: List[Dict[str, Any]] = []
     for message in reversed(history):
         if message.get("intent") in intents:
@@ -1055,8 +1059,21 @@ def get_recent_messages_by_intents(state: ChatState, intents: List[str], limit:
     return list(reversed(collected))
 
 
+def _cached_history_summary(state: ChatState, key: tuple, factory) -> Dict[str, Any]:
+    """히스토리 버전 단위로 요약 결과를 캐시 (append 시 무효화)"""
+    history = getattr(state, "conversation_history", None)
+    if isinstance(history, ConversationHistory):
+        return history.cached(key, factory)
+    return factory()
+
+
 def summarize_product_search_with_history(state: ChatState, current_query: str, limit: int = 3) -> Dict[str, Any]:
     """상품 검색 멀티턴 컨텍스트 요약"""
+    summary = _cached_history_summary(state, ("product", limit), lambda: _summarize_product_history(state, limit))
+    return {**summary, "current_query": current_query}
+
+
+def _summarize_product_history(state: ChatState, limit: int) -> Dict[str, Any]:
     recent_messages = get_recent_messages_by_intents(state, ["product_search", "product_recommendation"], limit)
     recent_queries = [msg.get("content", "") for msg in recent_messages]
 
@@ -1074,13 +1091,16 @@ def summarize_product_search_with_history(state: ChatState, current_query: str,
         "has_previous_search": bool(recent_messages),
         "recent_queries": recent_queries,
         "last_slots": last_slots,
-        "recent_candidates": recent_candidates,
-        "current_query": current_query
+        "recent_candidates": recent_candidates
     }
 
 
 def summarize_cart_actions_with_history(state: ChatState, limit: int = 5) -> Dict[str, Any]:
     """장바구니 관련 멀티턴 맥락 요약"""
+    return _cached_history_summary(state, ("cart", limit), lambda: _summarize_cart_history(state, limit))
+
+
+def _summarize_cart_history(state: ChatState, limit: int) -> Dict[str, Any]:
     intents = ["cart_add", "cart_remove", "cart_view", "checkout"]
     recent_actions = get_recent_messages_by_intents(state, intents, limit)
 
@@ -1112,6 +1132,10 @@ def summarize_cart_actions_with_history(state: ChatState, limit: int = 5) -> Dic
 
 def summarize_cs_history(state: ChatState, limit: int = 5) -> Dict[str, Any]:
     """고객센터(배송/환불 등) 대화 맥락 요약"""
+    return _cached_history_summary(state, ("cs", limit), lambda: _summarize_cs_history(state, limit))
+
+
+def _summarize_cs_history(state: ChatState, limit: int) -> Dict[str, Any]:
     intents = ["cs_inquiry", "cs_followup", "refund", "delivery"]
     recent_cs = get_recent_messages_by_intents(state, intents, limit)
 
@@ -1129,7 +1153,7 @@ def summarize_cs_history(state: ChatState, limit: int = 5) -> Dict[str, Any]:
 
 
 def build_global_context_snapshot(state: ChatState, current_query: str) -> Dict[str, Any]:
-    """각 도메인의 맥락 요약을 통합한 스냅샷 생성"""
+    """각 도메인의 맥락 요약을 통합한 스냅샷 생성 (도메인 요약은 히스토리 버전당 1회 계산)"""
     return {
         "product": summarize_product_search_with_history(state, current_query),
         "cart": summarize_cart_actions_with_history(state),
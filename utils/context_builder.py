@@ -0,0 +1,253 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import logging
+import os
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from utils.conversation_buffer import ConversationHistory
+
+logger = logging.getLogger(__name__)
+
+try:
+    import openai
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if openai_api_key:
+        openai_client = openai.OpenAI(api_key=openai_api_key)
+    else:
+        openai_client = None
+        logger.warning("OpenAI API key not found. Using fallback summarization.")
+except ImportError:
+    openai_client = None
+    logger.warning("OpenAI package not available.")
+
+EMPTY_CONTEXT = "새로운 대화"
+SUMMARY_MAX_CHARS = 600
+MESSAGE_MAX_CHARS = 200
+
+_summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 보수적 토큰 추정 (ASCII 4자당 1토큰, 한글 등은 1자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def _format_message(message: Dict[str, Any]) -> str:
+    role = "사용자" if message.get("role") == "user" else "봇"
+    content = str(message.get("content") or "")
+    if len(content) > MESSAGE_MAX_CHARS:
+        content = content[:MESSAGE_MAX_CHARS] + "..."
+    return f"{role}: {content}"
+
+
+def build_history_context(history: List[Dict[str, Any]], max_messages: int = 6,
+                          budget_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    롤링 요약 + 최근 원문 메시지를 토큰 예산 안에서 조합한 공용 히스토리 컨텍스트
+
+    Args:
+        history: conversation_history (ConversationHistory면 요약/캐시 사용)
+        max_messages: 포함할 최근 원문 메시지 최대 개수
+        budget_tokens: 토큰 예산 (기본 Config.CONTEXT_TOKEN_BUDGET)
+
+    Returns:
+        Dict with:
+        - text: 프롬프트에 넣을 맥락 문자열 (히스토리 없으면 "새로운 대화")
+        - tokens: 추정 토큰 수
+        - summary_used: 롤링 요약 포함 여부
+        - message_count: 포함된 원문 메시지 수
+    """
+    budget = budget_tokens or Config.CONTEXT_TOKEN_BUDGET
+    if not history:
+        return {"text": EMPTY_CONTEXT, "tokens": 0, "summary_used": False, "message_count": 0}
+
+    if isinstance(history, ConversationHistory):
+        return history.cached(("history_context", max_messages, budget),
+                              lambda: _build_history_context(history, max_messages, budget))
+    return _build_history_context(history, max_messages, budget)
+
+
+def _build_history_context(history: List[Dict[str, Any]], max_messages: int, budget: int) -> Dict[str, Any]:
+    summary = getattr(history, "summary", "") or ""
+    summary_upto = getattr(history, "summary_upto_seq", 0)
+    first_seq = getattr(history, "first_seq", 0)
+
+    summary_line = f"[이전 대화 요약] {summary}" if summary else ""
+    remaining = budget - estimate_tokens(summary_line)
+
+    lines: List[str] = []
+    start = max(0, len(history) - max_messages)
+    for index in range(len(history) - 1, start - 1, -1):
+        if first_seq + index < summary_upto:
+            break
+        line = _format_message(history[index])
+        cost = estimate_tokens(line)
+        if cost > remaining and lines:
+            break
+        lines.append(line)
+        remaining -= cost
+
+    lines.reverse()
+    parts = ([summary_line] if summary_line else []) + lines
+    text = "\n".join(parts) if parts else EMPTY_CONTEXT
+    return {
+        "text": text,
+        "tokens": estimate_tokens(text),
+        "summary_used": bool(summary_line),
+        "message_count": len(lines)
+    }
+
+
+def compact_context_snapshot(snapshot: Dict[str, Any], max_items: int = 5) -> Dict[str, Any]:
+    """build_global_context_snapshot 결과에서 후보/장바구니 원본 dict를 이름 목록으로 축약"""
+
+    def _names(items: Any) -> List[str]:
+        names = []
+        for item in (items or [])[:max_items]:
+            if isinstance(item, dict):
+                name = item.get("name") or item.get("product") or item.get("title")
+                if name:
+                    names.append(str(name))
+            elif item:
+                names.append(str(item))
+        return names
+
+    def _scalar_slots(slots: Dict[str, Any]) -> Dict[str, Any]:
+        compact = {}
+        for key, value in (slots or {}).items():
+            if isinstance(value, (str, int, float, bool)):
+                compact[key] = value
+            elif isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+                compact[key] = value[:max_items]
+        return compact
+
+    product = snapshot.get("product") or {}
+    cart = snapshot.get("cart") or {}
+    cs = snapshot.get("cs") or {}
+
+    return {
+        "product": {
+            "has_previous_search": product.get("has_previous_search", False),
+            "recent_queries": [str(q)[:80] for q in (product.get("recent_queries") or [])[-3:]],
+            "last_slots": _scalar_slots(product.get("last_slots")),
+            "recent_candidates": _names(product.get("recent_candidates"))
+        },
+        "cart": {
+            "has_cart_activity": cart.get("has_cart_activity", False),
+            "recent_actions": [
+                {"intent": action.get("intent"), "content": str(action.get("content") or "")[:80]}
+                for action in (cart.get("recent_actions") or [])[-3:]
+            ],
+            "selected_products": _names(cart.get("selected_products")),
+            "last_added_items": _names((cart.get("last_cart_snapshot") or {}).get("last_added_items"))
+        },
+        "cs": {
+            "has_cs_history": cs.get("has_cs_history", False),
+            "recent_topics": (cs.get("recent_topics") or [])[-3:]
+        }
+    }
+
+
+def record_context_tokens(history: List[Dict[str, Any]], node: str, tokens: int) -> None:
+    """노드별 이번 턴 맥락 토큰 사용량 기록"""
+    if isinstance(history, ConversationHistory):
+        history.context_usage[node] = history.context_usage.get(node, 0) + int(tokens)
+
+
+def reset_turn_usage(history: List[Dict[str, Any]]) -> None:
+    if isinstance(history, ConversationHistory):
+        history.context_usage = {}
+
+
+def get_turn_usage(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """이번 턴 노드별/전체 맥락 토큰 사용량"""
+    usage = dict(getattr(history, "context_usage", {}) or {})
+    return {"by_node": usage, "total": sum(usage.values())}
+
+
+def schedule_summary_update(history: List[Dict[str, Any]], keep_recent: Optional[int] = None) -> bool:
+    """
+    최근 keep_recent개를 제외한 미요약 메시지를 백그라운드에서 롤링 요약에 반영
+
+    trim 전에 호출해야 잘려나갈 메시지도 요약에 포함됩니다.
+    단일 워커에서 순차 처리하므로 이전 요약 위에 안전하게 누적됩니다.
+    """
+    if not isinstance(history, ConversationHistory):
+        return False
+
+    keep = Config.SUMMARY_KEEP_RECENT if keep_recent is None else keep_recent
+    cut_seq = history.first_seq + max(0, len(history) - keep)
+    start_seq = max(history.summary_pending_seq, history.first_seq)
+    if cut_seq <= start_seq:
+        return False
+
+    pending = [dict(role=m.get("role"), content=m.get("content"))
+               for m in history[start_seq - history.first_seq:cut_seq - history.first_seq]]
+    history.summary_pending_seq = cut_seq
+
+    _summary_executor.submit(_apply_summary_update, history, pending, cut_seq)
+    return True
+
+
+def _apply_summary_update(history: ConversationHistory, messages: List[Dict[str, Any]], cut_seq: int) -> None:
+    try:
+        updated = summarize_incremental(history.summary, messages)
+        history.update_summary(updated, cut_seq)
+        logger.info(f"롤링 요약 갱신: {len(messages)}개 메시지 반영, 요약 {len(updated)}자")
+    except Exception as e:
+        logger.error(f"롤링 요약 갱신 실패: {e}")
+
+
+def summarize_incremental(previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+    """이전 요약 + 새 메시지 → 갱신된 요약"""
+    if not messages:
+        return previous_summary
+    if openai_client:
+        try:
+            return _summarize_incremental_llm(previous_summary, messages)
+        except Exception as e:
+            logger.warning(f"LLM 롤링 요약 실패, 폴백 사용: {e}")
+    return _summarize_incremental_fallback(previous_summary, messages)
+
+
+def _summarize_incremental_llm(previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+    system_prompt = f"""
+당신은 신선식품 쇼핑몰 챗봇의 대화 요약기입니다.
+기존 요약과 새 대화를 합쳐 {SUMMARY_MAX_CHARS}자 이내의 한국어 요약 하나로 갱신하세요.
+- 사용자가 찾은 상품/레시피, 장바구니 변경, 고객센터 문의 주제, 알러지/선호 같은 사실 위주로 남기세요.
+- 인사말이나 감탄사는 생략하세요.
+- 요약 문장만 출력하세요.
+"""
+    new_lines = "\n".join(_format_message(m) for m in messages)
+    user_prompt = f"""
+기존 요약:
+{previous_summary or "없음"}
+
+새 대화:
+{new_lines}
+"""
+    response = openai_client.chat.completions.create(
+        model=Config.OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        max_tokens=300,
+        temperature=0.2
+    )
+    result = (response.choices[0].message.content or "").strip()
+    if not result:
+        raise ValueError("empty summary response")
+    return result[:SUMMARY_MAX_CHARS]
+
+
+def _summarize_incremental_fallback(previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+    """LLM 없이 사용자 발화 위주로 잘라 붙이고 최근 SUMMARY_MAX_CHARS자만 유지"""
+    snippets = [str(m.get("content") or "")[:60] for m in messages if m.get("role") == "user" and m.get("content")]
+    combined = " / ".join([s for s in [previous_summary] + snippets if s])
+    return combined[-SUMMARY_MAX_CHARS:]
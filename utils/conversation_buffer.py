@@ -0,0 +1,172 @@
+import copy
+from collections import deque
+from typing import Dict, Any, List, Iterable, Callable, Deque, Tuple, Hashable
+import logging
+
+logger = logging.getLogger(__name__)
+
+INTENT_BUFFER_SIZE = 10
+
+
+class ConversationHistory(list):
+    """
+    intent별 링버퍼와 스냅샷 캐시를 함께 유지하는 대화 히스토리 컨테이너
+
+    - list를 상속하므로 기존 코드의 슬라이싱/len/reversed 사용은 그대로 동작합니다.
+    - append 시 intent별 deque(maxlen)에 (seq, message)를 넣어 최근 N개 조회를 O(1)로 처리합니다.
+    - 내용이 바뀌면 version이 증가하고, cached()로 만든 스냅샷은 다음 조회 시 재계산됩니다.
+    - copy/deepcopy/pickle은 __reduce__로 __init__을 거쳐 재구성 (링버퍼 중복/누락 방지)
+    """
+
+    def __init__(self, iterable: Iterable[Dict[str, Any]] = (), per_intent_limit: int = INTENT_BUFFER_SIZE):
+        super().__init__()
+        self._per_intent_limit = per_intent_limit
+        self._intent_buffers: Dict[str, Deque[Tuple[int, Dict[str, Any]]]] = {}
+        self._first_seq = 0
+        self._version = 0
+        self._cache: Dict[Hashable, Any] = {}
+        self._cache_version = -1
+        self.summary = ""
+        self.summary_upto_seq = 0
+        self.summary_pending_seq = 0
+        self.context_usage: Dict[str, int] = {}
+        self.extend(iterable)
+
+    def __reduce__(self):
+        state = {
+            "first_seq": self._first_seq,
+            "summary": self.summary,
+            "summary_upto_seq": self.summary_upto_seq,
+            "summary_pending_seq": self.summary_pending_seq,
+            "context_usage": dict(self.context_usage),
+        }
+        return self.__class__, (list(self), self._per_intent_limit), state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._first_seq = state.get("first_seq", 0)
+        self.summary = state.get("summary", "")
+        self.summary_upto_seq = state.get("summary_upto_seq", 0)
+        self.summary_pending_seq = state.get("summary_pending_seq", 0)
+        self.context_usage = dict(state.get("context_usage") or {})
+        self._intent_buffers = {}
+        for offset, message in enumerate(self):
+            self._index_message(self._first_seq + offset, message)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def first_seq(self) -> int:
+        """현재 0번 인덱스 메시지의 누적 순번 (trim 이후에도 단조 증가)"""
+        return self._first_seq
+
+    def _index_message(self, seq: int, message: Dict[str, Any]) -> None:
+        intent = message.get("intent") if isinstance(message, dict) else None
+        if not intent:
+            return
+        buffer = self._intent_buffers.get(intent)
+        if buffer is None:
+            buffer = deque(maxlen=self._per_intent_limit)
+            self._intent_buffers[intent] = buffer
+        buffer.append((seq, message))
+
+    def _rebuild(self) -> None:
+        """임의 위치 변경 시 링버퍼를 다시 구성 (순번이 초기화되므로 요약 커서도 리셋)"""
+        self._intent_buffers = {}
+        self._first_seq = 0
+        self.summary_upto_seq = 0
+        self.summary_pending_seq = 0
+        for seq, message in enumerate(self):
+            self._index_message(seq, message)
+        self._version += 1
+
+    def append(self, message: Dict[str, Any]) -> None:
+        seq = self._first_seq + len(self)
+        super().append(message)
+        self._index_message(seq, message)
+        self._version += 1
+
+    def extend(self, messages: Iterable[Dict[str, Any]]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def __iadd__(self, messages: Iterable[Dict[str, Any]]):
+        self.extend(messages)
+        return self
+
+    def trim_front(self, count: int) -> None:
+        """앞쪽(오래된) 메시지 제거 - 링버퍼는 seq 기준으로 자연스럽게 만료"""
+        count = max(0, min(count, len(self)))
+        if not count:
+            return
+        super().__delitem__(slice(0, count))
+        self._first_seq += count
+        self._version += 1
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice) and index.start in (None, 0) and index.step in (None, 1) and index.stop is not None:
+            stop = index.stop if index.stop >= 0 else len(self) + index.stop
+            self.trim_front(stop)
+            return
+        super().__delitem__(index)
+        self._rebuild()
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._rebuild()
+
+    def insert(self, index, message) -> None:
+        super().insert(index, message)
+        self._rebuild()
+
+    def pop(self, index=-1):
+        message = super().pop(index)
+        self._rebuild()
+        return message
+
+    def remove(self, message) -> None:
+        super().remove(message)
+        self._rebuild()
+
+    def clear(self) -> None:
+        super().clear()
+        self._rebuild()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._rebuild()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._rebuild()
+
+    def update_summary(self, summary: str, upto_seq: int) -> None:
+        """롤링 요약 갱신 - 요약을 포함한 캐시도 함께 무효화"""
+        self.summary = summary
+        self.summary_upto_seq = upto_seq
+        self._version += 1
+
+    def recent_by_intents(self, intents: Iterable[str], limit: int = 5) -> List[Dict[str, Any]]:
+        """지정된 intent들의 최근 메시지를 시간순으로 반환 (링버퍼 병합)"""
+        merged: List[Tuple[int, Dict[str, Any]]] = []
+        for intent in set(intents):
+            buffer = self._intent_buffers.get(intent)
+            if not buffer:
+                continue
+            merged.extend(entry for entry in buffer if entry[0] >= self._first_seq)
+
+        if not merged:
+            return []
+
+        merged.sort(key=lambda entry: entry[0])
+        return [message for _, message in merged[-limit:]] if limit > 0 else []
+
+    def cached(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """현재 version 기준 스냅샷 캐시 - append 등 변경 시 자동 무효화 (호출자에게는 사본 반환)"""
+        if self._cache_version != self._version:
+            self._cache = {}
+            self._cache_version = self._version
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return copy.deepcopy(self._cache[key])
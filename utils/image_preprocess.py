@@ -0,0 +1,214 @@
+import io
+import os
+import time
+import base64
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+    logger.warning("Pillow not available. Vision images will be sent without preprocessing.")
+
+VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1024"))
+VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "JPEG").upper()
+VISION_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "85"))
+# 이미 전처리된(작은 + 목표 포맷) data URL은 다시 인코딩하지 않음
+VISION_SKIP_BYTES = int(os.getenv("VISION_SKIP_BYTES", str(256 * 1024)))
+
+_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime: str
+    original_bytes: int
+    width: int = 0
+    height: int = 0
+    elapsed_ms: float = 0.0
+    processed: bool = False
+
+    @property
+    def output_bytes(self) -> int:
+        return len(self.data)
+
+    @property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{self.base64}"
+
+
+class _PreprocessStats:
+    """프로세스 누적 전처리 지표 (절감 바이트, 평균 처리 시간)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total_ms = 0.0
+
+    def record(self, prepared: PreparedImage) -> None:
+        with self._lock:
+            if not prepared.processed:
+                self.failed += 1
+                return
+            self.images += 1
+            self.bytes_in += prepared.original_bytes
+            self.bytes_out += prepared.output_bytes
+            self.total_ms += prepared.elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "images": self.images,
+                "failed": self.failed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "avg_ms": round(self.total_ms / self.images, 2) if self.images else 0.0,
+            }
+
+
+preprocess_stats = _PreprocessStats()
+
+
+def _read_source(source: Union[bytes, str, Path]) -> bytes:
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            return f.read()
+    return bytes(source)
+
+
+def preprocess_image(source: Union[bytes, str, Path], fallback_mime: str = "image/jpeg",
+                     max_edge: int = VISION_MAX_EDGE, fmt: str = VISION_IMAGE_FORMAT,
+                     quality: int = VISION_IMAGE_QUALITY) -> PreparedImage:
+    """
+    Vision API 전송 전 이미지 정규화 (source는 bytes 또는 파일 경로 - 경로면 원본을 메모리에 올리지 않음)
+    - EXIF Orientation 반영 후 메타데이터(EXIF/GPS/ICC) 제거
+    - 긴 변을 max_edge 이하로 축소
+    - JPEG/WebP로 재압축 (실패하거나 Pillow가 없으면 원본 그대로 반환)
+    """
+    started = time.perf_counter()
+    is_path = isinstance(source, (str, Path))
+    original_bytes = os.path.getsize(source) if is_path else len(source)
+    if Image is None:
+        return PreparedImage(data=_read_source(source), mime=fallback_mime, original_bytes=original_bytes)
+
+    fmt = fmt if fmt in ("JPEG", "WEBP") else "JPEG"
+    try:
+        with Image.open(source if is_path else io.BytesIO(source)) as img:
+            img.seek(0)
+            source_format = img.format
+            has_exif = bool(img.info.get("exif"))
+            original_size = img.size
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA", "L"):
+                img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+            if fmt == "JPEG" and img.mode == "RGBA":
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[3])
+                img = background
+
+            if max(img.size) > max_edge:
+                img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            out = io.BytesIO()
+            if fmt == "JPEG":
+                img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                img.save(out, format="WEBP", quality=quality, method=4)
+
+            encoded = out.getvalue()
+            # 이미 작은 목표 포맷 이미지는 재압축이 오히려 커질 수 있음 → 메타데이터가 없으면 원본 유지
+            if (len(encoded) >= original_bytes and source_format == fmt and not has_exif
+                    and img.size == original_size):
+                encoded = _read_source(source)
+
+            prepared = PreparedImage(
+                data=encoded, mime=_MIME[fmt], original_bytes=original_bytes,
+                width=img.size[0], height=img.size[1],
+                elapsed_ms=round((time.perf_counter() - started) * 1000, 2), processed=True,
+            )
+    except Exception as e:
+        logger.warning(f"이미지 전처리 실패, 원본 사용: {e}")
+        prepared = PreparedImage(data=_read_source(source), mime=fallback_mime, original_bytes=original_bytes)
+
+    preprocess_stats.record(prepared)
+    return prepared
+
+
+def preprocess_file(path: Union[str, Path], fallback_mime: str = "image/jpeg") -> PreparedImage:
+    return preprocess_image(Path(path), fallback_mime=fallback_mime)
+
+
+def decode_data_url(data_url: str) -> Optional[bytes]:
+    if not data_url or "base64," not in data_url:
+        return None
+    try:
+        return base64.b64decode(data_url.split(",", 1)[1])
+    except Exception:
+        return None
+
+
+def _already_prepared(raw: bytes) -> bool:
+    """헤더만 읽어 목표 포맷 + max_edge 이하 + EXIF 없음이면 True (preprocess_image 결과가 이 조건을 만족)"""
+    if Image is None:
+        return False
+    try:
+        with Image.open(io.BytesIO(raw)) as img:
+            return (img.format == VISION_IMAGE_FORMAT and max(img.size) <= VISION_MAX_EDGE
+                    and not img.info.get("exif"))
+    except Exception:
+        return False
+
+
+def ensure_vision_data_url(data_url: str) -> str:
+    """
+    base64 data URL을 전처리된 data URL로
+    (이미 작은 목표 포맷이거나, 목표 크기 이하로 전처리된 이미지면 다시 인코딩하지 않고 그대로)
+    """
+    if not data_url or "base64," not in data_url:
+        return data_url
+    header, encoded = data_url.split(",", 1)
+    mime = header[5:].split(";", 1)[0] if header.startswith("data:") else "image/jpeg"
+    if mime == _MIME.get(VISION_IMAGE_FORMAT) and len(encoded) * 3 // 4 <= VISION_SKIP_BYTES:
+        return data_url
+    try:
+        raw = base64.b64decode(encoded)
+    except Exception:
+        return data_url
+    if mime == _MIME.get(VISION_IMAGE_FORMAT) and _already_prepared(raw):
+        return data_url
+    return preprocess_image(raw, fallback_mime=mime).data_url
+
+
+if __name__ == "__main__":
+    import sys
+    import glob
+
+    logging.basicConfig(level=logging.INFO)
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_images")
+    paths = sorted(p for p in glob.glob(os.path.join(target, "*")) if os.path.isfile(p))
+
+    print(f"max_edge={VISION_MAX_EDGE} format={VISION_IMAGE_FORMAT} quality={VISION_IMAGE_QUALITY}")
+    print(f"{'file':<24}{'orig':>10}{'out':>10}{'b64 out':>10}{'saved':>8}{'ms':>8}  size")
+    for path in paths:
+        prepared = preprocess_file(path)
+        saved = 1 - prepared.output_bytes / prepared.original_bytes if prepared.original_bytes else 0.0
+        print(f"{os.path.basename(path):<24}{prepared.original_bytes:>10}{prepared.output_bytes:>10}"
+              f"{len(prepared.base64):>10}{saved:>8.1%}{prepared.elapsed_ms:>8}  {prepared.width}x{prepared.height}")
+    print(preprocess_stats.snapshot())
@@ -0,0 +1,146 @@
+import os
+import re
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+ITEM_VOCAB_REFRESH_SEC = int(os.getenv("ITEM_VOCAB_REFRESH_SEC", "600"))
+LOAD_RETRY_SEC = 30
+
+# 같은 재료의 다른 표기 (대상 품목이 DB에 있을 때만 적용, 상위/유사 품목으로 바꾸는 매핑은 두지 않음)
+ITEM_ALIASES = {
+    "계란": "달걀",
+    "쇠고기": "소고기",
+    "닭": "닭고기",
+}
+
+# 재료명 앞에 붙는 조리 상태/형태 수식어
+_MODIFIER_PREFIXES = ("다진", "신", "썬", "데친", "볶은", "으깬", "깐", "생", "마른", "말린", "냉동",
+                      "익은", "삶은", "구운", "큰", "작은", "얇은", "두꺼운", "신선한", "국산")
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+_TOKEN_SPLIT = re.compile(r"[^0-9a-zA-Z가-힣]+")
+
+
+def _normalize(name: str) -> str:
+    return _NON_WORD.sub("", (name or "").lower())
+
+
+class ItemVocabulary:
+    """
+    product_tbl 품목(item) 어휘 캐시 + 로컬 재료→품목 매처
+
+    - refresh_sec가 지나거나 invalidate()가 호출되면 다시 조회
+    - match(): 완전 일치 → 별칭 → 수식어 제거 → 어절 단위 일치('돼지고기 목살' → 돼지고기) 순으로 매핑,
+      매핑되지 않으면 None (호출 측에서 원래 재료명 유지)
+    - 부분 문자열 일치는 하지 않음 (고추장→고추, 파프리카→파 같은 오매핑 방지)
+    """
+
+    def __init__(self, connection_factory, refresh_sec: int = ITEM_VOCAB_REFRESH_SEC):
+        self._connection_factory = connection_factory
+        self.refresh_sec = refresh_sec
+        self._items: List[str] = []
+        self._by_key: Dict[str, str] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"loads": 0, "exact": 0, "alias": 0, "stripped": 0, "token": 0, "unmatched": 0}
+
+    def _stale(self) -> bool:
+        return not self._loaded_at or time.time() - self._loaded_at > self.refresh_sec
+
+    def _load(self) -> None:
+        # 실패 시 기존 어휘를 유지하고 잠시 후 재시도 (매 호출마다 DB 연결 시도 방지)
+        retry_at = time.time() - self.refresh_sec + LOAD_RETRY_SEC
+        conn = self._connection_factory()
+        if not conn:
+            logger.warning("DB 연결 실패로 품목명을 가져올 수 없습니다.")
+            self._loaded_at = retry_at
+            return
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT DISTINCT item FROM product_tbl WHERE item IS NOT NULL ORDER BY item")
+                items = [row[0] for row in cursor.fetchall() if row[0]]
+        except Error as e:
+            logger.error(f"품목명 조회 실패: {e}")
+            self._loaded_at = retry_at
+            return
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+        self._items = items
+        self._by_key = {_normalize(item): item for item in items}
+        self._loaded_at = time.time()
+        self._stats["loads"] += 1
+        logger.info(f"품목 어휘 캐시 갱신: {len(items)}개")
+
+    def items(self) -> List[str]:
+        with self._lock:
+            if self._stale():
+                self._load()
+            return list(self._items)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _lookup_word(self, key: str) -> Optional[str]:
+        """정규화된 한 단어: 품목명 또는 같은 재료의 다른 표기"""
+        return self._by_key.get(key) or self._by_key.get(_normalize(ITEM_ALIASES.get(key, "")))
+
+    def _match_locked(self, ingredient: str) -> Optional[str]:
+        key = _normalize(ingredient)
+        if not key:
+            return None
+        if key in self._by_key:
+            self._stats["exact"] += 1
+            return self._by_key[key]
+
+        target = self._lookup_word(key)
+        if target:
+            self._stats["alias"] += 1
+            return target
+
+        for prefix in _MODIFIER_PREFIXES:
+            if key.startswith(prefix) and len(key) > len(prefix):
+                target = self._lookup_word(key[len(prefix):])
+                if target:
+                    self._stats["stripped"] += 1
+                    return target
+
+        words = [_normalize(w) for w in _TOKEN_SPLIT.split(ingredient or "")]
+        if len(words) > 1:
+            for word in sorted(filter(None, words), key=len, reverse=True):
+                target = self._lookup_word(word)
+                if target:
+                    self._stats["token"] += 1
+                    return target
+
+        self._stats["unmatched"] += 1
+        return None
+
+    def match(self, ingredient: str) -> Optional[str]:
+        with self._lock:
+            if self._stale():
+                self._load()
+            return self._match_locked(ingredient)
+
+    def map_ingredients(self, ingredients: List[str]) -> List[str]:
+        """재료명 목록을 품목명으로 매핑 (매핑 안 되면 원래 이름 유지, 순서 유지 + 중복 제거)"""
+        with self._lock:
+            if self._stale():
+                self._load()
+            mapped = [self._match_locked(name) or (name or "").strip() for name in ingredients]
+        return list(dict.fromkeys(name for name in mapped if name))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "items": len(self._items),
+                "age_sec": round(time.time() - self._loaded_at, 1) if self._loaded_at else None,
+            }
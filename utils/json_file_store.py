@@ -0,0 +1,65 @@
+import os
+import json
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 병합/교체만 수행
+    fcntl = None
+
+
+@contextmanager
+def _file_lock(path: str):
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path: Optional[str]) -> Any:
+    """JSON 파일 내용 (파일이 없으면 None, 읽기 실패는 예외)"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_and_write_json(path: str, merge: Callable[[Any], Any]) -> Any:
+    """
+    여러 워커가 같은 JSON 파일에 기록하는 경우용
+    파일 잠금 아래 현재 디스크 내용을 읽어 merge(디스크 내용 또는 None)로 합친 결과를 임시 파일에 쓰고 교체
+    반환: 기록한 데이터 (다른 워커가 쓴 항목을 메모리에 반영할 때 사용)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _file_lock(path):
+        try:
+            disk = read_json(path)
+        except Exception as e:
+            logger.warning(f"기존 JSON 파일 읽기 실패, 현재 내용으로 덮어씀 ({path}): {e}")
+            disk = None
+        data = merge(disk)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    return data
+
+
+def merge_newer(local: Dict[str, Any], disk: Optional[Dict[str, Any]],
+                stamp: Callable[[Any], float]) -> Dict[str, Any]:
+    """키별로 stamp(항목)이 더 큰 쪽을 채택해 합친 dict (같으면 local 우선)"""
+    merged = dict(disk or {})
+    for key, entry in local.items():
+        current = merged.get(key)
+        if current is None or stamp(entry) >= stamp(current):
+            merged[key] = entry
+    return merged
@@ -0,0 +1,195 @@
+import re
+import json
+import logging
+import threading
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _SchemaStats:
+    """레시피 페이지 처리 경로 누적 지표 (구조화 데이터로 처리한 비율)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.json_ld = 0
+        self.microdata = 0
+        self.llm_extractions = 0
+        self.llm_normalizations = 0
+
+    def record(self, source: Optional[str], llm_normalized: bool = False) -> None:
+        with self._lock:
+            self.pages += 1
+            if source == "json-ld":
+                self.json_ld += 1
+            elif source == "microdata":
+                self.microdata += 1
+            else:
+                self.llm_extractions += 1
+            if llm_normalized:
+                self.llm_normalizations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            structured = self.json_ld + self.microdata
+            return {
+                "pages": self.pages,
+                "json_ld": self.json_ld,
+                "microdata": self.microdata,
+                "llm_extractions": self.llm_extractions,
+                "llm_normalizations": self.llm_normalizations,
+                # 전체 본문 LLM 추출 없이 처리한 비율
+                "structured_rate": round(structured / self.pages, 4) if self.pages else 0.0,
+                # LLM을 한 번도 호출하지 않은 비율
+                "llm_free_rate": round((structured - self.llm_normalizations) / self.pages, 4) if self.pages else 0.0,
+            }
+
+
+schema_stats = _SchemaStats()
+
+
+def _clean(text: Any) -> str:
+    if not isinstance(text, str):
+        return ""
+    text = re.sub(r"<[^>]+>", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _is_recipe_type(value: Any) -> bool:
+    types = value if isinstance(value, list) else [value]
+    return any(isinstance(t, str) and t.rsplit("/", 1)[-1].lower() == "recipe" for t in types)
+
+
+def _find_recipe_node(data: Any) -> Optional[Dict[str, Any]]:
+    """JSON-LD 트리(@graph, 배열, mainEntity 포함)에서 @type Recipe 노드를 찾음"""
+    if isinstance(data, list):
+        for item in data:
+            found = _find_recipe_node(item)
+            if found:
+                return found
+        return None
+    if not isinstance(data, dict):
+        return None
+    if _is_recipe_type(data.get("@type")):
+        return data
+    for key in ("@graph", "mainEntity", "mainEntityOfPage"):
+        found = _find_recipe_node(data.get(key))
+        if found:
+            return found
+    return None
+
+
+def _flatten_instructions(value: Any) -> List[str]:
+    """recipeInstructions: 문자열 / 문자열 배열 / HowToStep / HowToSection(itemListElement) 모두 처리"""
+    if isinstance(value, str):
+        return [line for line in (_clean(part) for part in re.split(r"\n+|(?<=[.!?])\s+(?=\d+\.)", value)) if line]
+    if isinstance(value, list):
+        steps = []
+        for item in value:
+            steps.extend(_flatten_instructions(item))
+        return steps
+    if isinstance(value, dict):
+        if value.get("itemListElement"):
+            return _flatten_instructions(value["itemListElement"])
+        text = _clean(value.get("text") or value.get("name") or "")
+        return [text] if text else []
+    return []
+
+
+def _format_steps(steps: List[str]) -> str:
+    steps = [re.sub(r"^\d+[.)]\s*", "", step) for step in steps if step]
+    return "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+
+
+def _from_json_ld(soup) -> Optional[Dict[str, Any]]:
+    return _from_json_ld_blocks(
+        script.string or script.get_text() or ""
+        for script in soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
+    )
+
+
+def _from_json_ld_blocks(blocks: Iterable[str]) -> Optional[Dict[str, Any]]:
+    for raw in blocks:
+        if not raw or not raw.strip():
+            continue
+        try:
+            data = json.loads(raw, strict=False)
+        except ValueError:
+            continue
+        node = _find_recipe_node(data)
+        if not node:
+            continue
+        ingredients = node.get("recipeIngredient") or node.get("ingredients") or []
+        if isinstance(ingredients, str):
+            ingredients = [ingredients]
+        ingredients = [line for line in (_clean(i) for i in ingredients) if line]
+        if not ingredients:
+            continue
+        name = node.get("name")
+        return {
+            "title": _clean(name if isinstance(name, str) else ""),
+            "ingredient_lines": ingredients,
+            "instructions": _format_steps(_flatten_instructions(node.get("recipeInstructions"))),
+            "source": "json-ld",
+        }
+    return None
+
+
+def _from_microdata(soup) -> Optional[Dict[str, Any]]:
+    scope = soup.find(attrs={"itemtype": re.compile(r"schema\.org/Recipe", re.I)})
+    if not scope:
+        return None
+    ingredients = [
+        _clean(el.get("content") or el.get_text(" "))
+        for el in scope.find_all(attrs={"itemprop": re.compile(r"^(recipeIngredient|ingredients)$")})
+    ]
+    ingredients = [line for line in ingredients if line]
+    if not ingredients:
+        return None
+    name_el = scope.find(attrs={"itemprop": "name"})
+    steps = []
+    for el in scope.find_all(attrs={"itemprop": "recipeInstructions"}):
+        text_el = el.find(attrs={"itemprop": "text"})
+        steps.extend(_flatten_instructions((text_el or el).get_text("\n")))
+    return {
+        "title": _clean(name_el.get("content") or name_el.get_text(" ")) if name_el else "",
+        "ingredient_lines": ingredients,
+        "instructions": _format_steps(steps),
+        "source": "microdata",
+    }
+
+
+def extract_schema_recipe(soup) -> Optional[Dict[str, Any]]:
+    """
+    HTML(BeautifulSoup)에서 schema.org Recipe 구조화 데이터를 추출
+    반환: {"title", "ingredient_lines"(원문 재료 줄), "instructions"("1. ...\\n2. ..."), "source"} 또는 None
+    script 태그를 지우기 전에 호출해야 함
+    """
+    try:
+        return _from_json_ld(soup) or _from_microdata(soup)
+    except Exception as e:
+        logger.warning(f"구조화 레시피 데이터 파싱 실패: {e}")
+        return None
+
+
+def extract_schema_recipe_from_json_ld(blocks: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """이미 모아 둔 <script type="application/ld+json"> 본문들에서 Recipe 추출 (HTML 트리 불필요)"""
+    try:
+        return _from_json_ld_blocks(blocks)
+    except Exception as e:
+        logger.warning(f"구조화 레시피 데이터 파싱 실패: {e}")
+        return None
+
+
+_QUANTITY_RE = re.compile(
+    r"(\([^)]*\)|\[[^\]]*\]|[\d½⅓⅔¼¾/.,~\-]+\s*(g|kg|ml|l|cc|개|컵|큰술|작은술|스푼|숟가락|T|t|쪽|대|장|모|줌|꼬집|cups?|tbsp|tsp|oz|lbs?|cloves?)?\b)",
+    re.I,
+)
+
+
+def strip_quantity(line: str) -> str:
+    """'다진마늘 2쪽', '2 cups flour' 같은 재료 줄에서 수량/단위/괄호를 제거 (LLM 없이 쓰는 최소 정리)"""
+    text = re.split(r"[;:]|,\s", line or "")[0]
+    text = _QUANTITY_RE.sub(" ", text)
+    return re.sub(r"\s+", " ", text).strip()
@@ -0,0 +1,207 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from utils.json_file_store import read_json, merge_and_write_json, merge_newer
+
+logger = logging.getLogger(__name__)
+
+RECIPE_STORE_PATH = os.getenv(
+    "RECIPE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "recipe_store.json"))
+# 이 시간 안에 검증된 문서는 네트워크 없이 바로 사용, 지나면 조건부 GET으로 재검증
+RECIPE_STORE_FRESH_SEC = int(os.getenv("RECIPE_STORE_FRESH_SEC", "3600"))
+RECIPE_STORE_MAX_ENTRIES = int(os.getenv("RECIPE_STORE_MAX_ENTRIES", "3000"))
+# 변경분을 모아 파일에 기록하는 간격 (재검증 touch마다 전체 파일을 다시 쓰지 않음)
+RECIPE_STORE_PERSIST_INTERVAL = int(os.getenv("RECIPE_STORE_PERSIST_INTERVAL", "30"))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class RecipeDocumentStore:
+    """
+    크롤링한 레시피 문서 저장소 (URL 키)
+
+    - 구조화된 레시피(title/ingredients/instructions ...)와 함께
+      본문 텍스트 해시, ETag/Last-Modified, 추출에 쓴 모델 버전을 보관
+    - conditional_headers()로 If-None-Match/If-Modified-Since를 만들어 재검증
+      · 304 또는 본문 해시 동일 → touch()로 검증 시각만 갱신 (LLM 재호출 없음)
+      · 내용이 바뀐 경우에만 put()으로 새 구조화 결과 저장
+    - 변경분은 persist_interval마다 JSON 파일로 기록, 종료 시 flush()
+      · 기록 시 파일 잠금 아래 디스크 내용과 URL별로 병합 (검증 시각이 최신인 쪽 채택)해
+        다른 워커의 추출 결과를 덮어쓰지 않고 메모리에도 받아옴
+      · 파일 I/O는 저장소 잠금 밖에서 수행
+    """
+
+    def __init__(self, path: Optional[str] = RECIPE_STORE_PATH, fresh_sec: int = RECIPE_STORE_FRESH_SEC,
+                 max_entries: int = RECIPE_STORE_MAX_ENTRIES, persist_interval: int = RECIPE_STORE_PERSIST_INTERVAL):
+        self.path = path
+        self.persist_interval = persist_interval
+        self.fresh_sec = fresh_sec
+        self.max_entries = max_entries
+        self._docs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._last_persist = 0.0
+        self._persist_lock = threading.Lock()
+        # put()마다 증가 (로컬 레시피 검색 색인 재구축 기준)
+        self.revision = 0
+        self._lock = threading.Lock()
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0,
+                       "not_modified": 0, "unchanged": 0, "extractions": 0, "persists": 0, "merged_from_disk": 0}
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self._last_persist = time.time()
+        try:
+            docs = read_json(self.path) or {}
+            for url, doc in docs.items():
+                self._docs[url] = doc
+            logger.info(f"레시피 문서 저장소 로드: {len(self._docs)}개")
+        except Exception as e:
+            logger.warning(f"레시피 문서 저장소 로드 실패: {e}")
+
+    @staticmethod
+    def _doc_stamp(doc: Dict[str, Any]) -> float:
+        return doc.get("validated_at", 0)
+
+    def _persist(self, force: bool = False) -> None:
+        """
+        변경분이 있고 persist_interval이 지났으면(force면 즉시) 디스크와 병합해 기록
+        문서 dict는 교체만 하고 제자리 수정하지 않으므로 얕은 복사본을 잠금 밖에서 직렬화
+        """
+        if not self.path or not self._dirty:
+            return
+        if not force and time.time() - self._last_persist < self.persist_interval:
+            return
+        if not self._persist_lock.acquire(blocking=force):
+            return
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return
+                local = dict(self._docs)
+                self._dirty = False
+                self._last_persist = time.time()
+
+            def _merge(disk):
+                merged = merge_newer(local, disk if isinstance(disk, dict) else None, self._doc_stamp)
+                newest = sorted(merged.items(), key=lambda item: self._doc_stamp(item[1]))[-self.max_entries:]
+                return dict(newest)
+
+            try:
+                merged = merge_and_write_json(self.path, _merge)
+            except Exception as e:
+                logger.warning(f"레시피 문서 저장소 저장 실패: {e}")
+                with self._lock:
+                    self._dirty = True
+                return
+
+            with self._lock:
+                self._stats["persists"] += 1
+                for url, doc in merged.items():
+                    current = self._docs.get(url)
+                    if current is None or self._doc_stamp(doc) > self._doc_stamp(current):
+                        self._docs[url] = doc
+                        self._stats["merged_from_disk"] += 1
+                        if current is None or current.get("text_hash") != doc.get("text_hash"):
+                            self.revision += 1
+                while len(self._docs) > self.max_entries:
+                    self._docs.popitem(last=False)
+        finally:
+            self._persist_lock.release()
+
+    def flush(self) -> None:
+        self._persist(force=True)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """저장된 문서 (없으면 None). 반환값의 fresh가 False면 재검증 대상"""
+        with self._lock:
+            self._load()
+            doc = self._docs.get(url)
+            if doc is None:
+                self._stats["misses"] += 1
+                return None
+            self._docs.move_to_end(url)
+            fresh = time.time() - doc.get("validated_at", 0) <= self.fresh_sec
+            self._stats["fresh_hits" if fresh else "stale_hits"] += 1
+            return {**doc, "fresh": fresh}
+
+    @staticmethod
+    def conditional_headers(doc: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if doc and doc.get("etag"):
+            headers["If-None-Match"] = doc["etag"]
+        if doc and doc.get("last_modified"):
+            headers["If-Modified-Since"] = doc["last_modified"]
+        return headers
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+              not_modified: bool = True) -> None:
+        """내용이 그대로임을 확인 (304 또는 본문 해시 동일)"""
+        with self._lock:
+            self._load()
+            doc = self._docs.get(url)
+            if doc is None:
+                return
+            self._docs[url] = {
+                **doc,
+                "validated_at": time.time(),
+                "etag": etag or doc.get("etag"),
+                "last_modified": last_modified or doc.get("last_modified"),
+            }
+            self._stats["not_modified" if not_modified else "unchanged"] += 1
+            self._dirty = True
+        self._persist()
+
+    def put(self, url: str, recipe: Dict[str, Any], content_hash: str, version: str,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._load()
+            self._docs[url] = {
+                "recipe": recipe,
+                "text_hash": content_hash,
+                "version": version,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": now,
+                "validated_at": now,
+            }
+            self._docs.move_to_end(url)
+            while len(self._docs) > self.max_entries:
+                self._docs.popitem(last=False)
+            self._stats["extractions"] += 1
+            self.revision += 1
+            self._dirty = True
+        self._persist()
+
+    def documents(self) -> Dict[str, Dict[str, Any]]:
+        """URL → 구조화 레시피 스냅샷"""
+        with self._lock:
+            self._load()
+            return {url: doc["recipe"] for url, doc in self._docs.items() if doc.get("recipe")}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load()
+            lookups = self._stats["fresh_hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            hits = self._stats["fresh_hits"] + self._stats["stale_hits"]
+            return {
+                **self._stats,
+                "size": len(self._docs),
+                "fresh_sec": self.fresh_sec,
+                "dirty": self._dirty,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+
+recipe_store = RecipeDocumentStore()
@@ -0,0 +1,105 @@
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from utils.transcription import TranscriptionService, TranscriptionQueueFull
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+MIN_NEW_AUDIO_SEC = 1.5
+COMMIT_MARGIN_SEC = 1.0
+
+
+class StreamingTranscriber:
+    """
+    녹음 중 들어오는 오디오 청크를 점진적으로 전사하는 세션
+
+    - 청크는 하나의 파일에 이어 쓰고(MediaRecorder webm 스트림), 패스마다 디코딩
+    - 이미 확정된 구간(committed_samples) 이후의 꼬리 오디오만 segment generator로 전사
+    - 꼬리 끝에서 COMMIT_MARGIN_SEC 이상 떨어진 세그먼트는 확정해 다음 패스에서 다시 전사하지 않음
+    - 녹음 종료 시 마지막 꼬리만 전사하므로 전체 파일을 다시 돌리지 않음
+    """
+
+    def __init__(self, path: Path, service: TranscriptionService, language: str = "ko"):
+        self.path = path
+        self.service = service
+        self.language = language
+        self.committed: List[str] = []
+        self.committed_samples = 0
+        self.pending_text = ""
+        self.bytes_received = 0
+        self._last_pass_samples = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("wb")
+
+    @property
+    def text(self) -> str:
+        return ("".join(self.committed) + self.pending_text).strip()
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._file.flush()
+        self.bytes_received += len(chunk)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def _decode(self):
+        from faster_whisper.audio import decode_audio
+        return decode_audio(str(self.path), sampling_rate=SAMPLE_RATE)
+
+    def _pass_sync(self, final: bool) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            audio = self._decode()
+        except Exception as e:
+            if final:
+                raise
+            logger.debug(f"부분 오디오 디코딩 대기: {e}")
+            return None
+
+        total = len(audio)
+        if not final and total - self._last_pass_samples < MIN_NEW_AUDIO_SEC * SAMPLE_RATE:
+            return None
+        self._last_pass_samples = total
+
+        tail = audio[self.committed_samples:]
+        if len(tail) == 0:
+            self.pending_text = ""
+            return {"text": self.text, "final": final}
+
+        model = self.service.get_model()
+        segments, _ = model.transcribe(tail, language=self.language, vad_filter=self.service.vad_filter)
+
+        commit_limit = len(tail) if final else len(tail) - COMMIT_MARGIN_SEC * SAMPLE_RATE
+        advance, pending, committing = 0, [], True
+        for seg in segments:
+            seg_end = int(seg.end * SAMPLE_RATE)
+            if committing and seg_end <= commit_limit:
+                self.committed.append(seg.text)
+                advance = seg_end
+            else:
+                committing = False
+                pending.append(seg.text)
+
+        self.committed_samples += advance
+        self.pending_text = "".join(pending)
+        self.service.record_rtf(time.perf_counter() - started, len(tail) / SAMPLE_RATE)
+        return {"text": self.text, "final": final}
+
+    async def partial(self) -> Optional[Dict[str, Any]]:
+        """새 오디오가 충분히 쌓였으면 부분 전사 (대기열이 차 있으면 건너뜀)"""
+        try:
+            return await self.service.submit(self._pass_sync, False)
+        except TranscriptionQueueFull:
+            return None
+        except Exception as e:
+            logger.warning(f"부분 전사 실패: {e}")
+            return None
+
+    async def finish(self) -> Dict[str, Any]:
+        self.close()
+        return await self.service.submit(self._pass_sync, True)
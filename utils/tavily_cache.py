@@ -0,0 +1,109 @@
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+TAVILY_CACHE_TTL = int(os.getenv("TAVILY_CACHE_TTL", str(6 * 3600)))
+TAVILY_CACHE_MAX_ENTRIES = int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", "500"))
+# 캐시에는 카드 요약에 필요한 만큼만 보관 (raw_content 등은 버림, 선호도 필터는 저장 전에 전체 본문으로 적용)
+TAVILY_CACHE_CONTENT_CHARS = int(os.getenv("TAVILY_CACHE_CONTENT_CHARS", "500"))
+
+_QUERY_SUFFIXES = ("레시피", "만드는 법", "만드는법", "만들기", "recipe")
+
+
+def normalize_dish_query(query: str) -> str:
+    """'김치찌개  레시피' / '김치찌개 만드는 법' / '김치찌개' → '김치찌개'"""
+    text = re.sub(r"\s+", " ", (query or "").strip().lower())
+    changed = True
+    while changed and text:
+        changed = False
+        for suffix in _QUERY_SUFFIXES:
+            if text.endswith(suffix) and len(text) > len(suffix):
+                text = text[: -len(suffix)].rstrip()
+                changed = True
+    return text
+
+
+def search_cache_key(query: str, vegan: bool, allergies: Iterable[str],
+                     include_domains: Iterable[str], exclude_domains: Iterable[str],
+                     unfavorites: Iterable[str] = ()) -> Tuple:
+    domains = "\x1f".join(sorted(set(include_domains))) + "\x1e" + "\x1f".join(sorted(set(exclude_domains)))
+    return (
+        normalize_dish_query(query),
+        bool(vegan),
+        tuple(sorted({a.strip().lower() for a in allergies if a and a.strip()})),
+        tuple(sorted({u.strip().lower() for u in unfavorites if u and u.strip()})),
+        hashlib.sha1(domains.encode("utf-8")).hexdigest()[:12],
+    )
+
+
+class TavilyResultCache:
+    """
+    Tavily 레시피 검색 결과 캐시
+
+    - 키: (정규화한 요리명, 비건 여부, 알러지/비선호 제외 집합, 포함/제외 도메인 지문)
+    - 값: 선호도 필터를 전체 본문으로 통과한 결과의 url/title/content(앞부분)만 튜플로 압축 저장,
+      TTL + LRU 크기 제한 (잘린 본문으로 다시 필터해도 적중/미스 판정이 같음)
+    - exclude_urls(이전에 보여준 URL)는 저장 시가 아니라 조회 시 걸러서
+      같은 캐시 항목으로 '다른 레시피' 재검색도 처리
+    """
+
+    def __init__(self, ttl_sec: int = TAVILY_CACHE_TTL, max_entries: int = TAVILY_CACHE_MAX_ENTRIES,
+                 content_chars: int = TAVILY_CACHE_CONTENT_CHARS):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.content_chars = content_chars
+        self._entries: "OrderedDict[Tuple, Tuple[float, Tuple[Tuple[str, str, str], ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0}
+
+    def get(self, key: Tuple, exclude_urls: Optional[Iterable[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] > self.ttl_sec:
+                self._entries.pop(key, None)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            rows = entry[1]
+
+        excluded = set(exclude_urls or ())
+        return [{"url": url, "title": title, "content": content}
+                for url, title, content in rows if url not in excluded]
+
+    def put(self, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        rows = tuple(
+            (r.get("url", ""), r.get("title", "") or "", (r.get("content") or "")[: self.content_chars])
+            for r in results if r.get("url")
+        )
+        if not rows:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["stores"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "ttl_sec": self.ttl_sec,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+tavily_result_cache = TavilyResultCache()
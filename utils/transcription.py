@@ -0,0 +1,151 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_VAD = os.getenv("WHISPER_VAD", "true").lower() == "true"
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "2"))
+WHISPER_MAX_QUEUE = int(os.getenv("WHISPER_MAX_QUEUE", "8"))
+WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "false").lower() == "true"
+
+
+class TranscriptionQueueFull(Exception):
+    """대기열이 가득 차 전사 요청을 받을 수 없음"""
+
+
+class TranscriptionService:
+    """
+    faster-whisper 전사 서비스 (프로세스당 모델 1회 로드)
+
+    - 모델은 최초 사용 또는 warmup 시점에 한 번만 로드 (int8 compute, num_workers=WHISPER_WORKERS)
+    - 전사는 크기가 고정된 스레드 풀에서 실행되어 이벤트 루프를 막지 않음
+    - 대기 + 실행 중 요청이 WHISPER_MAX_QUEUE를 넘으면 TranscriptionQueueFull
+    - 대기열 길이, 실행 중 작업 수, real-time factor(처리시간/오디오길이)를 지표로 제공
+    """
+
+    def __init__(self, model_size: str = WHISPER_MODEL, device: str = WHISPER_DEVICE,
+                 compute_type: str = WHISPER_COMPUTE_TYPE, workers: int = WHISPER_WORKERS,
+                 max_queue: int = WHISPER_MAX_QUEUE, vad_filter: bool = WHISPER_VAD):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.workers = workers
+        self.max_queue = max_queue
+        self.vad_filter = vad_filter
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="whisper")
+        self._state_lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._rtf_ewma: Optional[float] = None
+        self._last_rtf: Optional[float] = None
+        self._load_seconds: Optional[float] = None
+
+    def get_model(self):
+        if self._model is not None:
+            return self._model
+        with self._model_lock:
+            if self._model is None:
+                from faster_whisper import WhisperModel
+                started = time.perf_counter()
+                self._model = WhisperModel(self.model_size, device=self.device,
+                                           compute_type=self.compute_type, num_workers=self.workers)
+                self._load_seconds = round(time.perf_counter() - started, 3)
+                logger.info(f"Whisper 모델 로드 완료: {self.model_size}/{self.compute_type}, {self._load_seconds}s")
+        return self._model
+
+    def warmup(self) -> None:
+        """모델 로드 + 1초 무음 전사로 첫 요청 지연 제거"""
+        try:
+            import numpy as np
+            model = self.get_model()
+            segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="ko", vad_filter=False)
+            list(segments)
+            logger.info("Whisper 워밍업 완료")
+        except Exception as e:
+            logger.warning(f"Whisper 워밍업 실패: {e}")
+
+    def record_rtf(self, elapsed: float, duration: float) -> Optional[float]:
+        rtf = round(elapsed / duration, 3) if duration > 0 else None
+        if rtf is not None:
+            with self._state_lock:
+                self._last_rtf = rtf
+                self._rtf_ewma = rtf if self._rtf_ewma is None else round(0.8 * self._rtf_ewma + 0.2 * rtf, 3)
+        return rtf
+
+    def _transcribe_sync(self, audio, language: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        model = self.get_model()
+        segments, info = model.transcribe(audio, language=language, vad_filter=self.vad_filter)
+        text = "".join(seg.text for seg in segments).strip()
+        elapsed = time.perf_counter() - started
+        duration = float(getattr(info, "duration", 0.0) or 0.0)
+        rtf = self.record_rtf(elapsed, duration)
+        return {"text": text, "duration": round(duration, 3), "elapsed": round(elapsed, 3), "rtf": rtf}
+
+    def _run_tracked(self, fn: Callable, *args):
+        with self._state_lock:
+            self._running += 1
+        try:
+            result = fn(*args)
+            with self._state_lock:
+                self._completed += 1
+            return result
+        except Exception:
+            with self._state_lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._state_lock:
+                self._running -= 1
+
+    async def submit(self, fn: Callable, *args):
+        """전사 풀에 작업 제출 - 대기열 한도를 넘으면 TranscriptionQueueFull"""
+        with self._state_lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                raise TranscriptionQueueFull(f"전사 대기열 초과 ({self.max_queue})")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._run_tracked, fn, *args)
+        finally:
+            with self._state_lock:
+                self._pending -= 1
+
+    async def transcribe(self, audio, language: str = "ko") -> Dict[str, Any]:
+        """파일 경로 또는 오디오 배열을 풀에서 전사"""
+        return await self.submit(self._transcribe_sync, audio, language)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._state_lock:
+            return {
+                "model": self.model_size,
+                "compute_type": self.compute_type,
+                "model_loaded": self._model is not None,
+                "model_load_seconds": self._load_seconds,
+                "workers": self.workers,
+                "running": self._running,
+                "queue_depth": max(0, self._pending - self._running),
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "last_rtf": self._last_rtf,
+                "rtf_ewma": self._rtf_ewma
+            }
+
+
+transcription_service = TranscriptionService()
@@ -0,0 +1,109 @@
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+HASH_NAME_LENGTH = 32
+
+
+class UploadError(Exception):
+    """업로드 저장 실패 (status_code와 사용자 메시지 포함)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class UploadTooLarge(UploadError):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"최대 {max_bytes // (1024 * 1024)}MB까지만 업로드 가능합니다.", status_code=413)
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    sha256: str
+    size: int
+    deduplicated: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+async def save_upload(upload, dest_dir: Path, max_bytes: int, suffix: str = "",
+                      detect_kind: Optional[Callable[[Path], Optional[str]]] = None,
+                      chunk_size: int = CHUNK_SIZE,
+                      unsupported_message: str = "지원하지 않는 파일 형식입니다.") -> StoredUpload:
+    """
+    UploadFile을 내용 주소(sha256) 기반 파일로 저장
+
+    - 선언된 크기(upload.size)가 max_bytes를 넘으면 읽기 전에 거절
+    - 고정 크기 청크로 스트리밍하면서 동시에 해시 계산, 누적 크기가 넘으면 즉시 중단
+    - 같은 내용이 이미 있으면 임시 파일을 버리고 기존 파일을 재사용 (dedupe)
+    - detect_kind(tmp_path)가 주어지면 반환값을 확장자로 사용, None이면 UploadError(unsupported_message)
+    """
+    declared = getattr(upload, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest_dir / f".tmp_{uuid.uuid4().hex}"
+    digest = hashlib.sha256()
+    written = 0
+
+    try:
+        with tmp_path.open("wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                f.write(chunk)
+
+        if detect_kind is not None:
+            kind = detect_kind(tmp_path)
+            if not kind:
+                raise UploadError(unsupported_message)
+            suffix = f".{kind}"
+
+        sha256 = digest.hexdigest()
+        final_path = dest_dir / f"{sha256[:HASH_NAME_LENGTH]}{(suffix or '').lower()}"
+        if final_path.exists():
+            tmp_path.unlink()
+            return StoredUpload(path=final_path, sha256=sha256, size=written, deduplicated=True)
+
+        os.replace(tmp_path, final_path)
+        return StoredUpload(path=final_path, sha256=sha256, size=written)
+    finally:
+        if tmp_path.exists():
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+@asynccontextmanager
+async def temporary_upload(upload, dest_dir: Path, max_bytes: int, suffix: str = ""):
+    """
+    요청 처리 중에만 필요한 업로드 (save_upload와 같은 스트리밍/크기 제한)
+    요청별 디렉터리에 저장하므로 같은 내용의 동시 업로드와 파일을 공유하지 않고, 블록을 벗어나면 삭제
+    """
+    work_dir = Path(dest_dir) / f".req_{uuid.uuid4().hex}"
+    try:
+        yield await save_upload(upload, work_dir, max_bytes, suffix=suffix)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,228 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+from utils.json_file_store import read_json, merge_and_write_json, merge_newer
+
+logger = logging.getLogger(__name__)
+
+URL_HEALTH_PATH = os.getenv(
+    "URL_HEALTH_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "url_health.json"))
+URL_HEALTH_OK_TTL = int(os.getenv("URL_HEALTH_OK_TTL", str(6 * 3600)))
+URL_HEALTH_FAIL_TTL = int(os.getenv("URL_HEALTH_FAIL_TTL", "1800"))
+URL_HEALTH_MAX_URLS = int(os.getenv("URL_HEALTH_MAX_URLS", "5000"))
+DOMAIN_FAILURE_THRESHOLD = int(os.getenv("URL_HEALTH_DOMAIN_FAILURES", "3"))
+DOMAIN_COOLDOWN_SEC = int(os.getenv("URL_HEALTH_DOMAIN_COOLDOWN", "600"))
+DOMAIN_SLOW_MS = float(os.getenv("URL_HEALTH_DOMAIN_SLOW_MS", "1500"))
+LATENCY_EWMA_ALPHA = 0.3
+PERSIST_INTERVAL_SEC = int(os.getenv("URL_HEALTH_PERSIST_INTERVAL", "30"))
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class UrlHealthCache:
+    """
+    URL 접근 가능 여부 + 도메인 건강도 캐시
+
+    - URL 단위: 성공/실패 결과를 각각 다른 TTL로 보관 (알려진 정상 URL은 HEAD 생략)
+    - 도메인 단위: 연속 실패 횟수, 응답 시간 EWMA
+      · 연속 실패가 threshold 이상이고 마지막 실패가 cooldown 이내면 건너뜀
+      · 최근 실패가 있거나 느린 도메인은 후보 순서에서 뒤로 미룸
+    - 변경분은 persist_interval마다 JSON 파일로 기록, 종료 시 flush()
+      · 파일 잠금 아래 디스크 내용과 병합 (URL은 checked_at, 도메인은 updated_at이 최신인 쪽)해
+        다른 워커의 기록을 덮어쓰지 않고 메모리에도 받아옴. 파일 I/O는 캐시 잠금 밖에서 수행
+    """
+
+    def __init__(self, path: Optional[str] = URL_HEALTH_PATH, ok_ttl: int = URL_HEALTH_OK_TTL,
+                 fail_ttl: int = URL_HEALTH_FAIL_TTL, max_urls: int = URL_HEALTH_MAX_URLS):
+        self.path = path
+        self.ok_ttl = ok_ttl
+        self.fail_ttl = fail_ttl
+        self.max_urls = max_urls
+        self._urls: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._domains: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._last_persist = 0.0
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._stats = {"url_hits": 0, "url_misses": 0, "domain_skips": 0, "probes_recorded": 0,
+                       "persists": 0, "merged_from_disk": 0}
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self._last_persist = time.time()
+        try:
+            data = read_json(self.path) or {}
+            now = time.time()
+            for url, entry in data.get("urls", {}).items():
+                if not self._expired(entry, now):
+                    self._urls[url] = entry
+            self._domains.update(data.get("domains", {}))
+            logger.info(f"URL 상태 캐시 로드: URL {len(self._urls)}개, 도메인 {len(self._domains)}개")
+        except Exception as e:
+            logger.warning(f"URL 상태 캐시 로드 실패: {e}")
+
+    def _persist(self, force: bool = False) -> None:
+        """
+        변경분을 디스크와 병합해 기록 (URL/도메인 항목은 교체만 하므로 얕은 복사본을 잠금 밖에서 직렬화)
+        다른 스레드가 기록 중이면 이번 차례는 건너뜀 (force면 기다림)
+        """
+        if not self.path or not self._persist_lock.acquire(blocking=force):
+            return
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return
+                local_urls, local_domains = dict(self._urls), dict(self._domains)
+                self._dirty = False
+                self._last_persist = time.time()
+
+            def _merge(disk):
+                disk = disk if isinstance(disk, dict) else {}
+                now = time.time()
+                urls = merge_newer(local_urls, disk.get("urls"), lambda e: e["checked_at"])
+                urls = sorted(((u, e) for u, e in urls.items() if not self._expired(e, now)),
+                              key=lambda item: item[1]["checked_at"])[-self.max_urls:]
+                domains = merge_newer(local_domains, disk.get("domains"), lambda h: h.get("updated_at", 0))
+                return {"urls": dict(urls), "domains": domains}
+
+            try:
+                merged = merge_and_write_json(self.path, _merge)
+            except Exception as e:
+                logger.warning(f"URL 상태 캐시 저장 실패: {e}")
+                with self._lock:
+                    self._dirty = True
+                return
+
+            with self._lock:
+                self._stats["persists"] += 1
+                for url, entry in merged["urls"].items():
+                    current = self._urls.get(url)
+                    if current is None or entry["checked_at"] > current["checked_at"]:
+                        self._urls[url] = entry
+                        self._stats["merged_from_disk"] += 1
+                while len(self._urls) > self.max_urls:
+                    self._urls.popitem(last=False)
+                for domain, health in merged["domains"].items():
+                    current = self._domains.get(domain)
+                    if current is None or health.get("updated_at", 0) > current.get("updated_at", 0):
+                        self._domains[domain] = health
+        finally:
+            self._persist_lock.release()
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        ttl = self.ok_ttl if entry["ok"] else self.fail_ttl
+        return now - entry["checked_at"] > ttl
+
+    def _domain_blocked(self, domain: str, now: float) -> bool:
+        health = self._domains.get(domain)
+        if not health or health["failures"] < DOMAIN_FAILURE_THRESHOLD:
+            return False
+        return now - health.get("last_failure_at", 0) <= DOMAIN_COOLDOWN_SEC
+
+    def lookup(self, url: str) -> Optional[bool]:
+        """캐시된 판정 (True/False), 모르면 None. 차단 중인 도메인은 False"""
+        now = time.time()
+        with self._lock:
+            self._load()
+            entry = self._urls.get(url)
+            if entry and self._expired(entry, now):
+                self._urls.pop(url, None)
+                entry = None
+            if entry:
+                self._urls.move_to_end(url)
+                self._stats["url_hits"] += 1
+                return entry["ok"]
+            if self._domain_blocked(domain_of(url), now):
+                self._stats["domain_skips"] += 1
+                return False
+            self._stats["url_misses"] += 1
+            return None
+
+    def record(self, url: str, ok: bool, latency_ms: Optional[float] = None, domain_ok: Optional[bool] = None) -> None:
+        """
+        프로브 결과 기록
+        domain_ok: 도메인 자체가 응답했는지 (4xx/비HTML은 URL만 실패, 타임아웃/5xx는 도메인 실패). 기본값은 ok
+        """
+        domain_ok = ok if domain_ok is None else domain_ok
+        now = time.time()
+        with self._lock:
+            self._load()
+            self._urls[url] = {"ok": bool(ok), "checked_at": now}
+            self._urls.move_to_end(url)
+            while len(self._urls) > self.max_urls:
+                self._urls.popitem(last=False)
+
+            domain = domain_of(url)
+            health = dict(self._domains.get(domain) or {"failures": 0, "successes": 0, "latency_ewma_ms": None})
+            health["updated_at"] = now
+            self._domains[domain] = health
+            if domain_ok:
+                health["failures"] = 0
+                health["successes"] += 1
+                if latency_ms is not None:
+                    prev = health["latency_ewma_ms"]
+                    health["latency_ewma_ms"] = round(
+                        latency_ms if prev is None else LATENCY_EWMA_ALPHA * latency_ms + (1 - LATENCY_EWMA_ALPHA) * prev, 1)
+            else:
+                health["failures"] += 1
+                health["last_failure_at"] = now
+
+            self._stats["probes_recorded"] += 1
+            self._dirty = True
+            due = now - self._last_persist >= PERSIST_INTERVAL_SEC
+        if due:
+            self._persist()
+
+    def prioritize(self, urls: List[str]) -> List[str]:
+        """차단 도메인 제거 + 불안정/느린 도메인을 뒤로 (같은 등급 안에서는 원래 순서 유지)"""
+        now = time.time()
+        with self._lock:
+            self._load()
+            ranked = []
+            for idx, url in enumerate(urls):
+                domain = domain_of(url)
+                if self._domain_blocked(domain, now):
+                    self._stats["domain_skips"] += 1
+                    continue
+                health = self._domains.get(domain) or {}
+                degraded = health.get("failures", 0) > 0 or (health.get("latency_ewma_ms") or 0) > DOMAIN_SLOW_MS
+                ranked.append((degraded, idx, url))
+        return [url for _, _, url in sorted(ranked)]
+
+    def flush(self) -> None:
+        self._persist(force=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            self._load()
+            lookups = self._stats["url_hits"] + self._stats["url_misses"]
+            return {
+                **self._stats,
+                "urls": len(self._urls),
+                "hit_rate": round(self._stats["url_hits"] / lookups, 4) if lookups else 0.0,
+                "blocked_domains": sorted(d for d in self._domains if self._domain_blocked(d, now)),
+                "domains": {
+                    domain: {
+                        "failures": health["failures"],
+                        "successes": health["successes"],
+                        "latency_ewma_ms": health["latency_ewma_ms"],
+                    }
+                    for domain, health in sorted(self._domains.items())
+                },
+            }
+
+
+url_health_cache = UrlHealthCache()
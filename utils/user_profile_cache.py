@@ -0,0 +1,210 @@
+import os
+import time
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, Any, Optional
+
+from mysql.connector import Error
+
+from utils.db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+USER_PROFILE_CACHE_TTL = int(os.getenv("USER_PROFILE_CACHE_TTL", "300"))
+USER_PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("USER_PROFILE_CACHE_MAX_ENTRIES", "10000"))
+# 다른 워커의 invalidate를 확인하는 주기 (user_profile_change_tbl 조회, 요청마다가 아니라 이 주기마다 한 번)
+USER_PROFILE_SYNC_SEC = float(os.getenv("USER_PROFILE_SYNC_SEC", "2"))
+# 변경 기록 조회 시 겹쳐 읽는 구간 (커밋 순서와 changed_at 순서가 어긋나는 경우 대비)
+SYNC_OVERLAP = timedelta(seconds=1)
+
+
+class UserProfileCache:
+    """
+    사용자 프로필(이름/알러지/비건/비선호/가구원수/멤버십 + 멤버십 할인율/무료배송 기준) TTL 캐시
+
+    - 채팅 페이지 표시명, 레시피/잡담 개인화, 장바구니/주문 멤버십 혜택 등 조회 경로는 이 캐시만 사용
+    - 프로필/멤버십을 수정하는 쪽에서 invalidate(user_id)를 호출해 즉시 반영
+      · 로컬 캐시를 비우고 user_profile_change_tbl에 변경 시각을 기록
+      · 다른 워커는 sync_sec마다 변경 기록을 읽어 해당 사용자를 비움 (uvicorn 워커 여러 개 대응)
+    - 존재하지 않는 사용자('anonymous' 등)도 빈 프로필로 같은 TTL 동안 캐시 (DB 연결 실패는 캐시하지 않음)
+    """
+
+    def __init__(self, ttl_sec: int = USER_PROFILE_CACHE_TTL, max_entries: int = USER_PROFILE_CACHE_MAX_ENTRIES,
+                 sync_sec: float = USER_PROFILE_SYNC_SEC):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.sync_sec = sync_sec
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._sync_cursor = None
+        self._seen_changes: Dict[str, Any] = {}  # 겹쳐 읽는 구간에서 이미 반영한 변경 (user_id -> changed_at)
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "remote_invalidations": 0, "syncs": 0}
+
+    def _load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """프로필 dict, 사용자가 없으면 빈 dict, 조회 실패면 None"""
+        conn = get_db_connection()
+        if not conn:
+            return None
+        try:
+            with conn.cursor(dictionary=True) as cursor:
+                cursor.execute(
+                    """
+                    SELECT u.name, ud.allergy, ud.vegan, ud.unfavorite, ud.house_hold, ud.membership,
+                           COALESCE(m.discount_rate, 0) AS discount_rate,
+                           COALESCE(m.free_shipping_threshold, 30000) AS free_shipping_threshold
+                    FROM userinfo_tbl u
+                    LEFT JOIN user_detail_tbl ud ON u.user_id = ud.user_id
+                    LEFT JOIN membership_tbl m ON ud.membership = m.membership_name
+                    WHERE u.user_id = %s
+                    LIMIT 1
+                    """,
+                    (user_id,),
+                )
+                row = cursor.fetchone()
+            if not row:
+                return {}
+            return {
+                "name": row.get("name"),
+                "allergy": row.get("allergy"),
+                "vegan": bool(row.get("vegan") or 0),
+                "unfavorite": row.get("unfavorite"),
+                "house_hold": row.get("house_hold"),
+                "membership": row.get("membership") or "basic",
+                "discount_rate": float(row.get("discount_rate") or 0.0),
+                "free_shipping_threshold": float(row.get("free_shipping_threshold")),
+            }
+        except Error as e:
+            logger.error(f"사용자 프로필 조회 실패: {e}")
+            return None
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+    def _sync_remote_invalidations(self) -> None:
+        """다른 워커가 기록한 프로필 변경을 sync_sec마다 한 번 읽어 로컬 항목을 비움 (한 스레드만 조회)"""
+        if time.time() - self._last_sync < self.sync_sec or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sync = time.time()
+            conn = get_db_connection()
+            if not conn:
+                return
+            try:
+                with conn.cursor() as cursor:
+                    if self._sync_cursor is None:
+                        cursor.execute("SELECT COALESCE(MAX(changed_at), NOW(6)) FROM user_profile_change_tbl")
+                        self._sync_cursor = cursor.fetchone()[0]
+                        return
+                    cursor.execute(
+                        "SELECT user_id, changed_at FROM user_profile_change_tbl WHERE changed_at > %s",
+                        (self._sync_cursor - SYNC_OVERLAP,)
+                    )
+                    rows = cursor.fetchall()
+            except Error as e:
+                logger.warning(f"프로필 변경 기록 조회 실패: {e}")
+                return
+            finally:
+                if conn and conn.is_connected():
+                    conn.close()
+
+            with self._lock:
+                self._stats["syncs"] += 1
+                for user_id, changed_at in rows:
+                    if self._seen_changes.get(user_id) == changed_at:
+                        continue
+                    self._seen_changes[user_id] = changed_at
+                    if user_id in self._entries:
+                        self._invalidate_locked(user_id)
+                        self._stats["remote_invalidations"] += 1
+                    if changed_at > self._sync_cursor:
+                        self._sync_cursor = changed_at
+                window_start = self._sync_cursor - SYNC_OVERLAP
+                self._seen_changes = {uid: at for uid, at in self._seen_changes.items() if at > window_start}
+        finally:
+            self._sync_lock.release()
+
+    def _publish_invalidation(self, user_id: str) -> None:
+        conn = get_db_connection()
+        if not conn:
+            logger.warning(f"프로필 변경 기록 실패(DB 연결 없음): 다른 워커는 최대 {self.ttl_sec}s 이전 값 사용")
+            return
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO user_profile_change_tbl (user_id, changed_at) VALUES (%s, NOW(6)) "
+                    "ON DUPLICATE KEY UPDATE changed_at = NOW(6)",
+                    (user_id,)
+                )
+            conn.commit()
+        except Error as e:
+            logger.warning(f"프로필 변경 기록 실패: {e}")
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        if not user_id:
+            return None
+        self._sync_remote_invalidations()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and now - entry["loaded_at"] <= self.ttl_sec:
+                self._stats["hits"] += 1
+                return dict(entry["profile"]) if entry["profile"] else None
+            self._stats["misses"] += 1
+            generation = self._entries.get(user_id, {}).get("generation", 0)
+
+        profile = self._load(user_id)
+        if profile is None:
+            return None
+
+        with self._lock:
+            current = self._entries.get(user_id)
+            # 조회 도중 invalidate가 일어났다면 오래된 값으로 덮어쓰지 않음
+            if current and current.get("generation", 0) != generation:
+                return dict(profile) if profile else None
+            if len(self._entries) >= self.max_entries and user_id not in self._entries:
+                expired = [uid for uid, e in self._entries.items() if now - e["loaded_at"] > self.ttl_sec]
+                for uid in expired or list(self._entries)[: max(1, self.max_entries // 10)]:
+                    self._entries.pop(uid, None)
+            self._entries[user_id] = {"profile": profile, "loaded_at": time.time(), "generation": generation}
+        return dict(profile) if profile else None
+
+    def _invalidate_locked(self, user_id: str) -> None:
+        entry = self._entries.get(user_id)
+        self._entries[user_id] = {"profile": None, "loaded_at": float("-inf"),
+                                  "generation": (entry or {}).get("generation", 0) + 1}
+
+    def invalidate(self, user_id: str) -> None:
+        if not user_id:
+            return
+        with self._lock:
+            self._invalidate_locked(user_id)
+            self._stats["invalidations"] += 1
+        self._publish_invalidation(user_id)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "ttl_sec": self.ttl_sec,
+                "sync_sec": self.sync_sec,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+user_profile_cache = UserProfileCache()
+
+
+def get_user_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    return user_profile_cache.get(user_id)
+
+
+def invalidate_user_profile(user_id: str) -> None:
+    user_profile_cache.invalidate(user_id)
@@ -0,0 +1,230 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from utils.json_file_store import read_json, merge_and_write_json, merge_newer
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+VISION_CACHE_PATH = os.getenv(
+    "VISION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "vision_cache.json"))
+VISION_CACHE_MAX_DISTANCE = int(os.getenv("VISION_CACHE_MAX_DISTANCE", "6"))
+VISION_CACHE_TTL_SEC = int(os.getenv("VISION_CACHE_TTL", str(7 * 86400)))
+VISION_CACHE_MAX_ENTRIES = int(os.getenv("VISION_CACHE_MAX_ENTRIES", "2000"))
+VISION_CACHE_PERSIST_INTERVAL = int(os.getenv("VISION_CACHE_PERSIST_INTERVAL", "30"))
+
+DHASH_SIZE = 8
+
+
+def dhash(data: bytes, hash_size: int = DHASH_SIZE) -> Optional[int]:
+    """
+    difference hash (64bit) - 회색조 (hash_size+1)×hash_size 축소 후 인접 픽셀 밝기 비교
+    재압축/리사이즈/메타데이터 차이에는 거의 변하지 않음 (EXIF 회전은 먼저 반영)
+    """
+    if Image is None or not data:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.seek(0)
+            img = ImageOps.exif_transpose(img)
+            small = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+            pixels = list(small.getdata())
+    except Exception as e:
+        logger.warning(f"이미지 해시 계산 실패: {e}")
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def content_hash(data: bytes) -> Optional[int]:
+    """이미지 바이트 SHA-256 앞 64bit (완전히 같은 이미지만 일치, 판정에 쓰이는 경로용)"""
+    if not data:
+        return None
+    return int.from_bytes(hashlib.sha256(data).digest()[:8], "big")
+
+
+def prompt_version(*parts: str) -> str:
+    """모델명/프롬프트 문자열로 캐시 네임스페이스 생성 (프롬프트가 바뀌면 자동 무효화)"""
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+class VisionResultCache:
+    """
+    이미지 지각 해시(dHash) 기반 Vision 분석 결과 캐시
+
+    - (prompt_version, dHash) 완전 일치를 먼저 찾고, 없으면 같은 네임스페이스에서
+      해밍 거리가 max_distance 이하인 가장 가까운 항목을 재사용 (재인코딩/리사이즈된 동일 사진)
+    - 결과가 환불 판정 등에 쓰이는 경로는 content_hash()를 키로 lookup(max_distance=0)만 사용
+    - TTL 만료 항목은 조회 시 폐기, max_entries 초과 시 가장 오래 안 쓰인 항목부터 제거
+    - 변경분은 persist_interval마다 JSON 파일로 기록, 종료 시 flush()
+      · 파일 잠금 아래 디스크 내용과 (version, hash)별로 병합해 다른 워커의 결과를 덮어쓰지 않고 받아옴
+    """
+
+    def __init__(self, path: Optional[str] = VISION_CACHE_PATH, max_distance: int = VISION_CACHE_MAX_DISTANCE,
+                 ttl_sec: int = VISION_CACHE_TTL_SEC, max_entries: int = VISION_CACHE_MAX_ENTRIES,
+                 persist_interval: int = VISION_CACHE_PERSIST_INTERVAL):
+        self.path = path
+        self.persist_interval = persist_interval
+        self.max_distance = max_distance
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._last_persist = 0.0
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0, "expired": 0, "stores": 0,
+                       "persists": 0, "merged_from_disk": 0}
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self._last_persist = time.time()
+        try:
+            now = time.time()
+            for key, entry in self._rows_to_entries(read_json(self.path) or []).items():
+                if not self._expired(entry, now):
+                    self._entries[key] = entry
+            logger.info(f"Vision 결과 캐시 로드: {len(self._entries)}개 항목")
+        except Exception as e:
+            logger.warning(f"Vision 결과 캐시 로드 실패: {e}")
+
+    @staticmethod
+    def _rows_to_entries(rows) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        return {(row["version"], int(row["hash"], 16)): {"result": row["result"], "created_at": row["created_at"]}
+                for row in rows}
+
+    def _persist(self, force: bool = False) -> None:
+        """변경분이 있고 persist_interval이 지났으면(force면 즉시) 디스크와 병합해 잠금 밖에서 기록"""
+        if not self.path or not self._dirty:
+            return
+        if not force and time.time() - self._last_persist < self.persist_interval:
+            return
+        if not self._persist_lock.acquire(blocking=force):
+            return
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return
+                local = dict(self._entries)
+                self._dirty = False
+                self._last_persist = time.time()
+
+            def _merge(disk):
+                now = time.time()
+                merged = merge_newer(local, self._rows_to_entries(disk if isinstance(disk, list) else []),
+                                     lambda e: e["created_at"])
+                newest = sorted(((k, e) for k, e in merged.items() if not self._expired(e, now)),
+                                key=lambda item: item[1]["created_at"])[-self.max_entries:]
+                return [{"version": version, "hash": f"{image_hash:016x}", **entry}
+                        for (version, image_hash), entry in newest]
+
+            try:
+                rows = merge_and_write_json(self.path, _merge)
+            except Exception as e:
+                logger.warning(f"Vision 결과 캐시 저장 실패: {e}")
+                with self._lock:
+                    self._dirty = True
+                return
+
+            with self._lock:
+                self._stats["persists"] += 1
+                for key, entry in self._rows_to_entries(rows).items():
+                    current = self._entries.get(key)
+                    if current is None or entry["created_at"] > current["created_at"]:
+                        self._entries[key] = entry
+                        self._stats["merged_from_disk"] += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        finally:
+            self._persist_lock.release()
+
+    def flush(self) -> None:
+        self._persist(force=True)
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return bool(self.ttl_sec) and now - entry["created_at"] > self.ttl_sec
+
+    def lookup(self, image_hash: Optional[int], version: str,
+               max_distance: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """max_distance=0이면 완전 일치만 허용 (None이면 인스턴스 기본값)"""
+        if image_hash is None:
+            return None
+        max_distance = self.max_distance if max_distance is None else max_distance
+        now = time.time()
+        with self._lock:
+            self._load()
+            key = (version, image_hash)
+            entry = self._entries.get(key)
+            if entry and self._expired(entry, now):
+                self._entries.pop(key, None)
+                self._stats["expired"] += 1
+                entry = None
+
+            distance = 0
+            if entry is None:
+                best_key, best_distance = None, max_distance + 1
+                for cand_key, cand in (list(self._entries.items()) if max_distance > 0 else []):
+                    if cand_key[0] != version:
+                        continue
+                    if self._expired(cand, now):
+                        self._entries.pop(cand_key, None)
+                        self._stats["expired"] += 1
+                        continue
+                    d = (cand_key[1] ^ image_hash).bit_count()
+                    if d < best_distance:
+                        best_key, best_distance = cand_key, d
+                if best_key is None:
+                    self._stats["misses"] += 1
+                    return None
+                key, entry, distance = best_key, self._entries[best_key], best_distance
+                self._stats["near_hits"] += 1
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return {"result": entry["result"], "distance": distance}
+
+    def store(self, image_hash: Optional[int], version: str, result: Dict[str, Any]) -> None:
+        if image_hash is None or not result:
+            return
+        with self._lock:
+            self._load()
+            self._entries[(version, image_hash)] = {"result": result, "created_at": time.time()}
+            self._entries.move_to_end((version, image_hash))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["stores"] += 1
+            self._dirty = True
+        self._persist()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_distance": self.max_distance,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0
+            }
+
+
+vision_result_cache = VisionResultCache()
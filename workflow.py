@@ -1,4 +1,9 @@
+import os
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
 from langgraph.graph import StateGraph, END
 from graph_interfaces import ChatState
 
@@ -15,6 +20,112 @@ from nodes.casual_chat import casual_chat
 
 logger = logging.getLogger(__name__)
 
+SPECULATIVE_ENHANCE = os.getenv("SPECULATIVE_ENHANCE", "true").lower() == "true"
+SPECULATIVE_ENHANCE_WORKERS = int(os.getenv("SPECULATIVE_ENHANCE_WORKERS", "4"))
+ENHANCE_TARGETS = {'product_search', 'recipe_search', 'cart_add', 'cart_remove', 'cart_view', 'checkout'}
+
+
+class EnhanceSpeculator:
+    """
+    router_route와 enhance_query를 동시에 시작하는 추측 실행
+    - 라우터 결과가 enhance 경로(ENHANCE_TARGETS)면 미리 계산된 결과를 enhance_query 노드에서 사용 (hit)
+    - CS/잡담/clarify 경로면 결과를 버림 (miss, LLM 호출 1회 낭비)
+    - 절감 시간 = 보강 소요시간 - enhance 노드에서 결과를 기다린 시간
+    """
+
+    def __init__(self, enabled: bool = SPECULATIVE_ENHANCE, workers: int = SPECULATIVE_ENHANCE_WORKERS):
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative-enhance")
+        self._pending: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "hits": 0, "misses": 0, "errors": 0, "saved_ms": 0.0, "wasted_ms": 0.0}
+
+    @staticmethod
+    def _key(state: ChatState) -> tuple:
+        return (state.user_id, state.session_id, state.query)
+
+    @staticmethod
+    def _timed_enhance(state: ChatState) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = enhance_query(state)
+        return {"result": result, "elapsed_ms": (time.perf_counter() - started) * 1000}
+
+    def start(self, state: ChatState) -> None:
+        if not self.enabled or not state.query or state.vision_mode or state.image:
+            return
+        future = self._executor.submit(self._timed_enhance, state)
+        with self._lock:
+            self._pending[self._key(state)] = future
+            self._stats["started"] += 1
+
+    def resolve(self, state: ChatState, target: Optional[str]) -> None:
+        """라우팅 확정 후 enhance 경로가 아니면 추측 결과 폐기"""
+        if target in ENHANCE_TARGETS:
+            return
+        with self._lock:
+            future = self._pending.pop(self._key(state), None)
+            if future is None:
+                return
+            self._stats["misses"] += 1
+        future.add_done_callback(self._record_waste)
+
+    def _record_waste(self, future) -> None:
+        if future.exception() is None:
+            with self._lock:
+                self._stats["wasted_ms"] += future.result()["elapsed_ms"]
+
+    def consume(self, state: ChatState) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            future = self._pending.pop(self._key(state), None)
+        if future is None:
+            return None
+        waited = time.perf_counter()
+        try:
+            outcome = future.result()
+        except Exception as e:
+            logger.warning(f"추측 실행 enhance_query 실패, 순차 실행으로 대체: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            return None
+        wait_ms = (time.perf_counter() - waited) * 1000
+        saved_ms = max(0.0, outcome["elapsed_ms"] - wait_ms)
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["saved_ms"] += saved_ms
+        logger.info(f"추측 실행 enhance_query 적중: {saved_ms:.0f}ms 절감")
+        return outcome["result"]
+
+    def discard(self, state: ChatState) -> None:
+        """워크플로우가 enhance 노드에 도달하지 못하고 끝난 경우 남은 추측 결과 정리"""
+        with self._lock:
+            self._pending.pop(self._key(state), None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            resolved = self._stats["hits"] + self._stats["misses"]
+            return {
+                **{k: round(v, 1) if isinstance(v, float) else v for k, v in self._stats.items()},
+                "enabled": self.enabled,
+                "pending": len(self._pending),
+                "hit_rate": round(self._stats["hits"] / resolved, 4) if resolved else 0.0,
+                "avg_saved_ms": round(self._stats["saved_ms"] / self._stats["hits"], 1) if self._stats["hits"] else 0.0
+            }
+
+
+enhance_speculator = EnhanceSpeculator()
+
+def router_node(state: ChatState) -> Dict[str, Any]:
+    """router_route 실행 + enhance_query 추측 실행"""
+    enhance_speculator.start(state)
+    result = router_route(state)
+    enhance_speculator.resolve(state, (result.get("route") or {}).get("target"))
+    return result
+
+def enhance_query_node(state: ChatState) -> Dict[str, Any]:
+    """추측 실행 결과가 있으면 사용, 없으면 enhance_query 실행"""
+    result = enhance_speculator.consume(state)
+    return result if result is not None else enhance_query(state)
+
 def search_hub(state: ChatState) -> ChatState:
     """검색 관련 요청을 처리하는 허브 함수 - conditional_edges가 분기 처리"""
     target = state.route.get("target")
@@ -155,12 +266,12 @@ def create_workflow_graph():
 
     workflow = StateGraph(ChatState)
     
-    workflow.add_node("router", router_route)
+    workflow.add_node("router", router_node)
     workflow.add_node("clarify", clarify)
     workflow.add_node("search_hub", search_hub)
     workflow.add_node("cs_hub", cs_hub)
     
-    workflow.add_node("enhance_query", enhance_query)
+    workflow.add_node("enhance_query", enhance_query_node)
     workflow.add_node("product_search", product_search_rag_text2sql)
     workflow.add_node("recipe_search", recipe_search)
     workflow.add_node("vision_recipe", vision_recipe)
@@ -283,6 +394,8 @@ def run_workflow(state: ChatState) -> ChatState:
     except Exception as e:
         logger.error(f"StateGraph workflow execution failed: {e}")
         return run_workflow_fallback(state)
+    finally:
+        enhance_speculator.discard(state)
 
 def run_workflow_fallback(state: ChatState) -> ChatState:
     """기존 if문 방식 워크플로우 (폴백용)"""